@@ -3,7 +3,8 @@ Configuración del admin para la app de autenticación
 """
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
-from .models import User
+from .last_login import last_logins
+from .models import RevokedToken, User
 
 
 @admin.register(User)
@@ -30,6 +31,30 @@ class UserAdmin(BaseUserAdmin):
             'fields': ('email', 'password1', 'password2', 'first_name', 'last_name'),
         }),
     )
+    
+    def changelist_view(self, request, extra_context=None):
+        # Los logins pendientes de este proceso se escriben antes de
+        # mostrar last_login; los de otros workers, en su siguiente lote.
+        last_logins.flush()
+        return super().changelist_view(request, extra_context)
+    
+    def change_view(self, request, object_id, form_url='', extra_context=None):
+        last_logins.flush()
+        return super().change_view(request, object_id, form_url, extra_context)
 
 
+@admin.register(RevokedToken)
+class RevokedTokenAdmin(admin.ModelAdmin):
+    """
+    Consulta de los refresh tokens revocados (solo lectura).
+    """
+    list_display = ('jti', 'revoked_at', 'expires_at')
+    search_fields = ('jti',)
+    ordering = ('-revoked_at',)
+    
+    def has_add_permission(self, request):
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
 
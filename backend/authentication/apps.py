@@ -4,6 +4,11 @@ from django.apps import AppConfig
 class AuthenticationConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'authentication'
-
-
-
+    
+    def ready(self):
+        from django.contrib.auth.password_validation import get_default_password_validators
+        from . import signals  # noqa: F401
+        
+        # Carga la lista de contraseñas comunes al iniciar y no en el
+        # primer registro.
+        get_default_password_validators()
@@ -0,0 +1,111 @@
+"""
+Base para las vistas asíncronas de la API (/api/async/)
+
+DRF no ejecuta vistas asíncronas: sus vistas, autenticación y permisos son
+síncronos. Las vistas de /api/async/ son vistas asíncronas de Django que
+reutilizan de DRF lo que no accede a la base de datos (el Request para
+leer parámetros y el cuerpo JSON, los serializers para validar y
+representar, las excepciones y JSONRenderer), de modo que las respuestas y
+los errores tienen el mismo formato que la API síncrona.
+"""
+import copy
+
+from django.contrib.auth import get_user_model
+from django.http import HttpResponse
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework import status
+from rest_framework.exceptions import APIException, AuthenticationFailed, NotAuthenticated
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework_simplejwt.settings import api_settings
+from .authentication import CachedJWTAuthentication
+from .cache import user_cache
+
+User = get_user_model()
+
+
+async def authenticate_jwt(request):
+    """
+    Retorna el usuario del token JWT de la petición.
+
+    Usa las mismas cachés que CachedJWTAuthentication: el token verificado
+    se toma de token_cache y el usuario de user_cache, o se obtiene con el
+    ORM asíncrono. Lanza NotAuthenticated si no hay token y
+    AuthenticationFailed si es inválido o el usuario no existe o está
+    inactivo.
+    """
+    authenticator = CachedJWTAuthentication()
+    header = authenticator.get_header(request)
+    raw_token = authenticator.get_raw_token(header) if header is not None else None
+    if raw_token is None:
+        raise NotAuthenticated()
+    token = authenticator.get_validated_token(raw_token)
+
+    try:
+        user_id = token[api_settings.USER_ID_CLAIM]
+    except KeyError:
+        raise AuthenticationFailed('El token no identifica a un usuario.', code='token_not_valid')
+    user = user_cache.get(str(user_id))
+    if user is None:
+        try:
+            user = await User.objects.aget(**{api_settings.USER_ID_FIELD: user_id})
+        except User.DoesNotExist:
+            raise AuthenticationFailed('Usuario no encontrado.', code='user_not_found')
+        if not user.is_active:
+            raise AuthenticationFailed('El usuario está inactivo.', code='user_inactive')
+        user_cache.set(str(user_id), user)
+    return copy.copy(user)
+
+
+class AsyncAPIView(View):
+    """
+    Vista asíncrona con autenticación JWT y respuestas JSON.
+
+    Los métodos (async def get, post, ...) reciben un Request de DRF con
+    request.user ya autenticado y retornan los datos con json_response().
+    Las APIException se convierten en respuestas con el mismo formato que
+    el manejador de excepciones de DRF.
+    """
+    authentication_required = True
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        # Igual que APIView: la autenticación es por token, no por cookie.
+        return csrf_exempt(super().as_view(**initkwargs))
+
+    async def dispatch(self, request, *args, **kwargs):
+        drf_request = Request(request, parsers=[JSONParser()])
+        try:
+            if self.authentication_required:
+                drf_request.user = await authenticate_jwt(request)
+            return await super().dispatch(drf_request, *args, **kwargs)
+        except APIException as exc:
+            return self.error_response(request, exc)
+
+    def error_response(self, request, exc):
+        """
+        Convierte una APIException en una respuesta JSON.
+        """
+        if isinstance(exc.detail, (list, dict)):
+            data = exc.detail
+        else:
+            data = {'detail': exc.detail}
+        response = self.json_response(data, status=exc.status_code)
+        if isinstance(exc, (NotAuthenticated, AuthenticationFailed)):
+            response['WWW-Authenticate'] = CachedJWTAuthentication().authenticate_header(request)
+        return response
+
+    @staticmethod
+    def json_response(data, status=status.HTTP_200_OK):
+        """
+        Retorna data como JSON, con el mismo renderer que la API síncrona.
+        """
+        if data is None:
+            return HttpResponse(status=status)
+        return HttpResponse(
+            JSONRenderer().render(data),
+            content_type='application/json',
+            status=status,
+        )
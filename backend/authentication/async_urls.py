@@ -0,0 +1,13 @@
+"""
+URLs asíncronas para la app de autenticación
+"""
+from django.urls import path
+from .async_views import AsyncRegisterView, AsyncLoginView
+
+urlpatterns = [
+    # POST /api/async/auth/register/ - Registro de usuario
+    path('register/', AsyncRegisterView.as_view(), name='async_register'),
+    
+    # POST /api/async/auth/login/ - Login y obtención de token JWT
+    path('login/', AsyncLoginView.as_view(), name='async_login'),
+]
@@ -0,0 +1,109 @@
+"""
+Vistas asíncronas para la app de autenticación (/api/async/auth/)
+"""
+from asgiref.sync import sync_to_async
+from django.contrib.auth.hashers import make_password
+from rest_framework import status
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.settings import api_settings
+from .async_api import AsyncAPIView, User
+from .hashers import hashing_pool
+from .last_login import last_logins
+from .serializers import UserRegistrationSerializer, UserLoginSerializer, unique_email
+
+
+def user_data(user):
+    """
+    Retorna la información básica del usuario incluida en las respuestas.
+    """
+    return {
+        'id': user.id,
+        'email': user.email,
+        'first_name': user.first_name,
+        'last_name': user.last_name,
+    }
+
+
+class AsyncRegisterView(AsyncAPIView):
+    """
+    Versión asíncrona de RegisterView.
+
+    UserRegistrationSerializer valida los datos sin consultar la base de
+    datos, el hash de la contraseña se calcula en el pool de hashing y el
+    usuario se inserta en un hilo con un solo INSERT, cuyo índice único
+    rechaza los emails ya registrados.
+    """
+    authentication_required = False
+
+    async def post(self, request):
+        serializer = UserRegistrationSerializer(data=request.data)
+        # La validación no consulta la base de datos: el email duplicado se
+        # detecta al insertar.
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+
+        # El hash es trabajo de CPU y no usa la base de datos, así que se
+        # calcula en el pool acotado fuera del hilo de la petición.
+        password = await hashing_pool.arun(make_password, data['password'])
+        email = User.objects.normalize_email(data['email'])
+        user = await sync_to_async(self.insert_user)(
+            email=email,
+            username=email,
+            password=password,
+            first_name=data['first_name'],
+            last_name=data['last_name'],
+        )
+        return self.json_response(
+            {
+                'message': 'Usuario registrado exitosamente',
+                'user': user_data(user),
+            },
+            status=status.HTTP_201_CREATED
+        )
+
+    @staticmethod
+    def insert_user(**fields):
+        with unique_email():
+            return User.objects.create(**fields)
+
+
+class AsyncLoginView(AsyncAPIView):
+    """
+    Versión asíncrona de LoginView.
+
+    El usuario se obtiene con el ORM asíncrono y la contraseña se verifica
+    en el pool acotado de hashing (PBKDF2 bloquearía el event loop).
+    Retorna los mismos tokens y datos que LoginView.
+    """
+    authentication_required = False
+
+    async def post(self, request):
+        serializer = UserLoginSerializer(data=request.data)
+        # Solo la validación de campos: validate() autentica de forma síncrona.
+        credentials = serializer.to_internal_value(request.data)
+
+        try:
+            user = await User.objects.aget_by_natural_key(credentials['email'])
+        except User.DoesNotExist:
+            user = None
+        if user is None:
+            # Igual que ModelBackend: se calcula un hash para que el tiempo
+            # de respuesta no revele si el email existe.
+            await hashing_pool.arun(make_password, credentials['password'])
+        elif not await user.acheck_password(credentials['password']):
+            user = None
+        if user is None or not api_settings.USER_AUTHENTICATION_RULE(user):
+            raise AuthenticationFailed(
+                serializer.error_messages['no_active_account'], code='no_active_account'
+            )
+
+        refresh = serializer.get_token(user)
+        last_logins.record(user)
+        if last_logins.flush_due():
+            await sync_to_async(last_logins.flush)()
+
+        return self.json_response({
+            'refresh': str(refresh),
+            'access': str(refresh.access_token),
+            'user': {**user_data(user), 'is_active': user.is_active},
+        })
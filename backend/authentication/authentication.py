@@ -0,0 +1,53 @@
+"""
+Clases de autenticación para la API
+"""
+import copy
+import time
+
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+from .cache import token_cache, user_cache
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication que evita decodificar el token y consultar el usuario
+    en cada petición.
+
+    Los tokens verificados se guardan en token_cache hasta su expiración
+    (o AUTH_CACHE_TIMEOUT, lo que ocurra primero) y los usuarios en
+    user_cache por AUTH_CACHE_TIMEOUT segundos, de modo que una petición
+    autenticada con un token y un usuario ya vistos no ejecuta consultas.
+
+    Guardar o eliminar un usuario lo quita de user_cache en el proceso que
+    hace el cambio (ver authentication.signals); en los demás workers un
+    cambio de contraseña o de is_active se aplica en como máximo
+    AUTH_CACHE_TIMEOUT segundos.
+    """
+
+    def get_validated_token(self, raw_token):
+        token = token_cache.get(raw_token)
+        if token is None:
+            token = super().get_validated_token(raw_token)
+            token_cache.set(raw_token, token, timeout=token['exp'] - time.time())
+        return token
+
+    def get_user(self, validated_token):
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+        user = user_cache.get(str(user_id)) if user_id is not None else None
+        if user is None:
+            # Solo se guardan usuarios que pasaron las validaciones de
+            # JWTAuthentication (existe y está activo).
+            user = super().get_user(validated_token)
+            user_cache.set(str(user_id), user)
+        elif api_settings.CHECK_REVOKE_TOKEN and (
+            validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != get_md5_hash_password(user.password)
+        ):
+            raise AuthenticationFailed(
+                _("The user's password has been changed."), code='password_changed'
+            )
+        # Cada petición recibe su propia copia del usuario compartido.
+        return copy.copy(user)
@@ -0,0 +1,82 @@
+"""
+Cachés en memoria del proceso para la autenticación JWT
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+
+# Funciones llamadas con (nombre, hit) en cada lectura de una TTLCache
+# con nombre (ver add_read_listener).
+_read_listeners = []
+
+
+def add_read_listener(listener):
+    """
+    Registra listener(cache, hit) para cada lectura de las cachés con
+    nombre. Lo usa diagnostics para contar aciertos y fallos en /metrics.
+    """
+    if listener not in _read_listeners:
+        _read_listeners.append(listener)
+
+
+class TTLCache:
+    """
+    Caché LRU acotada en memoria del proceso, con expiración por entrada.
+
+    Cada worker tiene la suya: no hay consultas ni viajes de red, pero una
+    invalidación solo alcanza al proceso que la ejecuta y los demás ven el
+    cambio cuando la entrada expira. Con timeout 0 no guarda nada. Con name,
+    cada lectura se notifica a los listeners (ver add_read_listener).
+    """
+
+    def __init__(self, max_entries, timeout, name=None):
+        self.max_entries = max_entries
+        self.timeout = timeout
+        self.name = name
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None and entry[1] <= time.monotonic():
+                del self._data[key]
+                entry = None
+            if entry is not None:
+                self._data.move_to_end(key)
+        if self.name is not None:
+            for listener in _read_listeners:
+                listener(self.name, entry is not None)
+        return None if entry is None else entry[0]
+
+    def set(self, key, value, timeout=None):
+        """
+        Guarda value por timeout segundos (como máximo el timeout de la caché).
+        """
+        timeout = self.timeout if timeout is None else min(timeout, self.timeout)
+        if timeout <= 0:
+            return
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + timeout)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+# Usuarios por ID (como texto, igual que en el claim del token) y tokens de
+# acceso ya verificados (firma y expiración).
+user_cache = TTLCache(settings.AUTH_CACHE_MAX_ENTRIES, settings.AUTH_CACHE_TIMEOUT, name='auth_users')
+token_cache = TTLCache(settings.AUTH_CACHE_MAX_ENTRIES, settings.AUTH_CACHE_TIMEOUT, name='auth_tokens')
@@ -0,0 +1,83 @@
+"""
+Hashers de contraseña configurables y pool acotado para ejecutarlos
+"""
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth import hashers
+
+
+class PBKDF2PasswordHasher(hashers.PBKDF2PasswordHasher):
+    """
+    PBKDF2-SHA256 con las iteraciones de PASSWORD_HASH_ITERATIONS.
+
+    Conserva el algoritmo pbkdf2_sha256, así que verifica los hashes ya
+    guardados; los que tienen otro número de iteraciones se recalculan en
+    el siguiente login correcto.
+    """
+
+    @property
+    def iterations(self):
+        return settings.PASSWORD_HASH_ITERATIONS
+
+
+class ScryptPasswordHasher(hashers.ScryptPasswordHasher):
+    """
+    scrypt con el factor de trabajo de PASSWORD_HASH_SCRYPT_WORK_FACTOR.
+    """
+
+    @property
+    def work_factor(self):
+        return settings.PASSWORD_HASH_SCRYPT_WORK_FACTOR
+
+
+class HashingPool:
+    """
+    Pool de hilos acotado para calcular hashes de contraseñas.
+
+    Con PASSWORD_HASH_WORKERS hilos por proceso, una ráfaga de logins o
+    registros espera turno en el pool en lugar de ocupar todos los hilos
+    (o el event loop, en ASGI) con trabajo de CPU. hashlib libera el GIL
+    durante PBKDF2 y scrypt, así que las demás peticiones del proceso
+    siguen atendiéndose mientras tanto.
+
+    El executor se crea en el primer uso para que cada worker de gunicorn
+    tenga el suyo (los hilos no sobreviven al fork).
+    """
+
+    def __init__(self, max_workers):
+        self.max_workers = max_workers
+        self._executor = None
+        self._lock = threading.Lock()
+
+    @property
+    def executor(self):
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.max_workers,
+                        thread_name_prefix='password-hash',
+                    )
+        return self._executor
+
+    def run(self, func, *args):
+        """
+        Ejecuta func en el pool y espera su resultado.
+
+        func no debe volver a usar el pool: con todos los hilos ocupados
+        quedaría esperándose a sí misma.
+        """
+        return self.executor.submit(func, *args).result()
+
+    async def arun(self, func, *args):
+        """
+        Versión asíncrona de run(): espera el resultado sin bloquear el
+        event loop.
+        """
+        return await asyncio.wrap_future(self.executor.submit(func, *args))
+
+
+hashing_pool = HashingPool(settings.PASSWORD_HASH_WORKERS)
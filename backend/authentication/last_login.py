@@ -0,0 +1,131 @@
+"""
+Escritura diferida y por lotes de last_login
+"""
+import atexit
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import DatabaseError, close_old_connections
+from django.db.models import Case, DateTimeField, Value, When
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+
+class LastLoginBuffer:
+    """
+    Acumula en memoria el último login de cada usuario y lo escribe por lotes.
+
+    record() no consulta la base de datos: guarda la fecha del login y
+    flush() escribe todas las pendientes con un UPDATE ... CASE por lote,
+    en lugar de un UPDATE por login. Las pendientes se escriben:
+
+    - cada LAST_LOGIN_FLUSH_INTERVAL segundos, desde un hilo en segundo
+      plano (start(), llamado por config.wsgi y config.asgi);
+    - en la petición que registra un login cuando ya pasó ese intervalo o
+      hay LAST_LOGIN_MAX_PENDING usuarios pendientes;
+    - al terminar el proceso.
+
+    Si el proceso termina de forma abrupta se pierden como máximo los
+    logins de los últimos LAST_LOGIN_FLUSH_INTERVAL segundos.
+    """
+
+    batch_size = 500
+
+    def __init__(self, flush_interval, max_pending):
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._next_flush = time.monotonic() + flush_interval
+        self._thread = None
+        self._stopped = threading.Event()
+
+    def record(self, user):
+        """
+        Registra un login del usuario sin escribirlo en la base de datos.
+        """
+        user.last_login = timezone.now()
+        with self._lock:
+            self._pending[user.pk] = user.last_login
+
+    def flush_due(self):
+        return bool(self._pending) and (
+            len(self._pending) >= self.max_pending or time.monotonic() >= self._next_flush
+        )
+
+    def flush_if_due(self):
+        if self.flush_due():
+            self.flush()
+
+    def flush(self):
+        """
+        Escribe los logins pendientes y retorna cuántos usuarios actualizó.
+
+        Si la escritura falla, los pendientes vuelven al buffer para el
+        siguiente intento.
+        """
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, {}
+                self._next_flush = time.monotonic() + self.flush_interval
+            if not pending:
+                return 0
+
+            User = get_user_model()
+            items = list(pending.items())
+            updated = 0
+            try:
+                for start in range(0, len(items), self.batch_size):
+                    batch = items[start:start + self.batch_size]
+                    updated += User.objects.filter(pk__in=[pk for pk, _ in batch]).update(
+                        last_login=Case(
+                            *[When(pk=pk, then=Value(last_login)) for pk, last_login in batch],
+                            output_field=DateTimeField(),
+                        )
+                    )
+            except DatabaseError:
+                logger.exception('No se pudo escribir last_login de %d usuarios', len(pending))
+                with self._lock:
+                    # Un login registrado durante la escritura es más reciente.
+                    self._pending = {**pending, **self._pending}
+                return 0
+            return updated
+
+    def clear(self):
+        with self._lock:
+            self._pending.clear()
+
+    def start(self):
+        """
+        Inicia el hilo que escribe los pendientes cada flush_interval
+        segundos y los escribe también al terminar el proceso.
+        """
+        if self._thread is not None or self.flush_interval <= 0:
+            return
+        self._thread = threading.Thread(target=self._run, name='last-login-flush', daemon=True)
+        self._thread.start()
+        atexit.register(self.stop)
+
+    def stop(self):
+        self._stopped.set()
+        self.flush()
+
+    def _run(self):
+        while not self._stopped.wait(self.flush_interval):
+            try:
+                self.flush()
+            finally:
+                # El hilo no atiende peticiones: cierra su conexión según
+                # CONN_MAX_AGE como lo haría el ciclo de una petición.
+                close_old_connections()
+
+    def __len__(self):
+        return len(self._pending)
+
+
+last_logins = LastLoginBuffer(settings.LAST_LOGIN_FLUSH_INTERVAL, settings.LAST_LOGIN_MAX_PENDING)
@@ -0,0 +1,61 @@
+"""
+Comando para eliminar los refresh tokens revocados que ya expiraron
+"""
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from authentication.models import RevokedToken
+
+
+class Command(BaseCommand):
+    """
+    Elimina de RevokedToken las filas cuyo token ya expiró.
+    
+    Un token expirado es rechazado por su firma, así que su fila ya no es
+    necesaria. Pensado para ejecutarse periódicamente (por ejemplo desde
+    cron): recorre las filas expiradas con el índice de expires_at y las
+    elimina en lotes pequeños, cada uno en su propia consulta, con una
+    espera entre lotes para no bloquear la tabla.
+    """
+    help = 'Elimina los refresh tokens revocados que ya expiraron.'
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size', type=int, default=1000,
+            help='Filas por lote (por defecto 1000)'
+        )
+        parser.add_argument(
+            '--sleep', type=float, default=0.1,
+            help='Segundos de espera entre lotes (por defecto 0.1)'
+        )
+    
+    def handle(self, *args, **options):
+        if options['chunk_size'] < 1:
+            raise CommandError('--chunk-size debe ser mayor que cero.')
+        cutoff = timezone.now()
+        chunk_size = options['chunk_size']
+        
+        deleted, chunks = 0, 0
+        start = time.monotonic()
+        while True:
+            jtis = list(
+                RevokedToken.objects.filter(expires_at__lt=cutoff)
+                .order_by('expires_at')
+                .values_list('jti', flat=True)[:chunk_size]
+            )
+            if not jtis:
+                break
+            count, _ = RevokedToken.objects.filter(jti__in=jtis).delete()
+            deleted += count
+            chunks += 1
+            self.stdout.write(f'Lote {chunks}: {count} tokens ({deleted} en total)')
+            if len(jtis) < chunk_size:
+                break
+            time.sleep(options['sleep'])
+        
+        elapsed = time.monotonic() - start
+        self.stdout.write(self.style.SUCCESS(
+            f'{deleted} tokens revocados eliminados en {elapsed:.2f} s.'
+        ))
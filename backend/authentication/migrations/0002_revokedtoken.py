@@ -0,0 +1,25 @@
+# Generated by Django 5.2.8 on 2026-10-17 01:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RevokedToken',
+            fields=[
+                ('jti', models.CharField(help_text='Identificador único del token', max_length=64, primary_key=True, serialize=False, verbose_name='JTI')),
+                ('expires_at', models.DateTimeField(db_index=True, help_text='Expiración del token; después de ella la fila puede eliminarse', verbose_name='Fecha de expiración')),
+                ('revoked_at', models.DateTimeField(auto_now_add=True, db_index=True, help_text='Fecha y hora en que se revocó el token', verbose_name='Fecha de revocación')),
+            ],
+            options={
+                'verbose_name': 'Token revocado',
+                'verbose_name_plural': 'Tokens revocados',
+            },
+        ),
+    ]
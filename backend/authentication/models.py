@@ -1,8 +1,10 @@
 """
 Modelos para la app de autenticación
 """
+from django.contrib.auth.hashers import make_password, verify_password
 from django.contrib.auth.models import AbstractUser, BaseUserManager
 from django.db import models
+from .hashers import hashing_pool
 
 
 class UserManager(BaseUserManager):
@@ -91,8 +93,80 @@ class User(AbstractUser):
     def __str__(self):
         return self.email
     
+    def set_password(self, raw_password):
+        """
+        Calcula el hash de la contraseña en el pool acotado de hashing.
+        """
+        self.password = hashing_pool.run(make_password, raw_password)
+        self._password = raw_password
+    
+    def check_password(self, raw_password):
+        """
+        Verifica la contraseña en el pool acotado de hashing.
+        
+        Si el hash guardado usa otro algoritmo o costo que el configurado en
+        PASSWORD_HASHERS, se recalcula y se guarda con la contraseña
+        correcta, de modo que cambiar la política se aplica en el siguiente
+        login de cada usuario.
+        """
+        is_correct, must_update = hashing_pool.run(verify_password, raw_password, self.password)
+        if is_correct and must_update:
+            self.set_password(raw_password)
+            # Actualizar el hash no es un cambio de contraseña.
+            self._password = None
+            self.save(update_fields=['password'])
+        return is_correct
+    
+    async def acheck_password(self, raw_password):
+        """
+        Versión asíncrona de check_password().
+        """
+        is_correct, must_update = await hashing_pool.arun(verify_password, raw_password, self.password)
+        if is_correct and must_update:
+            self.password = await hashing_pool.arun(make_password, raw_password)
+            await self.asave(update_fields=['password'])
+        return is_correct
+    
     objects = UserManager()
     
     USERNAME_FIELD = 'email'
     REQUIRED_FIELDS = ['first_name', 'last_name']
 
+
+class RevokedToken(models.Model):
+    """
+    Refresh tokens revocados, identificados por su claim jti.
+    
+    Al rotar un refresh token se inserta su jti; la clave primaria impide
+    que el mismo token se use dos veces aunque dos workers lo reciban a la
+    vez. Cada worker mantiene una copia en memoria (ver
+    authentication.revocation) para rechazar los tokens revocados sin
+    consultar la tabla, y purge_revoked_tokens elimina las filas de tokens
+    ya expirados, que dejan de ser válidos por sí mismos.
+    """
+    jti = models.CharField(
+        max_length=64,
+        primary_key=True,
+        verbose_name='JTI',
+        help_text='Identificador único del token'
+    )
+    
+    expires_at = models.DateTimeField(
+        db_index=True,
+        verbose_name='Fecha de expiración',
+        help_text='Expiración del token; después de ella la fila puede eliminarse'
+    )
+    
+    revoked_at = models.DateTimeField(
+        auto_now_add=True,
+        db_index=True,
+        verbose_name='Fecha de revocación',
+        help_text='Fecha y hora en que se revocó el token'
+    )
+    
+    class Meta:
+        verbose_name = 'Token revocado'
+        verbose_name_plural = 'Tokens revocados'
+    
+    def __str__(self):
+        return self.jti
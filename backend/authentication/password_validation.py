@@ -0,0 +1,37 @@
+"""
+Validadores de contraseña para la app de autenticación
+"""
+import functools
+import gzip
+
+from django.contrib.auth import password_validation
+
+
+@functools.cache
+def load_password_list(path):
+    """
+    Lee una lista de contraseñas (opcionalmente comprimida con gzip) una
+    sola vez por proceso y la retorna como frozenset.
+    """
+    try:
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            return frozenset(line.strip() for line in f)
+    except OSError:
+        with open(path) as f:
+            return frozenset(line.strip() for line in f)
+
+
+class CommonPasswordValidator(password_validation.CommonPasswordValidator):
+    """
+    CommonPasswordValidator con la lista compartida en un frozenset.
+
+    Django lee las 20.000 contraseñas de la lista al crear el validador, que
+    ocurre en el primer registro atendido por cada proceso. Aquí la lista
+    se carga una vez por ruta, y AuthenticationConfig.ready() crea los
+    validadores al iniciar para que ningún registro pague esa lectura.
+    """
+
+    def __init__(self, password_list_path=None):
+        if password_list_path is None:
+            password_list_path = self.DEFAULT_PASSWORD_LIST_PATH
+        self.passwords = load_password_list(str(password_list_path))
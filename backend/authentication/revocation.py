@@ -0,0 +1,99 @@
+"""
+Revocación de refresh tokens con una copia en memoria por proceso
+"""
+import threading
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import datetime_from_epoch
+from .models import RevokedToken
+
+# Margen con el que cada sincronización relee las revocaciones anteriores,
+# para incluir las transacciones confirmadas después de la anterior.
+SYNC_OVERLAP = timedelta(seconds=60)
+
+
+class RevocationStore:
+    """
+    Conjunto en memoria de los jti revocados y aún no expirados.
+    
+    is_revoked() no consulta la base de datos: la copia se actualiza como
+    máximo cada TOKEN_REVOCATION_SYNC_INTERVAL segundos leyendo solo las
+    filas de RevokedToken revocadas desde la sincronización anterior (con
+    el índice de revoked_at). Un token revocado por otro worker puede
+    pasar esta comprobación durante ese intervalo, pero revoke() lo
+    rechaza porque su jti ya existe en la tabla.
+    """
+    
+    def __init__(self, sync_interval):
+        self.sync_interval = sync_interval
+        self._revoked = {}
+        self._synced_at = None
+        self._next_sync = 0.0
+        self._lock = threading.Lock()
+    
+    def is_revoked(self, jti):
+        self.sync_if_due()
+        return jti in self._revoked
+    
+    def revoke(self, token):
+        """
+        Revoca el token y retorna True, o False si ya estaba revocado.
+        """
+        jti = token[api_settings.JTI_CLAIM]
+        expires_at = datetime_from_epoch(token['exp'])
+        try:
+            with transaction.atomic():
+                RevokedToken.objects.create(jti=jti, expires_at=expires_at)
+        except IntegrityError:
+            revoked = False
+        else:
+            revoked = True
+        self._remember([(jti, expires_at)])
+        return revoked
+    
+    def sync_if_due(self):
+        now = time.monotonic()
+        with self._lock:
+            if now < self._next_sync:
+                return
+            self._next_sync = now + self.sync_interval
+        self.sync()
+    
+    def sync(self):
+        """
+        Agrega las revocaciones nuevas y descarta los jti ya expirados.
+        """
+        started = timezone.now()
+        queryset = RevokedToken.objects.filter(expires_at__gt=started)
+        if self._synced_at is not None:
+            queryset = queryset.filter(revoked_at__gte=self._synced_at - SYNC_OVERLAP)
+        rows = list(queryset.values_list('jti', 'expires_at'))
+        
+        self._remember(rows)
+        with self._lock:
+            expired = [jti for jti, expires_at in self._revoked.items() if expires_at <= started]
+            for jti in expired:
+                del self._revoked[jti]
+            self._synced_at = started
+            self._next_sync = time.monotonic() + self.sync_interval
+    
+    def clear(self):
+        with self._lock:
+            self._revoked.clear()
+            self._synced_at = None
+            self._next_sync = 0.0
+    
+    def _remember(self, rows):
+        with self._lock:
+            self._revoked.update(rows)
+    
+    def __len__(self):
+        return len(self._revoked)
+
+
+revoked_tokens = RevocationStore(settings.TOKEN_REVOCATION_SYNC_INTERVAL)
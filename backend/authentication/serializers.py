@@ -1,20 +1,50 @@
 """
 Serializers para la app de autenticación
 """
+from contextlib import contextmanager, nullcontext
+
 from rest_framework import serializers
 from django.contrib.auth.password_validation import validate_password
 from django.contrib.auth import get_user_model
-from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+from django.db import IntegrityError, transaction
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
+from .authentication import CachedJWTAuthentication
+from .last_login import last_logins
+from .revocation import revoked_tokens
 
 User = get_user_model()
 
+EMAIL_TAKEN_MESSAGE = 'Este correo electrónico ya está registrado.'
+
+
+@contextmanager
+def unique_email():
+    """
+    Convierte la violación del índice único de email en el error de
+    validación del campo email.
+    
+    Fuera de una transacción el INSERT se ejecuta solo; dentro de una se
+    protege con un savepoint para que el error no la invalide.
+    """
+    if transaction.get_connection().in_atomic_block:
+        atomic = transaction.atomic()
+    else:
+        atomic = nullcontext()
+    try:
+        with atomic:
+            yield
+    except IntegrityError:
+        raise serializers.ValidationError({'email': [EMAIL_TAKEN_MESSAGE]})
+
 
 class UserRegistrationSerializer(serializers.ModelSerializer):
     """
     Serializer para el registro de nuevos usuarios.
     
     Validaciones:
-    - Email único (validado automáticamente por Django)
+    - Email único (por el índice único de la tabla, al insertar)
     - Password mínimo 8 caracteres
     - first_name y last_name requeridos
     - Password y password_confirm deben coincidir
@@ -39,7 +69,9 @@ class UserRegistrationSerializer(serializers.ModelSerializer):
         extra_kwargs = {
             'email': {
                 'required': True,
-                'help_text': 'Correo electrónico único'
+                'help_text': 'Correo electrónico único',
+                # Sin UniqueValidator: el índice único lo verifica al insertar.
+                'validators': [],
             },
             'first_name': {
                 'required': True,
@@ -51,15 +83,6 @@ class UserRegistrationSerializer(serializers.ModelSerializer):
             }
         }
     
-    def validate_email(self, value):
-        """
-        Valida que el email sea único.
-        Django lo valida automáticamente, pero agregamos un mensaje personalizado.
-        """
-        if User.objects.filter(email=value).exists():
-            raise serializers.ValidationError("Este correo electrónico ya está registrado.")
-        return value
-    
     def validate(self, attrs):
         """
         Valida que password y password_confirm coincidan.
@@ -74,16 +97,19 @@ class UserRegistrationSerializer(serializers.ModelSerializer):
         """
         Crea un nuevo usuario en la base de datos.
         La contraseña se hashea automáticamente mediante create_user.
+        Un email ya registrado se detecta con el mismo INSERT y retorna el
+        error de validación del campo email.
         """
         validated_data.pop('password_confirm')
         password = validated_data.pop('password')
         
-        user = User.objects.create_user(
-            email=validated_data['email'],
-            password=password,
-            first_name=validated_data['first_name'],
-            last_name=validated_data['last_name'],
-        )
+        with unique_email():
+            user = User.objects.create_user(
+                email=validated_data['email'],
+                password=password,
+                first_name=validated_data['first_name'],
+                last_name=validated_data['last_name'],
+            )
         
         return user
 
@@ -106,10 +132,15 @@ class UserLoginSerializer(TokenObtainPairSerializer):
         """
         Valida las credenciales del usuario y genera los tokens JWT.
         Retorna los tokens junto con información básica del usuario.
+        
+        last_login no se escribe aquí: se registra en last_logins y se
+        escribe por lotes.
         """
         # El serializer padre usa username_field='email' para buscar el campo
         # No necesitamos mapear, solo asegurarnos de que 'email' esté presente
         data = super().validate(attrs)
+        last_logins.record(self.user)
+        last_logins.flush_if_due()
         
         data['user'] = {
             'id': self.user.id,
@@ -129,3 +160,37 @@ class UserLoginSerializer(TokenObtainPairSerializer):
         token = super().get_token(user)
         return token
 
+
+class RevocableTokenRefreshSerializer(TokenRefreshSerializer):
+    """
+    Serializer para renovar el access token con un refresh token.
+    
+    Igual que el de simplejwt, pero con revocación real: con
+    ROTATE_REFRESH_TOKENS y BLACKLIST_AFTER_ROTATION el refresh token
+    recibido se revoca al emitir el nuevo, y un token revocado retorna 401.
+    La comprobación usa la copia en memoria de authentication.revocation y
+    el usuario se obtiene de la caché de CachedJWTAuthentication, de modo
+    que la única consulta es la inserción del jti revocado.
+    """
+    
+    def validate(self, attrs):
+        refresh = self.token_class(attrs['refresh'])
+        if revoked_tokens.is_revoked(refresh[api_settings.JTI_CLAIM]):
+            raise InvalidToken('El token fue revocado.')
+        
+        # 401 si el usuario no existe o está inactivo
+        CachedJWTAuthentication().get_user(refresh)
+        
+        data = {'access': str(refresh.access_token)}
+        
+        if api_settings.ROTATE_REFRESH_TOKENS:
+            if api_settings.BLACKLIST_AFTER_ROTATION and not revoked_tokens.revoke(refresh):
+                # Otro worker lo rotó antes de que esta copia lo supiera.
+                raise InvalidToken('El token fue revocado.')
+            
+            refresh.set_jti()
+            refresh.set_exp()
+            refresh.set_iat()
+            data['refresh'] = str(refresh)
+        
+        return data
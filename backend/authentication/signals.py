@@ -0,0 +1,18 @@
+"""
+Señales de la app de autenticación
+"""
+from django.conf import settings
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from .cache import user_cache
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+@receiver(post_delete, sender=settings.AUTH_USER_MODEL)
+def evict_cached_user(sender, instance, **kwargs):
+    """
+    Quita al usuario de la caché de autenticación al guardarlo o eliminarlo,
+    para que los cambios de contraseña o de is_active se apliquen en la
+    siguiente petición.
+    """
+    user_cache.delete(str(instance.pk))
@@ -1,10 +1,27 @@
 """
 Tests para la app de autenticación
 """
-from django.test import TestCase
+import threading
+import time
+from datetime import timedelta
+from io import StringIO
+
+from asgiref.sync import sync_to_async
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.contrib.auth import get_user_model
+from django.utils import timezone
 from rest_framework.test import APIClient
 from rest_framework import status
+from rest_framework_simplejwt.tokens import RefreshToken
+from .authentication import CachedJWTAuthentication
+from .cache import TTLCache, token_cache, user_cache
+from .hashers import HashingPool
+from .last_login import LastLoginBuffer, last_logins
+from .models import RevokedToken
+from .revocation import RevocationStore, revoked_tokens
 
 User = get_user_model()
 
@@ -55,6 +72,39 @@ class UserRegistrationTests(TestCase):
         response = self.client.post(self.register_url, data, format='json')
         
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['email'], ['Este correo electrónico ya está registrado.'])
+        self.assertEqual(User.objects.filter(email='existing@example.com').count(), 1)
+    
+    def test_register_user_single_insert(self):
+        """Test: El registro no consulta si el email existe: solo inserta el usuario."""
+        data = {
+            'email': 'test@example.com',
+            'password': 'testpass123',
+            'password_confirm': 'testpass123',
+            'first_name': 'Test',
+            'last_name': 'User'
+        }
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(self.register_url, data, format='json')
+        
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        statements = [query['sql'].split()[0].upper() for query in queries.captured_queries]
+        self.assertEqual(statements.count('INSERT'), 1)
+        self.assertNotIn('SELECT', statements)
+    
+    def test_register_user_common_password(self):
+        """Test: Se rechazan las contraseñas de la lista de contraseñas comunes."""
+        data = {
+            'email': 'test@example.com',
+            'password': 'password123',
+            'password_confirm': 'password123',
+            'first_name': 'Test',
+            'last_name': 'User'
+        }
+        response = self.client.post(self.register_url, data, format='json')
+        
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('password', response.data)
     
     def test_register_user_password_mismatch(self):
         """Test: Las contraseñas deben coincidir."""
@@ -140,6 +190,21 @@ class UserLoginTests(TestCase):
         
         self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
     
+    def test_login_last_login_is_batched(self):
+        """Test: El login no escribe last_login hasta el siguiente lote."""
+        last_logins.clear()
+        data = {
+            'email': 'test@example.com',
+            'password': 'testpass123'
+        }
+        self.client.post(self.login_url, data, format='json')
+        
+        self.user.refresh_from_db()
+        self.assertIsNone(self.user.last_login)
+        self.assertEqual(last_logins.flush(), 1)
+        self.user.refresh_from_db()
+        self.assertIsNotNone(self.user.last_login)
+    
     def test_login_nonexistent_user(self):
         """Test: Login falla con usuario inexistente."""
         data = {
@@ -158,6 +223,7 @@ class TokenRefreshTests(TestCase):
     
     def setUp(self):
         """Configuración inicial para cada test."""
+        revoked_tokens.clear()
         self.client = APIClient()
         self.refresh_url = '/api/auth/refresh/'
         self.user = User.objects.create_user(
@@ -196,4 +262,379 @@ class TokenRefreshTests(TestCase):
         response = self.client.post(self.refresh_url, data, format='json')
         
         self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+    
+    def test_rotated_refresh_token_is_revoked(self):
+        """Test: Un refresh token ya rotado no puede volver a usarse."""
+        data = {'refresh': self.refresh_token}
+        first = self.client.post(self.refresh_url, data, format='json')
+        second = self.client.post(self.refresh_url, data, format='json')
+        
+        self.assertEqual(first.status_code, status.HTTP_200_OK)
+        self.assertEqual(second.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertTrue(RevokedToken.objects.filter(jti=RefreshToken(self.refresh_token)['jti']).exists())
+        
+        # El nuevo refresh token sigue siendo válido.
+        third = self.client.post(self.refresh_url, {'refresh': first.data['refresh']}, format='json')
+        self.assertEqual(third.status_code, status.HTTP_200_OK)
+    
+    def test_revocation_reaches_other_workers(self):
+        """Test: Otro proceso conoce la revocación al sincronizar y la tabla impide reusar el token."""
+        other_worker = RevocationStore(sync_interval=60)
+        other_worker.sync()
+        self.client.post(self.refresh_url, {'refresh': self.refresh_token}, format='json')
+        token = RefreshToken(self.refresh_token)
+        
+        # Antes de sincronizar, la inserción del jti rechaza la reutilización.
+        self.assertFalse(other_worker.is_revoked(token['jti']))
+        self.assertFalse(other_worker.revoke(token))
+        
+        fresh_worker = RevocationStore(sync_interval=60)
+        self.assertTrue(fresh_worker.is_revoked(token['jti']))
+    
+    def test_purge_revoked_tokens(self):
+        """Test: El comando elimina solo los tokens revocados que ya expiraron."""
+        now = timezone.now()
+        RevokedToken.objects.bulk_create(
+            [RevokedToken(jti=f'expired-{index}', expires_at=now - timedelta(hours=1)) for index in range(5)]
+            + [RevokedToken(jti='active', expires_at=now + timedelta(hours=1))]
+        )
+        
+        out = StringIO()
+        call_command('purge_revoked_tokens', '--chunk-size', '2', '--sleep', '0', stdout=out)
+        
+        self.assertEqual(list(RevokedToken.objects.values_list('jti', flat=True)), ['active'])
+        self.assertIn('5 tokens revocados eliminados', out.getvalue())
+
+
+
+class AsyncAuthenticationTests(TestCase):
+    """
+    Tests para las vistas asíncronas de registro y login (/api/async/auth/).
+    """
+    
+    def setUp(self):
+        """Configuración inicial para cada test."""
+        last_logins.clear()
+        self.register_url = '/api/async/auth/register/'
+        self.login_url = '/api/async/auth/login/'
+        self.user = User.objects.create_user(
+            email='test@example.com',
+            password='testpass123',
+            first_name='Test',
+            last_name='User'
+        )
+    
+    async def test_async_register(self):
+        """Test: El registro asíncrono crea el usuario con la contraseña hasheada."""
+        data = {
+            'email': 'nuevo@example.com',
+            'password': 'testpass123',
+            'password_confirm': 'testpass123',
+            'first_name': 'Nuevo',
+            'last_name': 'User'
+        }
+        response = await self.async_client.post(self.register_url, data, content_type='application/json')
+        
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.json()['user']['email'], 'nuevo@example.com')
+        user = await User.objects.aget(email='nuevo@example.com')
+        self.assertTrue(await user.acheck_password('testpass123'))
+    
+    async def test_async_register_validation(self):
+        """Test: El registro asíncrono aplica las validaciones del serializer."""
+        data = {
+            'email': 'nuevo@example.com',
+            'password': 'testpass123',
+            'password_confirm': 'otra',
+            'first_name': 'Test',
+            'last_name': 'User'
+        }
+        response = await self.async_client.post(self.register_url, data, content_type='application/json')
+        
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('password_confirm', response.json())
+    
+    async def test_async_register_duplicate_email(self):
+        """Test: El registro asíncrono rechaza un email ya registrado con el mismo error."""
+        data = {
+            'email': 'test@example.com',
+            'password': 'testpass123',
+            'password_confirm': 'testpass123',
+            'first_name': 'Test',
+            'last_name': 'User'
+        }
+        response = await self.async_client.post(self.register_url, data, content_type='application/json')
+        
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.json()['email'], ['Este correo electrónico ya está registrado.'])
+        self.assertEqual(await User.objects.filter(email='test@example.com').acount(), 1)
+    
+    async def test_async_login(self):
+        """Test: El login asíncrono retorna tokens válidos para la API."""
+        data = {'email': 'test@example.com', 'password': 'testpass123'}
+        response = await self.async_client.post(self.login_url, data, content_type='application/json')
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        body = response.json()
+        self.assertEqual(body['user']['email'], 'test@example.com')
+        await sync_to_async(last_logins.flush)()
+        await self.user.arefresh_from_db()
+        self.assertIsNotNone(self.user.last_login)
+        
+        response = await self.async_client.get(
+            '/api/async/tasks/', headers={'Authorization': f"Bearer {body['access']}"}
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+    
+    async def test_async_login_invalid_credentials(self):
+        """Test: El login asíncrono falla con contraseña incorrecta o usuario inexistente."""
+        for email, password in (('test@example.com', 'wrongpassword'), ('otro@example.com', 'testpass123')):
+            response = await self.async_client.post(
+                self.login_url, {'email': email, 'password': password}, content_type='application/json'
+            )
+            self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class CachedJWTAuthenticationTests(TestCase):
+    """
+    Tests para CachedJWTAuthentication y sus cachés por proceso.
+    """
+    
+    def setUp(self):
+        """Configuración inicial para cada test."""
+        user_cache.clear()
+        token_cache.clear()
+        self.client = APIClient()
+        self.stats_url = '/api/tasks/stats/'
+        self.user = User.objects.create_user(
+            email='test@example.com',
+            password='testpass123',
+            first_name='Test',
+            last_name='User'
+        )
+        token = RefreshToken.for_user(self.user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+    
+    def test_user_is_cached(self):
+        """Test: Con el usuario en caché la autenticación no consulta la base de datos."""
+        self.client.get(self.stats_url)
+        
+        # Solo la lectura de TaskStats
+        with self.assertNumQueries(1):
+            response = self.client.get(self.stats_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+    
+    def test_password_change_evicts_user(self):
+        """Test: Guardar el usuario lo quita de la caché."""
+        self.client.get(self.stats_url)
+        self.assertIsNotNone(user_cache.get(str(self.user.pk)))
+        
+        self.user.set_password('otrapass456')
+        self.user.save()
+        
+        self.assertIsNone(user_cache.get(str(self.user.pk)))
+    
+    def test_inactive_user_rejected_after_change(self):
+        """Test: Un usuario desactivado deja de autenticarse de inmediato."""
+        self.client.get(self.stats_url)
+        
+        self.user.is_active = False
+        self.user.save()
+        response = self.client.get(self.stats_url)
+        
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+    
+    def test_deleted_user_rejected(self):
+        """Test: Un usuario eliminado deja de autenticarse de inmediato."""
+        self.client.get(self.stats_url)
+        
+        self.user.delete()
+        response = self.client.get(self.stats_url)
+        
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+    
+    def test_requests_get_their_own_user(self):
+        """Test: Cada autenticación retorna una copia del usuario cacheado."""
+        authenticator = CachedJWTAuthentication()
+        token = authenticator.get_validated_token(str(RefreshToken.for_user(self.user).access_token).encode())
+        
+        first, second = authenticator.get_user(token), authenticator.get_user(token)
+        
+        self.assertEqual(first.pk, second.pk)
+        self.assertIsNot(first, second)
+    
+    def test_invalid_token_not_cached(self):
+        """Test: Un token inválido sigue fallando y no se guarda."""
+        self.client.credentials(HTTP_AUTHORIZATION='Bearer invalido')
+        
+        response = self.client.get(self.stats_url)
+        
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(len(token_cache), 0)
+    
+    def test_entries_expire(self):
+        """Test: Las entradas expiran y la caché respeta su tamaño máximo."""
+        cache = TTLCache(max_entries=2, timeout=60)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        cache.get('a')
+        cache.set('c', 3)
+        
+        self.assertEqual((cache.get('a'), cache.get('b'), cache.get('c')), (1, None, 3))
+        
+        cache.set('d', 4, timeout=0.01)
+        time.sleep(0.02)
+        self.assertIsNone(cache.get('d'))
+        
+        disabled = TTLCache(max_entries=2, timeout=0)
+        disabled.set('a', 1)
+        self.assertIsNone(disabled.get('a'))
+
+
+@override_settings(PASSWORD_HASH_ITERATIONS=1000)
+class PasswordHashingTests(TestCase):
+    """
+    Tests para la política de hashing configurable y el rehash en el login.
+    """
+    
+    def setUp(self):
+        """Configuración inicial para cada test."""
+        self.client = APIClient()
+        self.login_url = '/api/auth/login/'
+        self.credentials = {'email': 'test@example.com', 'password': 'testpass123'}
+        self.user = User.objects.create_user(
+            email='test@example.com',
+            password='testpass123',
+            first_name='Test',
+            last_name='User'
+        )
+    
+    def test_hash_uses_configured_iterations(self):
+        """Test: Los hashes nuevos usan PASSWORD_HASH_ITERATIONS."""
+        self.assertTrue(self.user.password.startswith('pbkdf2_sha256$1000$'))
+    
+    def test_login_upgrades_iterations(self):
+        """Test: Un login correcto recalcula el hash con el costo configurado."""
+        with self.settings(PASSWORD_HASH_ITERATIONS=2000):
+            response = self.client.post(self.login_url, self.credentials, format='json')
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.password.startswith('pbkdf2_sha256$2000$'))
+    
+    def test_login_upgrades_algorithm(self):
+        """Test: Con otro algoritmo preferido, el login recalcula el hash con él."""
+        hashers = [
+            'authentication.hashers.ScryptPasswordHasher',
+            'authentication.hashers.PBKDF2PasswordHasher',
+        ]
+        with self.settings(PASSWORD_HASHERS=hashers, PASSWORD_HASH_SCRYPT_WORK_FACTOR=2**10):
+            response = self.client.post(self.login_url, self.credentials, format='json')
+            self.user.refresh_from_db()
+            
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertTrue(self.user.password.startswith('scrypt$1024$'))
+            self.assertTrue(self.user.check_password('testpass123'))
+    
+    def test_failed_login_keeps_hash(self):
+        """Test: Un login fallido no modifica el hash guardado."""
+        password = self.user.password
+        with self.settings(PASSWORD_HASH_ITERATIONS=2000):
+            response = self.client.post(
+                self.login_url, {**self.credentials, 'password': 'wrongpass'}, format='json'
+            )
+        
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.password, password)
+    
+    async def test_async_login_upgrades_iterations(self):
+        """Test: El login asíncrono también recalcula el hash."""
+        with self.settings(PASSWORD_HASH_ITERATIONS=2000):
+            response = await self.async_client.post(
+                '/api/async/auth/login/', self.credentials, content_type='application/json'
+            )
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        await self.user.arefresh_from_db()
+        self.assertTrue(self.user.password.startswith('pbkdf2_sha256$2000$'))
+    
+    def test_pool_bounds_concurrency(self):
+        """Test: El pool no calcula más hashes a la vez que su número de hilos."""
+        pool = HashingPool(max_workers=2)
+        lock = threading.Lock()
+        active, peak = [0], [0]
+        
+        def work():
+            with lock:
+                active[0] += 1
+                peak[0] = max(peak[0], active[0])
+            time.sleep(0.02)
+            with lock:
+                active[0] -= 1
+        
+        threads = [threading.Thread(target=pool.run, args=(work,)) for _ in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        self.assertEqual(peak[0], 2)
+
+
+class LastLoginBufferTests(TestCase):
+    """
+    Tests para la escritura por lotes de last_login.
+    """
+    
+    def setUp(self):
+        """Configuración inicial para cada test."""
+        self.users = [
+            User.objects.create_user(
+                email=f'user{index}@example.com',
+                password=None,
+                first_name='Test',
+                last_name='User'
+            )
+            for index in range(3)
+        ]
+    
+    def test_flush_writes_all_users_in_one_update(self):
+        """Test: Un lote actualiza a todos los usuarios pendientes con una consulta."""
+        buffer = LastLoginBuffer(flush_interval=60, max_pending=100)
+        for user in self.users:
+            buffer.record(user)
+        
+        with self.assertNumQueries(1):
+            self.assertEqual(buffer.flush(), 3)
+        for user in self.users:
+            self.assertEqual(User.objects.get(pk=user.pk).last_login, user.last_login)
+        self.assertEqual(len(buffer), 0)
+    
+    def test_flush_keeps_latest_login(self):
+        """Test: Varios logins del mismo usuario se escriben una vez con el más reciente."""
+        buffer = LastLoginBuffer(flush_interval=60, max_pending=100)
+        user = self.users[0]
+        buffer.record(user)
+        buffer.record(user)
+        
+        self.assertEqual(len(buffer), 1)
+        buffer.flush()
+        self.assertEqual(User.objects.get(pk=user.pk).last_login, user.last_login)
+    
+    def test_flush_due(self):
+        """Test: El lote se escribe al pasar el intervalo o al llegar al máximo de pendientes."""
+        by_size = LastLoginBuffer(flush_interval=60, max_pending=2)
+        by_size.record(self.users[0])
+        self.assertFalse(by_size.flush_due())
+        by_size.record(self.users[1])
+        self.assertTrue(by_size.flush_due())
+        
+        by_time = LastLoginBuffer(flush_interval=0.01, max_pending=100)
+        self.assertFalse(by_time.flush_due())
+        by_time.record(self.users[0])
+        time.sleep(0.02)
+        self.assertTrue(by_time.flush_due())
+        by_time.flush_if_due()
+        self.assertIsNotNone(User.objects.get(pk=self.users[0].pk).last_login)
 
@@ -2,8 +2,7 @@
 URLs para la app de autenticación
 """
 from django.urls import path
-from rest_framework_simplejwt.views import TokenRefreshView
-from .views import RegisterView, LoginView
+from .views import RegisterView, LoginView, RefreshView
 
 urlpatterns = [
     # POST /api/auth/register/ - Registro de usuario
@@ -13,6 +12,6 @@ urlpatterns = [
     path('login/', LoginView.as_view(), name='login'),
     
     # POST /api/auth/refresh/ - Renovar token JWT
-    path('refresh/', TokenRefreshView.as_view(), name='token_refresh'),
+    path('refresh/', RefreshView.as_view(), name='token_refresh'),
 ]
 
@@ -4,8 +4,8 @@ Vistas para la app de autenticación
 from rest_framework import status
 from rest_framework.generics import CreateAPIView
 from rest_framework.response import Response
-from rest_framework_simplejwt.views import TokenObtainPairView
-from .serializers import UserRegistrationSerializer, UserLoginSerializer
+from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
+from .serializers import RevocableTokenRefreshSerializer, UserRegistrationSerializer, UserLoginSerializer
 
 
 class RegisterView(CreateAPIView):
@@ -50,4 +50,11 @@ class LoginView(TokenObtainPairView):
     serializer_class = UserLoginSerializer
 
 
-
+class RefreshView(TokenRefreshView):
+    """
+    Vista para renovar el access token con un refresh token.
+    
+    Con la rotación activada retorna también un nuevo refresh token y
+    revoca el recibido, que ya no puede volver a usarse.
+    """
+    serializer_class = RevocableTokenRefreshSerializer
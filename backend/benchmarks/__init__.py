@@ -0,0 +1,7 @@
+"""
+Benchmarks del backend.
+
+Cada módulo se ejecuta desde la carpeta backend/, por ejemplo:
+
+    python -m benchmarks.pagination --help
+"""
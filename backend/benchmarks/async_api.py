@@ -0,0 +1,212 @@
+"""
+Benchmark: API síncrona (WSGI) vs. API asíncrona (ASGI) con clientes concurrentes.
+
+Crea una base de datos SQLite temporal con un usuario y sus tareas (por
+defecto 10.000), levanta el servidor en cada perfil de despliegue y mide,
+para varios niveles de clientes concurrentes, el rendimiento (peticiones/s)
+y la latencia p50/p99 de una mezcla de listado y detalle:
+
+- wsgi: gunicorn config.wsgi con workers síncronos (el despliegue actual),
+  contra /api/tasks/.
+- asgi: gunicorn config.asgi con workers de uvicorn (SERVER_MODE=asgi),
+  contra /api/async/tasks/.
+
+La caché de respuestas se desactiva (TASKS_CACHE_TIMEOUT=0) para que cada
+petición consulte la base de datos.
+
+    python -m benchmarks.async_api --clients 1,10,50 --duration 10 --workers 3
+
+Con SQLite la base de datos responde en microsegundos, por lo que las
+diferencias reflejan sobre todo el costo del servidor; con una base de datos
+remota los workers síncronos pasan más tiempo bloqueados por petición.
+"""
+import argparse
+import http.client
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from .common import print_table, setup_django, summarize
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+PROFILES = {
+    'wsgi': {
+        'application': 'config.wsgi:application',
+        'options': [],
+        'prefix': '/api/tasks/',
+    },
+    'asgi': {
+        'application': 'config.asgi:application',
+        'options': ['--worker-class', 'uvicorn.workers.UvicornWorker'],
+        'prefix': '/api/async/tasks/',
+    },
+}
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def prepare_database(env, tasks):
+    """
+    Migra la base de datos temporal, siembra las tareas y retorna
+    (token de acceso, IDs de tareas para el detalle).
+    """
+    os.environ.update(env)
+    setup_django()
+    from django.contrib.auth import get_user_model
+    from django.core.management import call_command
+    from rest_framework_simplejwt.tokens import RefreshToken
+    from tasks.models import Task, TaskStats
+    from .pagination import seed
+
+    call_command('migrate', verbosity=0)
+    user = get_user_model().objects.create_user(
+        email='bench@example.com',
+        password='benchpass123',
+        first_name='Bench',
+        last_name='User',
+    )
+    seed(user, tasks)
+    TaskStats.recompute(user.pk)
+    task_ids = list(Task.objects.filter(user=user).values_list('id', flat=True)[:100])
+    return str(RefreshToken.for_user(user).access_token), task_ids
+
+
+def start_server(profile, port, workers, env):
+    process = subprocess.Popen(
+        [
+            sys.executable, '-m', 'gunicorn', profile['application'],
+            '--bind', f'127.0.0.1:{port}',
+            '--workers', str(workers),
+            '--log-level', 'warning',
+            *profile['options'],
+        ],
+        cwd=BACKEND_DIR,
+        env={**os.environ, **env},
+    )
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            request('127.0.0.1', port, profile['prefix'], None)
+            return process
+        except OSError:
+            time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError(f'El servidor {profile["application"]} no respondió')
+
+
+def request(host, port, path, token):
+    """
+    Ejecuta un GET en una conexión nueva y retorna el código de estado.
+    """
+    connection = http.client.HTTPConnection(host, port, timeout=30)
+    try:
+        headers = {'Authorization': f'Bearer {token}'} if token else {}
+        connection.request('GET', path, headers=headers)
+        response = connection.getresponse()
+        response.read()
+        return response.status
+    finally:
+        connection.close()
+
+
+def load(port, paths, token, clients, duration):
+    """
+    Ejecuta clients hilos que piden paths en ciclo durante duration
+    segundos. Retorna (latencias, errores, segundos transcurridos).
+    """
+    latencies, errors = [], []
+    lock = threading.Lock()
+    stop_at = time.perf_counter() + duration
+
+    def client(offset):
+        own_latencies, own_errors = [], 0
+        index = offset
+        while time.perf_counter() < stop_at:
+            start = time.perf_counter()
+            try:
+                status = request('127.0.0.1', port, paths[index % len(paths)], token)
+            except OSError:
+                status = None
+            own_latencies.append(time.perf_counter() - start)
+            own_errors += status != 200
+            index += 1
+        with lock:
+            latencies.extend(own_latencies)
+            errors.append(own_errors)
+
+    start = time.perf_counter()
+    threads = [threading.Thread(target=client, args=(offset,)) for offset in range(clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latencies, sum(errors), time.perf_counter() - start
+
+
+def run(args):
+    with tempfile.TemporaryDirectory() as directory:
+        env = {
+            'DATABASE_URL': f'sqlite:///{Path(directory) / "bench.sqlite3"}',
+            'DEBUG': 'False',
+            'ALLOWED_HOSTS': '127.0.0.1',
+            'TASKS_CACHE_TIMEOUT': '0',
+        }
+        token, task_ids = prepare_database(env, args.tasks)
+        levels = [int(value) for value in args.clients.split(',')]
+
+        rows = []
+        for name in args.profiles.split(','):
+            profile = PROFILES[name]
+            paths = [profile['prefix']] + [f'{profile["prefix"]}{task_id}/' for task_id in task_ids]
+            # Mitad listado, mitad detalle.
+            paths = [path for detail in paths[1:] for path in (paths[0], detail)]
+            port = free_port()
+            server = start_server(profile, port, args.workers, {**env, 'SERVER_MODE': name})
+            try:
+                load(port, paths, token, 1, 1)  # calentamiento
+                for clients in levels:
+                    latencies, errors, elapsed = load(port, paths, token, clients, args.duration)
+                    stats = summarize(latencies)
+                    rows.append((
+                        name,
+                        clients,
+                        stats['n'],
+                        errors,
+                        f'{stats["n"] / elapsed:,.0f}',
+                        f'{stats["p50_ms"]:.1f}',
+                        f'{stats["p99_ms"]:.1f}',
+                    ))
+            finally:
+                server.terminate()
+                server.wait()
+
+    print(f'{args.tasks} tareas, {args.workers} workers, {args.duration} s por nivel')
+    print_table(
+        ('perfil', 'clientes', 'peticiones', 'errores', 'req/s', 'p50 ms', 'p99 ms'),
+        rows,
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--tasks', type=int, default=10_000, help='Tareas a sembrar')
+    parser.add_argument('--clients', default='1,10,50', help='Niveles de clientes concurrentes')
+    parser.add_argument('--duration', type=float, default=10, help='Segundos por nivel')
+    parser.add_argument('--workers', type=int, default=3, help='Workers de gunicorn')
+    parser.add_argument('--profiles', default='wsgi,asgi', help='Perfiles a comparar')
+    args = parser.parse_args(argv)
+    run(args)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,104 @@
+"""
+Utilidades compartidas por los benchmarks del backend
+"""
+import os
+import statistics
+import time
+from contextlib import contextmanager
+
+
+def setup_django():
+    """
+    Inicializa Django con la configuración del proyecto.
+    """
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+    import django
+    django.setup()
+
+
+@contextmanager
+def benchmark_database(verbosity=0):
+    """
+    Crea una base de datos de pruebas con las migraciones aplicadas y la
+    elimina al terminar, igual que lo hace el runner de tests de Django.
+    """
+    from django.test.utils import (
+        setup_databases,
+        setup_test_environment,
+        teardown_databases,
+        teardown_test_environment,
+    )
+
+    setup_test_environment()
+    old_config = setup_databases(verbosity=verbosity, interactive=False)
+    try:
+        yield
+    finally:
+        teardown_databases(old_config, verbosity=verbosity)
+        teardown_test_environment()
+
+
+def time_call(func, repeat, warmup=1):
+    """
+    Ejecuta func repeat veces (más warmup ejecuciones descartadas) y retorna
+    la duración de cada ejecución en segundos.
+    """
+    for _ in range(warmup):
+        func()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def count_queries(func):
+    """
+    Retorna el número de consultas SQL que ejecuta func.
+    """
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    with CaptureQueriesContext(connection) as context:
+        func()
+    return len(context.captured_queries)
+
+
+def percentile(ordered, pct):
+    """
+    Percentil por vecino más cercano sobre una lista ya ordenada.
+    """
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def summarize(samples):
+    """
+    Resume una lista de duraciones (segundos) en milisegundos.
+    """
+    ordered = sorted(samples)
+    return {
+        'n': len(ordered),
+        'mean_ms': statistics.fmean(ordered) * 1000 if ordered else 0.0,
+        'p50_ms': percentile(ordered, 50) * 1000,
+        'p95_ms': percentile(ordered, 95) * 1000,
+        'p99_ms': percentile(ordered, 99) * 1000,
+    }
+
+
+def print_table(headers, rows):
+    """
+    Imprime una tabla de texto alineada.
+    """
+    widths = [
+        max(len(str(value)) for value in column)
+        for column in zip(headers, *rows)
+    ]
+    line = '  '.join(f'{{:<{width}}}' for width in widths)
+    print(line.format(*headers))
+    print(line.format(*('-' * width for width in widths)))
+    for row in rows:
+        print(line.format(*row))
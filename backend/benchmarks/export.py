@@ -0,0 +1,122 @@
+"""
+Benchmark: exportación en streaming de las tareas de un usuario.
+
+Siembra tareas para un usuario (por defecto un millón) y mide para
+GET /api/tasks/export/ en NDJSON y CSV el tiempo hasta el primer fragmento,
+el tiempo total, el rendimiento en filas/s y la memoria máxima:
+
+- pico de Python: tracemalloc durante una exportación completa.
+- RSS: crecimiento del máximo de memoria residente del proceso.
+
+    python -m benchmarks.export --tasks 1000000
+
+Con --buffered se agrega como referencia la serialización de todas las
+tareas en memoria con TaskSerializer (lo que haría un listado sin paginar).
+"""
+import argparse
+import resource
+import time
+import tracemalloc
+
+from .common import benchmark_database, print_table, setup_django
+from .pagination import seed
+
+
+def max_rss_mb():
+    # ru_maxrss está en KB en Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def consume(response):
+    """
+    Recorre la respuesta y retorna (segundos hasta el primer fragmento,
+    segundos totales, bytes).
+    """
+    start = time.perf_counter()
+    first_byte, size = None, 0
+    for chunk in response.streaming_content:
+        if first_byte is None:
+            first_byte = time.perf_counter() - start
+        size += len(chunk)
+    return first_byte or 0.0, time.perf_counter() - start, size
+
+
+def run(args):
+    from django.contrib.auth import get_user_model
+    from rest_framework.renderers import JSONRenderer
+    from rest_framework.test import APIClient
+    from tasks.models import Task
+    from tasks.serializers import TaskSerializer
+
+    user = get_user_model().objects.create_user(
+        email='bench@example.com',
+        password='benchpass123',
+        first_name='Bench',
+        last_name='User',
+    )
+    seed(user, args.tasks)
+
+    client = APIClient()
+    client.force_authenticate(user=user)
+
+    rows = []
+    for export_format in ('ndjson', 'csv'):
+        url = f'/api/tasks/export/?format={export_format}'
+        first_byte, total, size = consume(client.get(url))
+
+        rss_before = max_rss_mb()
+        tracemalloc.start()
+        consume(client.get(url))
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        rows.append((
+            export_format,
+            f'{first_byte * 1000:.1f}',
+            f'{total:.2f}',
+            f'{args.tasks / total:,.0f}',
+            f'{size / total / 1024 / 1024:.1f}',
+            f'{peak / 1024 / 1024:.1f}',
+            f'{max_rss_mb() - rss_before:.1f}',
+        ))
+
+    if args.buffered:
+        rss_before = max_rss_mb()
+        start = time.perf_counter()
+        tracemalloc.start()
+        data = TaskSerializer(Task.objects.alive_for(user), many=True).data
+        body = JSONRenderer().render(data)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        total = time.perf_counter() - start
+        rows.append((
+            'buffered',
+            f'{total * 1000:.1f}',
+            f'{total:.2f}',
+            f'{args.tasks / total:,.0f}',
+            f'{len(body) / total / 1024 / 1024:.1f}',
+            f'{peak / 1024 / 1024:.1f}',
+            f'{max_rss_mb() - rss_before:.1f}',
+        ))
+
+    print(f'{args.tasks} tareas de un usuario')
+    print_table(
+        ('formato', 'primer byte ms', 'total s', 'filas/s', 'MB/s', 'pico Python MB', 'RSS +MB'),
+        rows,
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--tasks', type=int, default=1_000_000, help='Tareas a sembrar')
+    parser.add_argument('--buffered', action='store_true',
+                        help='Incluye la serialización completa en memoria como referencia')
+    args = parser.parse_args(argv)
+
+    setup_django()
+    with benchmark_database():
+        run(args)
+
+
+if __name__ == '__main__':
+    main()
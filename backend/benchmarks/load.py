@@ -0,0 +1,432 @@
+"""
+Benchmark: carga HTTP con una mezcla realista de operaciones de la API.
+
+Siembra una base de datos con un usuario por cliente (cada uno con --tasks
+tareas) y ejecuta --clients clientes concurrentes durante --duration
+segundos. Cada cliente inicia sesión y repite operaciones elegidas al azar
+según --mix sobre sus propias tareas:
+
+- login: POST /api/auth/login/
+- list: GET /api/tasks/?page=N (página al azar)
+- create: POST /api/tasks/
+- toggle: PATCH /api/tasks/{id}/ con completed
+- delete: DELETE /api/tasks/{id}/ (de las tareas que creó)
+- refresh: POST /api/auth/refresh/ (con rotación)
+
+Reporta por operación el rendimiento (peticiones/s), la latencia
+p50/p95/p99 y las consultas SQL por petición. Por defecto las peticiones
+se ejecutan en el mismo proceso con APIClient; con --server se levanta
+gunicorn y se envían por HTTP (las consultas por petición se leen del
+header Server-Timing de SQL_PROFILING).
+
+    python -m benchmarks.load --clients 10 --duration 30
+    python -m benchmarks.load --server --workers 3 --clients 20
+    python -m benchmarks.load --save baselines/sqlite.json
+    python -m benchmarks.load --baseline baselines/sqlite.json --threshold 0.2
+
+La base de datos es un SQLite temporal; con --database-url se usa otra,
+por ejemplo un PostgreSQL local (debe ser una base de datos desechable: se
+migra y se le agregan usuarios y tareas).
+
+El proceso termina con código 1 si alguna petición falla, si el p95 de una
+operación CRUD (list, create, toggle, delete) supera --target-ms (500 ms,
+RNF-01), o si contra --baseline una operación empeora su p95 más de
+--threshold o ejecuta más consultas por petición.
+"""
+import argparse
+import http.client
+import json
+import math
+import os
+import platform
+import random
+import re
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+
+from .async_api import PROFILES, free_port, start_server
+from .common import print_table, setup_django, summarize
+
+PASSWORD = 'benchpass123'
+CRUD = ('list', 'create', 'toggle', 'delete')
+DEFAULT_MIX = 'login=1,list=10,create=3,toggle=3,delete=2,refresh=1'
+# Métrica db del header Server-Timing (ver diagnostics.middleware)
+SERVER_TIMING_QUERIES = re.compile(r'\bdb;dur=[\d.]+;desc="(\d+) consultas"')
+
+
+def parse_mix(value):
+    """
+    Convierte 'list=10,create=3' en {'list': 10, 'create': 3}.
+    """
+    mix = {}
+    for item in value.split(','):
+        name, _, weight = item.partition('=')
+        if name not in Session.operations:
+            raise argparse.ArgumentTypeError(f'Operación desconocida: {name}')
+        mix[name] = int(weight or 1)
+    return mix
+
+
+def prepare_database(env, clients, tasks):
+    """
+    Migra la base de datos, crea un usuario por cliente con tasks tareas y
+    retorna sus emails.
+    """
+    os.environ.update(env)
+    setup_django()
+    from django.contrib.auth import get_user_model
+    from django.contrib.auth.hashers import make_password
+    from django.core.management import call_command
+    from tasks.models import TaskStats
+    from .pagination import seed
+
+    call_command('migrate', verbosity=0)
+    User = get_user_model()
+    run_id = uuid.uuid4().hex[:8]
+    password = make_password(PASSWORD)
+    users = User.objects.bulk_create([
+        User(
+            email=f'load-{run_id}-{index}@example.com',
+            username=f'load-{run_id}-{index}@example.com',
+            password=password,
+            first_name='Load',
+            last_name=str(index),
+        )
+        for index in range(clients)
+    ])
+    for user in User.objects.filter(email__in=[user.email for user in users]):
+        seed(user, tasks)
+        TaskStats.recompute(user.pk)
+    return [user.email for user in users]
+
+
+class InProcessTransport:
+    """
+    Ejecuta las peticiones con APIClient en el hilo actual y cuenta las
+    consultas SQL de cada una.
+    """
+
+    def __init__(self):
+        from rest_framework.test import APIClient
+
+        self.client = APIClient()
+        # Un error del servidor se cuenta como petición fallida (500).
+        self.client.raise_request_exception = False
+
+    def call(self, method, path, data=None, token=None):
+        from django.db import connection
+
+        queries = 0
+
+        def count(execute, sql, params, many, context):
+            nonlocal queries
+            queries += 1
+            return execute(sql, params, many, context)
+
+        extra = {'HTTP_AUTHORIZATION': f'Bearer {token}'} if token else {}
+        with connection.execute_wrapper(count):
+            response = getattr(self.client, method.lower())(path, data, format='json', **extra)
+        body = response.json() if response.content and 'json' in response.get('Content-Type', '') else None
+        return response.status_code, body, queries
+
+    def close(self):
+        from django.db import connection
+
+        connection.close()
+
+
+class HTTPTransport:
+    """
+    Ejecuta las peticiones por HTTP contra un servidor local iniciado con
+    SQL_PROFILING, y lee las consultas SQL de cada petición del header
+    Server-Timing.
+    """
+
+    def __init__(self, port):
+        self.connection = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+
+    def call(self, method, path, data=None, token=None):
+        headers = {'Content-Type': 'application/json'}
+        if token:
+            headers['Authorization'] = f'Bearer {token}'
+        body = json.dumps(data).encode() if data is not None else None
+        try:
+            self.connection.request(method, path, body=body, headers=headers)
+            response = self.connection.getresponse()
+            content = response.read()
+        except (http.client.HTTPException, OSError):
+            self.connection.close()
+            return None, None, None
+        is_json = content and 'json' in (response.getheader('Content-Type') or '')
+        queries = SERVER_TIMING_QUERIES.search(response.getheader('Server-Timing') or '')
+        return (
+            response.status,
+            json.loads(content) if is_json else None,
+            int(queries.group(1)) if queries else None,
+        )
+
+    def close(self):
+        self.connection.close()
+
+
+class Session:
+    """
+    Cliente virtual: sus operaciones retornan (éxito, consultas), o None si
+    no aplican en su estado actual (por ejemplo, delete sin tareas creadas).
+    """
+    operations = ('login', 'list', 'create', 'toggle', 'delete', 'refresh')
+
+    def __init__(self, transport, email, rng, page_size):
+        self.transport = transport
+        self.email = email
+        self.rng = rng
+        self.page_size = page_size
+        self.access = self.refresh_token = None
+        self.pages = 1
+        self.seen_ids = []
+        self.created_ids = []
+
+    def login(self):
+        status, body, queries = self.transport.call(
+            'POST', '/api/auth/login/', {'email': self.email, 'password': PASSWORD}
+        )
+        if status == 200:
+            self.access, self.refresh_token = body['access'], body['refresh']
+        return status == 200, queries
+
+    def list(self):
+        # La última página puede desaparecer con los delete de este cliente.
+        page = self.rng.randint(1, max(1, self.pages - 1))
+        status, body, queries = self.transport.call('GET', f'/api/tasks/?page={page}', token=self.access)
+        if status == 200:
+            self.pages = max(1, math.ceil(body['count'] / self.page_size))
+            self.seen_ids = [task['id'] for task in body['results']] or self.seen_ids
+        return status == 200, queries
+
+    def create(self):
+        data = {'title': f'Tarea {self.rng.randrange(10**6)}', 'description': 'Creada por benchmarks.load'}
+        status, body, queries = self.transport.call('POST', '/api/tasks/', data, token=self.access)
+        if status == 201:
+            self.created_ids.append(body['id'])
+        return status == 201, queries
+
+    def toggle(self):
+        candidates = self.created_ids or self.seen_ids
+        if not candidates:
+            return None
+        task_id = self.rng.choice(candidates)
+        status, _, queries = self.transport.call(
+            'PATCH', f'/api/tasks/{task_id}/', {'completed': self.rng.random() < 0.5}, token=self.access
+        )
+        return status == 200, queries
+
+    def delete(self):
+        if not self.created_ids:
+            return None
+        task_id = self.created_ids.pop()
+        status, _, queries = self.transport.call('DELETE', f'/api/tasks/{task_id}/', token=self.access)
+        return status == 204, queries
+
+    def refresh(self):
+        status, body, queries = self.transport.call(
+            'POST', '/api/auth/refresh/', {'refresh': self.refresh_token}
+        )
+        if status == 200:
+            self.access = body['access']
+            self.refresh_token = body.get('refresh', self.refresh_token)
+        return status == 200, queries
+
+
+def load(make_transport, emails, mix, duration, seed):
+    """
+    Ejecuta un cliente por email durante duration segundos. Retorna
+    ({operación: [(segundos, éxito, consultas)]}, segundos transcurridos).
+    """
+    from django.conf import settings
+
+    page_size = settings.REST_FRAMEWORK['PAGE_SIZE']
+    names, weights = list(mix), list(mix.values())
+    samples = {name: [] for name in Session.operations}
+    lock = threading.Lock()
+    stop_at = time.perf_counter() + duration
+
+    def client(index, email):
+        rng = random.Random(seed + index)
+        transport = make_transport()
+        session = Session(transport, email, rng, page_size)
+        own = {name: [] for name in Session.operations}
+        operation = 'login'
+        try:
+            while time.perf_counter() < stop_at:
+                start = time.perf_counter()
+                result = getattr(session, operation)()
+                if result is not None:
+                    own[operation].append((time.perf_counter() - start, *result))
+                operation = rng.choices(names, weights)[0]
+        finally:
+            transport.close()
+        with lock:
+            for name, values in own.items():
+                samples[name].extend(values)
+
+    start = time.perf_counter()
+    threads = [
+        threading.Thread(target=client, args=(index, email))
+        for index, email in enumerate(emails)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return samples, time.perf_counter() - start
+
+
+def report(samples, elapsed):
+    """
+    Resume las muestras por operación.
+    """
+    results = {}
+    for name, values in samples.items():
+        if not values:
+            continue
+        stats = summarize([seconds for seconds, _, _ in values])
+        queries = [count for _, _, count in values if count is not None]
+        results[name] = {
+            'n': stats['n'],
+            'errors': sum(not ok for _, ok, _ in values),
+            'rps': round(stats['n'] / elapsed, 2),
+            'p50_ms': round(stats['p50_ms'], 2),
+            'p95_ms': round(stats['p95_ms'], 2),
+            'p99_ms': round(stats['p99_ms'], 2),
+            'queries': round(sum(queries) / len(queries), 2) if queries else None,
+        }
+    return results
+
+
+def check(results, baseline, args):
+    """
+    Retorna la lista de fallas: errores, p95 de CRUD sobre el objetivo y
+    regresiones contra la línea base.
+    """
+    failures = []
+    for name, result in results.items():
+        if result['errors']:
+            failures.append(f'{name}: {result["errors"]} peticiones fallidas')
+        if name in CRUD and result['p95_ms'] > args.target_ms:
+            failures.append(f'{name}: p95 {result["p95_ms"]} ms supera el objetivo de {args.target_ms} ms')
+
+    for name, before in (baseline or {}).get('endpoints', {}).items():
+        after = results.get(name)
+        if after is None:
+            continue
+        limit = before['p95_ms'] * (1 + args.threshold)
+        if after['p95_ms'] > limit and after['p95_ms'] - before['p95_ms'] > args.min_delta_ms:
+            failures.append(
+                f'{name}: p95 {after["p95_ms"]} ms, línea base {before["p95_ms"]} ms '
+                f'(+{args.threshold:.0%} permitido)'
+            )
+        if None not in (before['queries'], after['queries']) and after['queries'] > before['queries'] + 0.5:
+            failures.append(
+                f'{name}: {after["queries"]} consultas por petición, línea base {before["queries"]}'
+            )
+    return failures
+
+
+def run(args):
+    mix = args.mix
+    baseline = json.loads(Path(args.baseline).read_text()) if args.baseline else None
+
+    with tempfile.TemporaryDirectory() as directory:
+        env = {
+            'DATABASE_URL': args.database_url or f'sqlite:///{Path(directory) / "load.sqlite3"}',
+            'DEBUG': 'False',
+            'ALLOWED_HOSTS': '127.0.0.1,testserver',
+        }
+        if args.no_cache:
+            env['TASKS_CACHE_TIMEOUT'] = '0'
+        emails = prepare_database(env, args.clients, args.tasks)
+        from django.db import connection
+
+        vendor = connection.vendor
+        connection.close()
+
+        if args.server:
+            port = free_port()
+            server_env = {**env, 'SQL_PROFILING': 'True', 'SQL_PROFILING_SLOW_MS': '60000'}
+            server = start_server(PROFILES['wsgi'], port, args.workers, server_env)
+            try:
+                samples, elapsed = load(lambda: HTTPTransport(port), emails, mix, args.duration, args.seed)
+            finally:
+                server.terminate()
+                server.wait()
+        else:
+            samples, elapsed = load(InProcessTransport, emails, mix, args.duration, args.seed)
+
+    results = report(samples, elapsed)
+    print(
+        f'{"servidor" if args.server else "en proceso"}, {vendor}, {args.clients} clientes, '
+        f'{args.duration} s, {args.tasks} tareas por usuario'
+    )
+    print_table(
+        ('operación', 'n', 'errores', 'req/s', 'p50 ms', 'p95 ms', 'p99 ms', 'consultas'),
+        [
+            (name, result['n'], result['errors'], result['rps'], result['p50_ms'],
+             result['p95_ms'], result['p99_ms'], '-' if result['queries'] is None else result['queries'])
+            for name, result in results.items()
+        ],
+    )
+
+    if args.save:
+        path = Path(args.save)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps({
+            'meta': {
+                'created_at': datetime.now(timezone.utc).isoformat(),
+                'mode': 'server' if args.server else 'inprocess',
+                'database': vendor,
+                'clients': args.clients,
+                'duration': args.duration,
+                'tasks': args.tasks,
+                'mix': mix,
+                'python': platform.python_version(),
+                'cpus': os.cpu_count(),
+            },
+            'endpoints': results,
+        }, indent=2) + '\n')
+        print(f'Línea base guardada en {path}')
+
+    failures = check(results, baseline, args)
+    for failure in failures:
+        print(f'FALLA {failure}')
+    return 1 if failures else 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--clients', type=int, default=10, help='Clientes concurrentes')
+    parser.add_argument('--duration', type=float, default=20, help='Segundos de carga')
+    parser.add_argument('--tasks', type=int, default=500, help='Tareas sembradas por usuario')
+    parser.add_argument('--mix', type=parse_mix, default=DEFAULT_MIX, help=f'Pesos de las operaciones (por defecto {DEFAULT_MIX})')
+    parser.add_argument('--seed', type=int, default=1, help='Semilla de la secuencia de operaciones')
+    parser.add_argument('--server', action='store_true', help='Levanta gunicorn y envía las peticiones por HTTP')
+    parser.add_argument('--workers', type=int, default=3, help='Workers de gunicorn con --server')
+    parser.add_argument('--database-url', default=None, help='Base de datos desechable (por defecto SQLite temporal)')
+    parser.add_argument('--no-cache', action='store_true', help='Desactiva la caché de respuestas de tareas')
+    parser.add_argument('--save', default=None, help='Guarda los resultados como línea base JSON')
+    parser.add_argument('--baseline', default=None, help='Línea base JSON contra la que comparar')
+    parser.add_argument('--threshold', type=float, default=0.2, help='Empeoramiento de p95 permitido (por defecto 0.2)')
+    parser.add_argument('--min-delta-ms', type=float, default=5,
+                        help='Diferencia mínima de p95 para considerar una regresión (por defecto 5 ms)')
+    parser.add_argument('--target-ms', type=float, default=500,
+                        help='p95 máximo de las operaciones CRUD (por defecto 500 ms, RNF-01)')
+    args = parser.parse_args(argv)
+    return run(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
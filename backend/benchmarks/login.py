@@ -0,0 +1,163 @@
+"""
+Benchmark: logins por segundo y por núcleo según la política de hashing.
+
+Para cada configuración crea un usuario con la contraseña hasheada con ella
+y ejecuta logins correctos contra POST /api/auth/login/ desde --threads
+hilos durante --duration segundos. Reporta el tiempo de un hash, los
+logins/s, los logins/s por núcleo (dividido entre los núcleos que los
+hilos pueden ocupar) y la latencia p50/p99.
+
+    python -m benchmarks.login --threads 2 --duration 5
+
+Las configuraciones con argon2 o bcrypt se omiten si su biblioteca no
+está instalada. Con --threads mayor que PASSWORD_HASH_WORKERS los logins
+esperan turno en el pool de hashing.
+"""
+import argparse
+import os
+import threading
+import time
+
+from .common import benchmark_database, print_table, setup_django, summarize
+
+CONFIGURATIONS = {
+    'pbkdf2-1M': {'PASSWORD_HASHER': 'pbkdf2_sha256', 'PASSWORD_HASH_ITERATIONS': 1_000_000},
+    'pbkdf2-600k': {'PASSWORD_HASHER': 'pbkdf2_sha256', 'PASSWORD_HASH_ITERATIONS': 600_000},
+    'pbkdf2-300k': {'PASSWORD_HASHER': 'pbkdf2_sha256', 'PASSWORD_HASH_ITERATIONS': 300_000},
+    'scrypt-2^14': {'PASSWORD_HASHER': 'scrypt', 'PASSWORD_HASH_SCRYPT_WORK_FACTOR': 2**14},
+    'argon2': {'PASSWORD_HASHER': 'argon2'},
+    'bcrypt': {'PASSWORD_HASHER': 'bcrypt_sha256'},
+}
+
+
+def hasher_settings(options):
+    """
+    Retorna los settings de hashing de una configuración, con el hasher
+    elegido primero en PASSWORD_HASHERS como lo arma config.settings.
+    """
+    from django.conf import settings
+
+    preferred = {
+        'pbkdf2_sha256': 'authentication.hashers.PBKDF2PasswordHasher',
+        'scrypt': 'authentication.hashers.ScryptPasswordHasher',
+        'argon2': 'django.contrib.auth.hashers.Argon2PasswordHasher',
+        'bcrypt_sha256': 'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+    }[options['PASSWORD_HASHER']]
+    hashers = [preferred] + [path for path in settings.PASSWORD_HASHERS if path != preferred]
+    return {
+        'PASSWORD_HASHERS': hashers,
+        **{key: value for key, value in options.items() if key != 'PASSWORD_HASHER'},
+    }
+
+
+def available(options):
+    from django.contrib.auth.hashers import make_password
+    from django.test.utils import override_settings
+
+    try:
+        with override_settings(**hasher_settings(options)):
+            make_password('benchpass123')
+    except ValueError:
+        # Argon2 y bcrypt lanzan ValueError si falta su biblioteca.
+        return False
+    return True
+
+
+def load(threads, duration, email):
+    """
+    Ejecuta logins desde threads hilos durante duration segundos. Retorna
+    (latencias, errores, segundos transcurridos).
+    """
+    from rest_framework.test import APIClient
+
+    latencies, errors = [], []
+    lock = threading.Lock()
+    stop_at = time.perf_counter() + duration
+    credentials = {'email': email, 'password': 'benchpass123'}
+
+    def client():
+        api = APIClient()
+        own_latencies, own_errors = [], 0
+        while time.perf_counter() < stop_at:
+            start = time.perf_counter()
+            response = api.post('/api/auth/login/', credentials, format='json')
+            own_latencies.append(time.perf_counter() - start)
+            own_errors += response.status_code != 200
+        with lock:
+            latencies.extend(own_latencies)
+            errors.append(own_errors)
+
+    start = time.perf_counter()
+    workers = [threading.Thread(target=client) for _ in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return latencies, sum(errors), time.perf_counter() - start
+
+
+def run(args):
+    from django.contrib.auth import get_user_model
+    from django.contrib.auth.hashers import make_password
+    from django.test.utils import override_settings
+    from rest_framework.test import APIClient
+
+    cores = min(args.threads, os.cpu_count() or 1)
+    rows = []
+    for name in args.configurations.split(','):
+        options = CONFIGURATIONS[name]
+        if not available(options):
+            print(f'{name}: biblioteca no instalada, se omite')
+            continue
+        with override_settings(**hasher_settings(options)):
+            start = time.perf_counter()
+            make_password('benchpass123')
+            hash_ms = (time.perf_counter() - start) * 1000
+
+            email = f'bench-{name}@example.com'
+            get_user_model().objects.create_user(
+                email=email,
+                password='benchpass123',
+                first_name='Bench',
+                last_name='User',
+            )
+            # Calentamiento
+            APIClient().post('/api/auth/login/', {'email': email, 'password': 'benchpass123'}, format='json')
+            latencies, errors, elapsed = load(args.threads, args.duration, email)
+
+        stats = summarize(latencies)
+        throughput = stats['n'] / elapsed
+        rows.append((
+            name,
+            f'{hash_ms:.1f}',
+            stats['n'],
+            errors,
+            f'{throughput:.1f}',
+            f'{throughput / cores:.1f}',
+            f'{stats["p50_ms"]:.1f}',
+            f'{stats["p99_ms"]:.1f}',
+        ))
+
+    print(f'{args.threads} hilos en {cores} núcleos, {args.duration} s por configuración')
+    print_table(
+        ('configuración', 'hash ms', 'logins', 'errores', 'logins/s', 'logins/s/núcleo',
+         'p50 ms', 'p99 ms'),
+        rows,
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--threads', type=int, default=1, help='Hilos que ejecutan logins')
+    parser.add_argument('--duration', type=float, default=5, help='Segundos por configuración')
+    parser.add_argument('--configurations', default=','.join(CONFIGURATIONS),
+                        help='Configuraciones a comparar')
+    args = parser.parse_args(argv)
+
+    setup_django()
+    with benchmark_database():
+        run(args)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,118 @@
+"""
+Benchmark: paginación por número de página vs. paginación por cursor.
+
+Mide la latencia de GET /api/tasks/ en la primera página y en una página
+profunda (por defecto la 500) en ambos modos:
+
+    python -m benchmarks.pagination --page 500 --repeat 30
+"""
+import argparse
+from datetime import timedelta
+
+from tasks.utils import explicit_timestamps
+
+from .common import (
+    benchmark_database,
+    count_queries,
+    print_table,
+    setup_django,
+    summarize,
+    time_call,
+)
+
+
+def seed(user, total, batch_size=5000):
+    """
+    Crea total tareas para user con fechas de creación escalonadas.
+    """
+    from django.utils import timezone
+    from tasks.models import Task
+
+    now = timezone.now()
+    with explicit_timestamps(Task, 'created_at', 'updated_at'):
+        for start in range(0, total, batch_size):
+            Task.objects.bulk_create([
+                Task(
+                    user=user,
+                    title=f'Tarea {index}',
+                    description='Tarea generada para benchmark',
+                    created_at=now - timedelta(seconds=index),
+                    updated_at=now - timedelta(seconds=index),
+                )
+                for index in range(start, min(start + batch_size, total))
+            ])
+
+
+def cursor_url_for_page(client, page):
+    """
+    Recorre los enlaces next hasta obtener la URL de la página indicada.
+    """
+    url = '/api/tasks/?pagination=cursor'
+    for _ in range(page - 1):
+        url = client.get(url).data['next']
+    return url
+
+
+def run(args):
+    from django.conf import settings
+    from django.contrib.auth import get_user_model
+    from rest_framework.test import APIClient
+
+    page_size = settings.REST_FRAMEWORK['PAGE_SIZE']
+    total = args.tasks or args.page * page_size
+
+    user = get_user_model().objects.create_user(
+        email='bench@example.com',
+        password='benchpass123',
+        first_name='Bench',
+        last_name='User',
+    )
+    seed(user, total)
+
+    client = APIClient()
+    client.force_authenticate(user=user)
+
+    scenarios = [
+        ('page', 1, '/api/tasks/?page=1'),
+        ('page', args.page, f'/api/tasks/?page={args.page}'),
+        ('cursor', 1, '/api/tasks/?pagination=cursor'),
+        ('cursor', args.page, cursor_url_for_page(client, args.page)),
+    ]
+
+    rows = []
+    for mode, page, url in scenarios:
+        response = client.get(url)
+        assert response.status_code == 200, (url, response.status_code)
+        queries = count_queries(lambda: client.get(url))
+        stats = summarize(time_call(lambda: client.get(url), args.repeat))
+        rows.append((
+            mode,
+            page,
+            queries,
+            f"{stats['p50_ms']:.2f}",
+            f"{stats['p95_ms']:.2f}",
+        ))
+
+    print(f'{total} tareas, {page_size} por página, {args.repeat} repeticiones')
+    print_table(('modo', 'página', 'consultas', 'p50 ms', 'p95 ms'), rows)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--page', type=int, default=500, help='Página profunda a medir')
+    parser.add_argument('--tasks', type=int, default=None,
+                        help='Tareas a sembrar (por defecto page * PAGE_SIZE)')
+    parser.add_argument('--repeat', type=int, default=30, help='Repeticiones por escenario')
+    args = parser.parse_args(argv)
+
+    setup_django()
+    from django.test.utils import override_settings
+
+    # Sin la caché de respuestas, que respondería todas las peticiones
+    # medidas sin tocar la base de datos.
+    with benchmark_database(), override_settings(TASKS_CACHE_TIMEOUT=0):
+        run(args)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,92 @@
+"""
+Benchmark: latencia de POST /api/auth/register/.
+
+Registra --users usuarios nuevos con APIClient y reporta la latencia del
+primer registro del proceso (incluye cargas perezosas como la lista de
+contraseñas comunes), la latencia p50/p95/p99 de los siguientes y las
+consultas SQL por registro. Al final registra --duplicates veces un email
+existente para medir el rechazo.
+
+    python -m benchmarks.registration --users 500
+
+El hash de la contraseña domina la latencia con el costo de producción,
+así que por defecto se usa MD5PasswordHasher (solo en el benchmark) para
+medir el resto del camino: validación y base de datos. Con
+--production-hash se usan los PASSWORD_HASHERS configurados.
+"""
+import argparse
+import time
+
+from .common import benchmark_database, print_table, setup_django, summarize
+
+
+def register(client, email):
+    start = time.perf_counter()
+    response = client.post('/api/auth/register/', {
+        'email': email,
+        'password': 'benchpass123',
+        'password_confirm': 'benchpass123',
+        'first_name': 'Bench',
+        'last_name': 'User',
+    }, format='json')
+    return time.perf_counter() - start, response.status_code
+
+
+def run(args):
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+    from rest_framework.test import APIClient
+
+    client = APIClient()
+    rows = []
+
+    first, status_code = register(client, 'bench-0@example.com')
+    assert status_code == 201, status_code
+    rows.append(('primer registro', 1, f'{first * 1000:.1f}', '', '', ''))
+
+    with CaptureQueriesContext(connection) as queries:
+        register(client, 'bench-queries@example.com')
+    queries_per_registration = len(queries.captured_queries)
+
+    latencies = []
+    for index in range(1, args.users + 1):
+        elapsed, status_code = register(client, f'bench-{index}@example.com')
+        assert status_code == 201, status_code
+        latencies.append(elapsed)
+    stats = summarize(latencies)
+    rows.append(('registro', stats['n'], f'{stats["p50_ms"]:.1f}', f'{stats["p95_ms"]:.1f}',
+                 f'{stats["p99_ms"]:.1f}', queries_per_registration))
+
+    latencies = []
+    for _ in range(args.duplicates):
+        elapsed, status_code = register(client, 'bench-1@example.com')
+        assert status_code == 400, status_code
+        latencies.append(elapsed)
+    stats = summarize(latencies)
+    rows.append(('email duplicado', stats['n'], f'{stats["p50_ms"]:.1f}', f'{stats["p95_ms"]:.1f}',
+                 f'{stats["p99_ms"]:.1f}', ''))
+
+    print(f'{args.users} registros')
+    print_table(('caso', 'n', 'p50 ms', 'p95 ms', 'p99 ms', 'consultas'), rows)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--users', type=int, default=500, help='Registros a medir')
+    parser.add_argument('--duplicates', type=int, default=100, help='Registros con email duplicado')
+    parser.add_argument('--production-hash', action='store_true',
+                        help='Usa PASSWORD_HASHERS en lugar de MD5PasswordHasher')
+    args = parser.parse_args(argv)
+
+    setup_django()
+    from django.test.utils import override_settings
+
+    overrides = {}
+    if not args.production_hash:
+        overrides['PASSWORD_HASHERS'] = ['django.contrib.auth.hashers.MD5PasswordHasher']
+    with benchmark_database(), override_settings(**overrides):
+        run(args)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,129 @@
+"""
+Benchmark: búsqueda de texto completo vs. LIKE '%término%'.
+
+Siembra tareas con títulos y descripciones aleatorias (por defecto un
+millón, repartidas entre varios usuarios) y compara:
+
+- fts: TaskQuerySet.search sobre todas las tareas (buscador del admin).
+- like: icontains sobre title y description (el buscador anterior del admin).
+- api: GET /api/tasks/?q= de un usuario, con ranking y paginación.
+
+    python -m benchmarks.search --tasks 1000000 --repeat 20
+"""
+import argparse
+import random
+
+from .common import (
+    benchmark_database,
+    count_queries,
+    print_table,
+    setup_django,
+    summarize,
+    time_call,
+)
+
+VOCABULARY_SIZE = 5000
+
+
+def vocabulary():
+    """
+    Palabras sintéticas; cada una aparece en una fracción pequeña de las tareas.
+    """
+    syllables = ('ca', 'lo', 'mi', 'ter', 'san', 'po', 'du', 're', 'ven', 'li')
+    words = set()
+    rng = random.Random(1)
+    while len(words) < VOCABULARY_SIZE:
+        words.add(''.join(rng.choice(syllables) for _ in range(rng.randint(2, 4))))
+    return sorted(words)
+
+
+def seed(users, total, words, batch_size=5000):
+    """
+    Crea total tareas repartidas entre users con textos aleatorios.
+    """
+    from tasks.models import Task
+
+    rng = random.Random(2)
+    for start in range(0, total, batch_size):
+        Task.objects.bulk_create([
+            Task(
+                user=users[index % len(users)],
+                title=' '.join(rng.choices(words, k=4)),
+                description=' '.join(rng.choices(words, k=12)),
+            )
+            for index in range(start, min(start + batch_size, total))
+        ])
+
+
+def run(args):
+    from django.contrib.auth import get_user_model
+    from django.db.models import Q
+    from rest_framework.test import APIClient
+    from tasks.cache import get_cache
+    from tasks.models import Task, TaskStats
+
+    User = get_user_model()
+    users = [
+        User.objects.create_user(
+            email=f'bench{index}@example.com',
+            password='benchpass123',
+            first_name='Bench',
+            last_name='User',
+        )
+        for index in range(args.users)
+    ]
+    words = vocabulary()
+    seed(users, args.tasks, words)
+    for user in users:
+        TaskStats.recompute(user.pk)
+
+    term = words[len(words) // 2]
+    client = APIClient()
+    client.force_authenticate(user=users[0])
+
+    def fts():
+        queryset = Task.objects.search(term, ranked=False)
+        return queryset.count(), list(queryset.order_by('-created_at', '-id')[:20])
+
+    def like():
+        queryset = Task.objects.filter(Q(title__icontains=term) | Q(description__icontains=term))
+        return queryset.count(), list(queryset.order_by('-created_at', '-id')[:20])
+
+    def api():
+        response = client.get('/api/tasks/', {'q': term})
+        assert response.status_code == 200, response.status_code
+        # Cada repetición debe consultar la base de datos, no la caché.
+        get_cache().clear()
+
+    scenarios = [('fts', fts), ('like', like), ('api', api)]
+    rows = []
+    for name, func in scenarios:
+        queries = count_queries(func)
+        stats = summarize(time_call(func, args.repeat))
+        rows.append((
+            name,
+            queries,
+            f"{stats['p50_ms']:.2f}",
+            f"{stats['p95_ms']:.2f}",
+        ))
+
+    matches = Task.objects.search(term, ranked=False).count()
+    print(f'{args.tasks} tareas, {args.users} usuarios, término "{term}" ({matches} coincidencias), '
+          f'{args.repeat} repeticiones')
+    print_table(('escenario', 'consultas', 'p50 ms', 'p95 ms'), rows)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--tasks', type=int, default=1_000_000, help='Tareas a sembrar')
+    parser.add_argument('--users', type=int, default=100, help='Usuarios entre los que se reparten')
+    parser.add_argument('--repeat', type=int, default=20, help='Repeticiones por escenario')
+    args = parser.parse_args(argv)
+
+    setup_django()
+    with benchmark_database():
+        run(args)
+
+
+if __name__ == '__main__':
+    main()
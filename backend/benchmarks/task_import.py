@@ -0,0 +1,147 @@
+"""
+Benchmark: importación incremental de tareas.
+
+Genera un archivo NDJSON y uno CSV con tareas sintéticas (por defecto
+100.000, una de cada diez inválida) y mide para POST /api/tasks/import/ el
+tiempo total, el rendimiento en filas/s y MB/s y el pico de memoria de
+Python (tracemalloc). El cuerpo se lee desde un archivo temporal, como lo
+entregaría el servidor WSGI, por lo que el pico no incluye el archivo.
+
+    python -m benchmarks.task_import --tasks 100000
+
+Con --bulk se agrega como referencia la misma carga enviada a
+POST /api/tasks/bulk/ en lotes de TASKS_BULK_MAX_ITEMS.
+"""
+import argparse
+import csv
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+
+from .common import benchmark_database, print_table, setup_django
+
+
+def write_rows(path, export_format, total):
+    """
+    Escribe total filas en path; una de cada diez tiene el título vacío.
+    """
+    with open(path, 'w', encoding='utf-8', newline='') as output:
+        writer = csv.writer(output) if export_format == 'csv' else None
+        if writer:
+            writer.writerow(('title', 'description', 'completed'))
+        for index in range(total):
+            row = {
+                'title': '' if index % 10 == 9 else f'Tarea importada {index}',
+                'description': f'Descripción de la tarea {index}, con algo de texto',
+                'completed': index % 3 == 0,
+            }
+            if writer:
+                writer.writerow((row['title'], row['description'], str(row['completed']).lower()))
+            else:
+                output.write(json.dumps(row, ensure_ascii=False) + '\n')
+
+
+def post_file(view, user, path, content_type):
+    """
+    Envía el archivo como cuerpo de la petición sin cargarlo en memoria.
+    """
+    from django.core.handlers.wsgi import LimitedStream
+    from rest_framework.test import APIRequestFactory, force_authenticate
+
+    size = os.path.getsize(path)
+    with open(path, 'rb') as body:
+        request = APIRequestFactory().post('/api/tasks/import/', b'', content_type=content_type)
+        request.META['CONTENT_LENGTH'] = str(size)
+        request._stream = LimitedStream(body, size)
+        force_authenticate(request, user=user)
+        response = view(request)
+    assert response.status_code == 201, response.status_code
+    return response.data
+
+
+def run(args):
+    from django.conf import settings
+    from django.contrib.auth import get_user_model
+    from rest_framework.test import APIClient
+    from tasks.models import Task
+    from tasks.views import TaskViewSet
+
+    user = get_user_model().objects.create_user(
+        email='bench@example.com',
+        password='benchpass123',
+        first_name='Bench',
+        last_name='User',
+    )
+    view = TaskViewSet.as_view({'post': 'import_tasks'}, **TaskViewSet.import_tasks.kwargs)
+
+    rows = []
+    with tempfile.TemporaryDirectory() as directory:
+        for export_format, content_type in (('ndjson', 'application/x-ndjson'), ('csv', 'text/csv')):
+            path = os.path.join(directory, f'tareas.{export_format}')
+            write_rows(path, export_format, args.tasks)
+            size = os.path.getsize(path)
+
+            Task.objects.all().delete()
+            start = time.perf_counter()
+            data = post_file(view, user, path, content_type)
+            total = time.perf_counter() - start
+
+            Task.objects.all().delete()
+            tracemalloc.start()
+            post_file(view, user, path, content_type)
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+            rows.append((
+                export_format,
+                data['accepted'],
+                data['rejected'],
+                f'{total:.2f}',
+                f'{args.tasks / total:,.0f}',
+                f'{size / total / 1024 / 1024:.1f}',
+                f'{peak / 1024 / 1024:.1f}',
+            ))
+
+    if args.bulk:
+        client = APIClient()
+        client.force_authenticate(user=user)
+        batch_size = settings.TASKS_BULK_MAX_ITEMS
+        Task.objects.all().delete()
+        accepted = rejected = 0
+        start = time.perf_counter()
+        for offset in range(0, args.tasks, batch_size):
+            items = [
+                {'title': '' if index % 10 == 9 else f'Tarea importada {index}',
+                 'description': f'Descripción de la tarea {index}, con algo de texto',
+                 'completed': index % 3 == 0}
+                for index in range(offset, min(offset + batch_size, args.tasks))
+            ]
+            data = client.post('/api/tasks/bulk/', items, format='json').data
+            accepted += data['succeeded']
+            rejected += data['failed']
+        total = time.perf_counter() - start
+        rows.append(('bulk', accepted, rejected, f'{total:.2f}', f'{args.tasks / total:,.0f}', '-', '-'))
+
+    print(f'{args.tasks} filas')
+    print_table(
+        ('formato', 'aceptadas', 'rechazadas', 'total s', 'filas/s', 'MB/s', 'pico Python MB'),
+        rows,
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--tasks', type=int, default=100_000, help='Filas a importar')
+    parser.add_argument('--bulk', action='store_true',
+                        help='Incluye /api/tasks/bulk/ en lotes como referencia')
+    args = parser.parse_args(argv)
+
+    setup_django()
+    with benchmark_database():
+        run(args)
+
+
+if __name__ == '__main__':
+    main()
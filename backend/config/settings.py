@@ -12,6 +12,7 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 
 from pathlib import Path
 from decouple import config
+from django.core.exceptions import ImproperlyConfigured
 import dj_database_url
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -46,9 +47,14 @@ INSTALLED_APPS = [
     # Local apps
     'authentication',
     'tasks',
+    'diagnostics',
 ]
 
 MIDDLEWARE = [
+    # Primeros, para medir toda la petición
+    'diagnostics.middleware.MetricsMiddleware',
+    'diagnostics.middleware.SQLProfilingMiddleware',
+    'diagnostics.middleware.MemoryTrackingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',  # CORS debe ir antes de CommonMiddleware
@@ -57,6 +63,8 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    # Después de la autenticación por sesión, para reconocer al staff del admin
+    'diagnostics.middleware.ProfilingMiddleware',
 ]
 
 ROOT_URLCONF = 'config.urls'
@@ -77,6 +85,11 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'config.wsgi.application'
+ASGI_APPLICATION = 'config.asgi.application'
+
+# Servidor de producción: 'wsgi' (gunicorn con workers síncronos) o 'asgi'
+# (gunicorn con workers de uvicorn). Lo lee también entrypoint.sh.
+SERVER_MODE = config('SERVER_MODE', default='wsgi')
 
 
 # Database
@@ -89,7 +102,12 @@ DATABASE_URL = config('DATABASE_URL', default=None)
 if DATABASE_URL:
     # Usa PostgreSQL si DATABASE_URL está configurado
     DATABASES = {
-        'default': dj_database_url.parse(DATABASE_URL, conn_max_age=600)
+        # Con ASGI cada petición ejecuta el ORM en su propio hilo, por lo que
+        # las conexiones persistentes no se reutilizarían entre peticiones.
+        'default': dj_database_url.parse(
+            DATABASE_URL,
+            conn_max_age=0 if SERVER_MODE == 'asgi' else 600,
+        )
     }
 else:
     # Fallback a SQLite para desarrollo local
@@ -100,6 +118,51 @@ else:
         }
     }
 
+# En SQLite las transacciones toman el bloqueo de escritura al comenzar
+# (BEGIN IMMEDIATE): con varios workers o hilos, una transacción que lee y
+# luego escribe espera a las demás en lugar de fallar con "database is
+# locked" al intentar subir su bloqueo.
+if DATABASES['default']['ENGINE'] == 'django.db.backends.sqlite3':
+    DATABASES['default'].setdefault('OPTIONS', {})['transaction_mode'] = 'IMMEDIATE'
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+
+# Por defecto se usa la memoria local del proceso, acotada por
+# CACHE_MAX_ENTRIES y con desalojo LRU. Si REDIS_URL está definido se usa
+# Redis (o cualquier servidor compatible); con CACHE_DIR, el backend de
+# archivos, útil para compartir la caché entre procesos de una misma máquina.
+CACHE_MAX_ENTRIES = config('CACHE_MAX_ENTRIES', default=5000, cast=int)
+REDIS_URL = config('REDIS_URL', default=None)
+CACHE_DIR = config('CACHE_DIR', default=None)
+
+if REDIS_URL:
+    # Requiere el paquete redis; el límite de memoria y la política LRU se
+    # configuran en el servidor (maxmemory y maxmemory-policy allkeys-lru).
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+elif CACHE_DIR:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': CACHE_DIR,
+            'OPTIONS': {'MAX_ENTRIES': CACHE_MAX_ENTRIES},
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'fidenza',
+            'OPTIONS': {'MAX_ENTRIES': CACHE_MAX_ENTRIES},
+        }
+    }
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -115,13 +178,40 @@ AUTH_PASSWORD_VALIDATORS = [
         }
     },
     {
-        'NAME': 'django.contrib.auth.password_validation.CommonPasswordValidator',
+        # Lista de contraseñas comunes cargada al iniciar en un frozenset
+        'NAME': 'authentication.password_validation.CommonPasswordValidator',
     },
     {
         'NAME': 'django.contrib.auth.password_validation.NumericPasswordValidator',
     },
 ]
 
+# Password hashing
+# https://docs.djangoproject.com/en/5.2/topics/auth/passwords/
+#
+# PASSWORD_HASHER elige el algoritmo de los hashes nuevos: pbkdf2_sha256,
+# scrypt, argon2 (requiere argon2-cffi) o bcrypt_sha256 (requiere bcrypt).
+# Los demás se conservan para verificar los hashes existentes, que se
+# recalculan con el algoritmo y costo configurados en el siguiente login.
+PASSWORD_HASHER = config('PASSWORD_HASHER', default='pbkdf2_sha256')
+PASSWORD_HASH_ITERATIONS = config('PASSWORD_HASH_ITERATIONS', default=1_000_000, cast=int)
+PASSWORD_HASH_SCRYPT_WORK_FACTOR = config('PASSWORD_HASH_SCRYPT_WORK_FACTOR', default=2**14, cast=int)
+# Hilos por proceso que calculan hashes (ver authentication.hashers)
+PASSWORD_HASH_WORKERS = config('PASSWORD_HASH_WORKERS', default=2, cast=int)
+
+_PASSWORD_HASHERS = {
+    'pbkdf2_sha256': 'authentication.hashers.PBKDF2PasswordHasher',
+    'scrypt': 'authentication.hashers.ScryptPasswordHasher',
+    'argon2': 'django.contrib.auth.hashers.Argon2PasswordHasher',
+    'bcrypt_sha256': 'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+}
+if PASSWORD_HASHER not in _PASSWORD_HASHERS:
+    raise ImproperlyConfigured(
+        f'PASSWORD_HASHER={PASSWORD_HASHER!r} no es válido; '
+        f'opciones: {", ".join(sorted(_PASSWORD_HASHERS))}.'
+    )
+PASSWORD_HASHERS = [_PASSWORD_HASHERS.pop(PASSWORD_HASHER), *_PASSWORD_HASHERS.values()]
+
 
 # Internationalization
 # https://docs.djangoproject.com/en/5.2/topics/i18n/
@@ -157,7 +247,7 @@ AUTH_USER_MODEL = 'authentication.User'
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'authentication.authentication.CachedJWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
@@ -167,6 +257,29 @@ REST_FRAMEWORK = {
 }
 
 
+# Configuración de la app de tareas
+# Máximo de elementos aceptados por los endpoints /api/tasks/bulk/
+TASKS_BULK_MAX_ITEMS = config('TASKS_BULK_MAX_ITEMS', default=100, cast=int)
+# Filas leídas y escritas por lote en /api/tasks/export/
+TASKS_EXPORT_CHUNK_SIZE = config('TASKS_EXPORT_CHUNK_SIZE', default=2000, cast=int)
+# Filas por bulk_create y máximo de errores reportados en /api/tasks/import/
+TASKS_IMPORT_BATCH_SIZE = config('TASKS_IMPORT_BATCH_SIZE', default=1000, cast=int)
+TASKS_IMPORT_MAX_ERRORS = config('TASKS_IMPORT_MAX_ERRORS', default=100, cast=int)
+# Alias de CACHES y segundos de vida de las respuestas cacheadas de /api/tasks/
+TASKS_CACHE_ALIAS = config('TASKS_CACHE_ALIAS', default='default')
+TASKS_CACHE_TIMEOUT = config('TASKS_CACHE_TIMEOUT', default=300, cast=int)
+# Workers del servidor (entrypoint.sh lo exporta). Con más de uno la caché
+# de respuestas requiere un backend compartido: REDIS_URL o CACHE_DIR.
+WEB_WORKERS = config('WEB_WORKERS', default=1, cast=int)
+# Segundos que /api/tasks/changes/ espera antes de entregar un cambio.
+# updated_at se asigna antes del commit: una escritura confirmada después
+# de una sincronización con un updated_at menor que el token se perdería.
+# Debe superar la duración de las transacciones que escriben tareas.
+TASKS_CHANGES_LAG_SECONDS = config('TASKS_CHANGES_LAG_SECONDS', default=5, cast=float)
+# Días que una tarea eliminada permanece en Task antes de poder archivarse.
+# Los tokens de /api/tasks/changes/ emitidos antes retornan 410.
+TASKS_ARCHIVE_RETENTION_DAYS = config('TASKS_ARCHIVE_RETENTION_DAYS', default=30, cast=int)
+
 # Simple JWT Configuration
 # https://django-rest-framework-simplejwt.readthedocs.io/en/latest/settings.html
 
@@ -177,7 +290,7 @@ SIMPLE_JWT = {
     'REFRESH_TOKEN_LIFETIME': timedelta(days=7),  # Refresh token válido por 7 días
     'ROTATE_REFRESH_TOKENS': True,  # Genera nuevo refresh token en cada refresh
     'BLACKLIST_AFTER_ROTATION': True,  # Invalida el refresh token anterior
-    'UPDATE_LAST_LOGIN': True,  # Actualiza last_login del usuario
+    'UPDATE_LAST_LOGIN': False,  # last_login se escribe por lotes (ver LAST_LOGIN_FLUSH_INTERVAL)
     'ALGORITHM': 'HS256',  # Algoritmo de encriptación
     'SIGNING_KEY': SECRET_KEY,  # Usa la SECRET_KEY de Django
     'AUTH_HEADER_TYPES': ('Bearer',),  # Tipo de header: Authorization: Bearer <token>
@@ -186,6 +299,79 @@ SIMPLE_JWT = {
     'USER_ID_CLAIM': 'user_id',  # Claim del JWT que contiene el user_id
 }
 
+# Caché por proceso de CachedJWTAuthentication: segundos que se reutilizan
+# un usuario o un token verificado (0 la desactiva) y entradas máximas de
+# cada una. Es también el máximo que otro worker tarda en ver un cambio de
+# contraseña o de is_active.
+AUTH_CACHE_TIMEOUT = config('AUTH_CACHE_TIMEOUT', default=60, cast=int)
+AUTH_CACHE_MAX_ENTRIES = config('AUTH_CACHE_MAX_ENTRIES', default=10000, cast=int)
+# Segundos entre sincronizaciones de la copia en memoria de los refresh
+# tokens revocados (ver authentication.revocation)
+TOKEN_REVOCATION_SYNC_INTERVAL = config('TOKEN_REVOCATION_SYNC_INTERVAL', default=5, cast=int)
+# last_login se acumula por proceso y se escribe por lotes cada
+# LAST_LOGIN_FLUSH_INTERVAL segundos (0 lo escribe en cada login), o antes
+# si hay LAST_LOGIN_MAX_PENDING usuarios pendientes (ver
+# authentication.last_login)
+LAST_LOGIN_FLUSH_INTERVAL = config('LAST_LOGIN_FLUSH_INTERVAL', default=30, cast=int)
+LAST_LOGIN_MAX_PENDING = config('LAST_LOGIN_MAX_PENDING', default=1000, cast=int)
+
+
+# Diagnóstico de rendimiento (ver diagnostics.middleware)
+# Con SQL_PROFILING cada respuesta incluye el header Server-Timing con el
+# tiempo en base de datos, y las peticiones de SQL_PROFILING_SLOW_MS o más
+# o con consultas N+1 (el mismo SQL con SQL_PROFILING_N_PLUS_ONE_THRESHOLD
+# o más parámetros distintos) se registran en el logger diagnostics.
+SQL_PROFILING = config('SQL_PROFILING', default=False, cast=bool)
+SQL_PROFILING_SLOW_MS = config('SQL_PROFILING_SLOW_MS', default=500, cast=int)
+SQL_PROFILING_TOP_QUERIES = config('SQL_PROFILING_TOP_QUERIES', default=3, cast=int)
+SQL_PROFILING_N_PLUS_ONE_THRESHOLD = config('SQL_PROFILING_N_PLUS_ONE_THRESHOLD', default=5, cast=int)
+# Métricas de Prometheus en /metrics (ver diagnostics.metrics). Los workers
+# escriben en METRICS_DIR y /metrics suma los de todos; sin METRICS_DIR son
+# solo del proceso que responde. Con METRICS_TOKEN, /metrics requiere
+# Authorization: Bearer <token>; sin él solo responde con DEBUG.
+METRICS_ENABLED = config('METRICS_ENABLED', default=True, cast=bool)
+METRICS_DIR = config('METRICS_DIR', default=None)
+METRICS_TOKEN = config('METRICS_TOKEN', default=None)
+# Perfilado bajo demanda de peticiones de usuarios staff (header X-Profile o
+# parámetro _profile, ver diagnostics.profiling). Los perfiles se guardan en
+# PROFILING_DIR (por defecto en el directorio temporal) y se conservan los
+# últimos PROFILING_MAX_FILES. PROFILING_SAMPLE_INTERVAL son los segundos
+# entre muestras del modo sample.
+PROFILING_ENABLED = config('PROFILING_ENABLED', default=True, cast=bool)
+PROFILING_DIR = config('PROFILING_DIR', default=None)
+PROFILING_MAX_FILES = config('PROFILING_MAX_FILES', default=50, cast=int)
+PROFILING_SAMPLE_INTERVAL = config('PROFILING_SAMPLE_INTERVAL', default=0.001, cast=float)
+# Modo de diagnóstico de memoria (ver diagnostics.memory). Con
+# MEMORY_TRACKING cada worker ejecuta tracemalloc con MEMORY_TRACKING_FRAMES
+# frames por asignación, toma un snapshot antes y después de una de cada
+# MEMORY_SNAPSHOT_EVERY peticiones (0 no toma) y cada MEMORY_SAMPLE_INTERVAL
+# segundos guarda su RSS (las últimas MEMORY_HISTORY muestras) y escribe su
+# reporte en MEMORY_DIR. Desactivado no tiene costo.
+MEMORY_TRACKING = config('MEMORY_TRACKING', default=False, cast=bool)
+MEMORY_TRACKING_FRAMES = config('MEMORY_TRACKING_FRAMES', default=1, cast=int)
+MEMORY_SNAPSHOT_EVERY = config('MEMORY_SNAPSHOT_EVERY', default=100, cast=int)
+MEMORY_SAMPLE_INTERVAL = config('MEMORY_SAMPLE_INTERVAL', default=60, cast=float)
+MEMORY_HISTORY = config('MEMORY_HISTORY', default=1440, cast=int)
+MEMORY_TOP_SITES = config('MEMORY_TOP_SITES', default=10, cast=int)
+MEMORY_DIR = config('MEMORY_DIR', default=None)
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'loggers': {
+        'diagnostics': {
+            'handlers': ['console'],
+            'level': 'INFO',
+            'propagate': False,
+        },
+    },
+}
+
 
 # CORS Configuration
 # https://pypi.org/project/django-cors-headers/
@@ -14,4 +14,11 @@ urlpatterns = [
     # API Routes
     path('api/auth/', include('authentication.urls')),
     path('api/tasks/', include('tasks.urls')),
+    
+    # API asíncrona (servida con ASGI, ver README_DESPLIEGUE.md)
+    path('api/async/auth/', include('authentication.async_urls')),
+    path('api/async/tasks/', include('tasks.async_urls')),
+    
+    # Diagnóstico (métricas de Prometheus)
+    path('', include('diagnostics.urls')),
 ]
@@ -14,3 +14,8 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
 
 application = get_wsgi_application()
+
+# Escritura periódica de last_login en cada proceso del servidor
+from authentication.last_login import last_logins  # noqa: E402
+
+last_logins.start()
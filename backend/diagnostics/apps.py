@@ -0,0 +1,16 @@
+from django.apps import AppConfig
+
+
+class DiagnosticsConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'diagnostics'
+
+    def ready(self):
+        from authentication import cache as auth_cache
+        from tasks import cache as tasks_cache
+        from .metrics import record_cache_read
+
+        # Las cachés de las apps no dependen de diagnostics: se suscribe
+        # aquí para contar sus lecturas en /metrics.
+        auth_cache.add_read_listener(record_cache_read)
+        tasks_cache.add_read_listener(record_cache_read)
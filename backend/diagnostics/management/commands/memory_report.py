@@ -0,0 +1,96 @@
+"""
+Comando para ver los reportes de memoria de los workers
+"""
+import json
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from diagnostics.memory import read_reports
+
+
+def megabytes(value):
+    return '-' if value is None else f'{value / 2**20:.1f} MB'
+
+
+class Command(BaseCommand):
+    """
+    Muestra los reportes que escriben los workers con MEMORY_TRACKING:
+    el RSS de cada worker en el tiempo, las vistas que más memoria retienen
+    por petición con sus sitios de asignación, y los sitios que más
+    crecieron en el último intervalo.
+    
+    Lee MEMORY_DIR, así que puede ejecutarse en el mismo servidor que los
+    workers (por ejemplo con railway run o docker exec).
+    """
+    help = 'Muestra el uso de memoria de los workers (requiere MEMORY_TRACKING).'
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--samples', type=int, default=10,
+            help='Últimas muestras de RSS por worker (por defecto 10)'
+        )
+        parser.add_argument(
+            '--top', type=int, default=5,
+            help='Vistas y sitios de asignación a mostrar (por defecto 5)'
+        )
+        parser.add_argument(
+            '--json', action='store_true',
+            help='Imprime los reportes completos en JSON'
+        )
+    
+    def handle(self, *args, **options):
+        if options['samples'] < 0 or options['top'] < 1:
+            raise CommandError('--samples no puede ser negativo y --top debe ser mayor que cero.')
+        reports = read_reports()
+        if options['json']:
+            self.stdout.write(json.dumps(reports, indent=2))
+            return
+        if not reports:
+            self.stdout.write('No hay reportes de memoria. ¿Está activo MEMORY_TRACKING?')
+            return
+        for report in reports:
+            self.write_report(report, options['samples'], options['top'])
+    
+    def write_report(self, report, samples, top):
+        started = datetime.fromtimestamp(report['started_at'])
+        state = 'activo' if report['alive'] else 'terminado'
+        self.stdout.write(self.style.MIGRATE_HEADING(
+            f'Worker {report["pid"]} ({state}), desde {started:%Y-%m-%d %H:%M:%S}, '
+            f'{report["requests"]} peticiones'
+        ))
+        
+        history = report['samples']
+        if history:
+            first, last = history[0], history[-1]
+            if first['rss_bytes'] is not None and last['rss_bytes'] is not None:
+                growth = last['rss_bytes'] - first['rss_bytes']
+                self.stdout.write(
+                    f'  RSS {megabytes(first["rss_bytes"])} -> {megabytes(last["rss_bytes"])} '
+                    f'({growth / 2**20:+.1f} MB en {len(history)} muestras)'
+                )
+            for sample in history[-samples:] if samples else []:
+                self.stdout.write(
+                    f'  {datetime.fromtimestamp(sample["time"]):%Y-%m-%d %H:%M:%S}  '
+                    f'RSS {megabytes(sample["rss_bytes"])}  '
+                    f'tracemalloc {megabytes(sample["traced_bytes"])} '
+                    f'(pico {megabytes(sample["traced_peak_bytes"])}, '
+                    f'propio {megabytes(sample["tracemalloc_bytes"])})'
+                )
+        
+        views = sorted(report['views'].items(), key=lambda item: item[1]['net_bytes'], reverse=True)
+        if views:
+            self.stdout.write('  Memoria retenida por vista:')
+        for view, stats in views[:top]:
+            self.stdout.write(
+                f'    {view}: {stats["requests"]} peticiones, '
+                f'{stats["avg_net_bytes"] / 1024:+.1f} KB por petición, '
+                f'{stats["snapshots"]} snapshots'
+            )
+            for site in stats['top_sites'][:top]:
+                self.stdout.write(f'      {site["bytes"] / 1024:+.1f} KB  {site["blocks"]:+d} bloques  {site["site"]}')
+        
+        if report['interval_growth']:
+            self.stdout.write('  Sitios que más crecieron en el último intervalo:')
+        for site in report['interval_growth'][:top]:
+            self.stdout.write(f'    {site["bytes"] / 1024:+.1f} KB  {site["blocks"]:+d} bloques  {site["site"]}')
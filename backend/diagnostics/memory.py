@@ -0,0 +1,273 @@
+"""
+Seguimiento de memoria de los workers
+"""
+import atexit
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from collections import Counter, defaultdict, deque
+from pathlib import Path
+
+from django.conf import settings
+
+from .metrics import pid_alive
+
+# Asignaciones que no son de la aplicación: las del propio tracemalloc y
+# las de la importación de módulos.
+_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, __file__),
+    tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+    tracemalloc.Filter(False, '<frozen importlib._bootstrap_external>'),
+    tracemalloc.Filter(False, '<unknown>'),
+)
+
+
+def memory_dir():
+    return Path(settings.MEMORY_DIR or Path(tempfile.gettempdir()) / 'taskflow-memory')
+
+
+def current_rss():
+    """
+    Memoria residente del proceso en bytes, o None si no se puede leer.
+
+    Fuera de Linux retorna el máximo alcanzado por el proceso.
+    """
+    try:
+        with open('/proc/self/statm') as statm:
+            return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # En macOS ru_maxrss está en bytes y en los demás sistemas en KiB.
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def _site(frame):
+    """
+    Formatea un frame como "archivo:línea", relativo al proyecto o a
+    site-packages.
+    """
+    filename = frame.filename
+    base = str(settings.BASE_DIR) + os.sep
+    if filename.startswith(base):
+        filename = filename[len(base):]
+    elif 'site-packages' + os.sep in filename:
+        filename = filename.split('site-packages' + os.sep, 1)[1]
+    return f'{filename}:{frame.lineno}'
+
+
+def _growth(snapshot, previous, limit):
+    """
+    Retorna [(sitio, bytes, bloques)] de los limit sitios que más memoria
+    retuvieron entre previous y snapshot.
+    """
+    differences = [stat for stat in snapshot.compare_to(previous, 'lineno') if stat.size_diff > 0]
+    return [(_site(stat.traceback[0]), stat.size_diff, stat.count_diff) for stat in differences[:limit]]
+
+
+class ViewMemory:
+    """
+    Memoria retenida por las peticiones de una vista.
+    """
+
+    def __init__(self):
+        self.requests = 0
+        self.net_bytes = 0
+        self.snapshots = 0
+        self.sites = Counter()
+        self.blocks = Counter()
+
+
+class MemoryTracker:
+    """
+    Modo de diagnóstico de memoria de un worker (se activa con
+    MEMORY_TRACKING, ver MemoryTrackingMiddleware).
+
+    Con tracemalloc activo registra por vista la memoria que cada petición
+    deja asignada al terminar, y cada MEMORY_SNAPSHOT_EVERY peticiones toma
+    un snapshot antes y otro después de una de ellas para acumular los
+    sitios (archivo:línea) que retuvieron memoria. Cada
+    MEMORY_SAMPLE_INTERVAL segundos, desde un hilo en segundo plano, guarda
+    el RSS del proceso (se conservan MEMORY_HISTORY muestras), compara un
+    snapshot con el del intervalo anterior y escribe el reporte del worker
+    en MEMORY_DIR/worker_<pid>.json, donde lo leen /api/diagnostics/memory/
+    y el comando memory_report.
+
+    Con varias peticiones simultáneas en el proceso (hilos o ASGI) la
+    memoria de una se atribuye también a las demás. Los snapshots tardan
+    en proporción a los bloques asignados y tracemalloc aumenta el uso de
+    memoria y CPU del worker, que se reporta aparte como tracemalloc_bytes.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._views = defaultdict(ViewMemory)
+        self._requests = 0
+        self._samples = deque()
+        self._interval_growth = []
+        self._previous = None
+        self._thread = None
+        self._stopped = threading.Event()
+        self._started_tracing = False
+        self.started_at = None
+
+    @property
+    def active(self):
+        return self.started_at is not None
+
+    def start(self):
+        """
+        Inicia tracemalloc y el hilo que toma las muestras periódicas.
+        """
+        if self.active:
+            return
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(settings.MEMORY_TRACKING_FRAMES)
+            self._started_tracing = True
+        self.started_at = time.time()
+        self._samples = deque(maxlen=settings.MEMORY_HISTORY)
+        self._stopped.clear()
+        self.sample()
+        self._thread = threading.Thread(target=self._run, name='memory-sampler', daemon=True)
+        self._thread.start()
+        atexit.register(self.sample)
+
+    def stop(self):
+        """
+        Detiene el seguimiento y descarta lo registrado.
+        """
+        if not self.active:
+            return
+        self._stopped.set()
+        self._thread.join()
+        atexit.unregister(self.sample)
+        if self._started_tracing:
+            tracemalloc.stop()
+        with self._lock:
+            self._views.clear()
+            self._requests = 0
+            self._interval_growth = []
+            self._previous = None
+        self._thread = None
+        self._started_tracing = False
+        self.started_at = None
+
+    def _run(self):
+        while not self._stopped.wait(settings.MEMORY_SAMPLE_INTERVAL):
+            self.sample()
+
+    def _snapshot(self):
+        return tracemalloc.take_snapshot().filter_traces(_FILTERS)
+
+    def begin_request(self):
+        """
+        Retorna el estado que end_request necesita para medir la petición.
+        """
+        every = settings.MEMORY_SNAPSHOT_EVERY
+        with self._lock:
+            self._requests += 1
+            take_snapshot = every > 0 and self._requests % every == 0
+        return tracemalloc.get_traced_memory()[0], self._snapshot() if take_snapshot else None
+
+    def end_request(self, view, state):
+        before, snapshot = state
+        net_bytes = tracemalloc.get_traced_memory()[0] - before
+        growth = _growth(self._snapshot(), snapshot, settings.MEMORY_TOP_SITES) if snapshot else None
+        with self._lock:
+            stats = self._views[view]
+            stats.requests += 1
+            stats.net_bytes += net_bytes
+            if growth is not None:
+                stats.snapshots += 1
+                for site, size, blocks in growth:
+                    stats.sites[site] += size
+                    stats.blocks[site] += blocks
+
+    def sample(self):
+        """
+        Guarda una muestra de memoria, compara el snapshot con el del
+        intervalo anterior y escribe el reporte del worker.
+        """
+        if not self.active:
+            return
+        traced, traced_peak = tracemalloc.get_traced_memory()
+        snapshot = self._snapshot()
+        with self._lock:
+            self._samples.append({
+                'time': time.time(),
+                'rss_bytes': current_rss(),
+                'traced_bytes': traced,
+                'traced_peak_bytes': traced_peak,
+                'tracemalloc_bytes': tracemalloc.get_tracemalloc_memory(),
+            })
+            if self._previous is not None:
+                self._interval_growth = _growth(snapshot, self._previous, settings.MEMORY_TOP_SITES)
+            self._previous = snapshot
+        self.write_report()
+
+    def report(self):
+        top = settings.MEMORY_TOP_SITES
+        with self._lock:
+            views = {
+                view: {
+                    'requests': stats.requests,
+                    'net_bytes': stats.net_bytes,
+                    'avg_net_bytes': stats.net_bytes / stats.requests if stats.requests else 0,
+                    'snapshots': stats.snapshots,
+                    'top_sites': [
+                        {'site': site, 'bytes': size, 'blocks': stats.blocks[site]}
+                        for site, size in stats.sites.most_common(top)
+                    ],
+                }
+                for view, stats in self._views.items()
+            }
+            return {
+                'pid': os.getpid(),
+                'started_at': self.started_at,
+                'requests': self._requests,
+                'samples': list(self._samples),
+                'interval_growth': [
+                    {'site': site, 'bytes': size, 'blocks': blocks}
+                    for site, size, blocks in self._interval_growth
+                ],
+                'views': views,
+            }
+
+    def write_report(self):
+        directory = memory_dir()
+        directory.mkdir(parents=True, exist_ok=True)
+        path = directory / f'worker_{os.getpid()}.json'
+        temporary = path.with_suffix('.tmp')
+        temporary.write_text(json.dumps(self.report()), encoding='utf-8')
+        os.replace(temporary, path)
+
+
+def read_reports():
+    """
+    Retorna los reportes de los workers, del más reciente al más antiguo,
+    con alive indicando si el proceso sigue en ejecución.
+    """
+    directory = memory_dir()
+    if not directory.is_dir():
+        return []
+    reports = []
+    for path in directory.glob('worker_*.json'):
+        try:
+            report = json.loads(path.read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            continue
+        report['alive'] = pid_alive(report['pid'])
+        reports.append(report)
+    return sorted(reports, key=lambda report: report['started_at'], reverse=True)
+
+
+memory_tracker = MemoryTracker()
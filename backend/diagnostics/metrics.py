@@ -0,0 +1,343 @@
+"""
+Métricas de la API en formato de texto de Prometheus
+"""
+import contextvars
+import math
+import mmap
+import os
+import re
+import struct
+import threading
+from bisect import bisect_left
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from pathlib import Path
+
+from django.conf import settings
+
+# Límites superiores (en segundos) de los buckets de latencia
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, math.inf)
+
+# (nombre, tipo, descripción) en el orden en que se exponen
+FAMILIES = (
+    ('http_request_duration_seconds', 'histogram', 'Duración de las peticiones HTTP.'),
+    ('http_requests_in_progress', 'gauge', 'Peticiones HTTP en curso.'),
+    ('http_request_db_seconds_total', 'counter', 'Segundos de espera a la base de datos.'),
+    ('http_request_queries_total', 'counter', 'Consultas SQL ejecutadas.'),
+    ('cache_requests_total', 'counter', 'Lecturas de caché por resultado (hit o miss).'),
+)
+
+_HEADER = struct.Struct('<Q')
+_LENGTH = struct.Struct('<I')
+_VALUE = struct.Struct('<d')
+_SAMPLE = re.compile(r'^(\w+?)(_bucket|_sum|_count)?(\{.*?)(?:,le="([^"]+)")?\}$')
+_FILE = re.compile(r'^(counters|gauges)_(\d+)\.db$')
+
+_cache_reads = contextvars.ContextVar('diagnostics_cache_reads', default=None)
+
+
+def _padded(size):
+    return (size + 7) & ~7
+
+
+def _entries(data):
+    """
+    Recorre las entradas (clave, valor, posición del valor) de un archivo
+    de valores.
+    """
+    used = max(_HEADER.unpack_from(data, 0)[0], _HEADER.size)
+    position = _HEADER.size
+    while position < used:
+        (length,) = _LENGTH.unpack_from(data, position)
+        key = bytes(data[position + _LENGTH.size:position + _LENGTH.size + length]).decode()
+        value_position = position + _padded(_LENGTH.size + length)
+        yield key, _VALUE.unpack_from(data, value_position)[0], value_position
+        position = value_position + _VALUE.size
+
+
+def read_values(path):
+    """
+    Lee los valores de un archivo escrito por otro proceso.
+    """
+    data = Path(path).read_bytes()
+    if len(data) < _HEADER.size:
+        return []
+    return [(key, value) for key, value, _ in _entries(data)]
+
+
+class ValueFile:
+    """
+    Valores float64 por clave de un proceso, en memoria mapeada.
+
+    El archivo comienza con los bytes usados y sigue con entradas [largo
+    de la clave, clave, valor] alineadas a 8 bytes. Solo el proceso dueño
+    escribe: agrega entradas al final y actualiza los valores en su lugar,
+    así que otros procesos pueden leerlo en cualquier momento sin
+    bloqueos. Con path None la memoria es anónima y solo la lee el proceso.
+    """
+
+    initial_size = 64 * 1024
+
+    def __init__(self, path=None):
+        self.path = path
+        self._lock = threading.Lock()
+        self._offsets = {}
+        if path is None:
+            self._file = None
+            self._map = mmap.mmap(-1, self.initial_size)
+        else:
+            self._file = open(path, 'a+b')
+            size = os.fstat(self._file.fileno()).st_size
+            if size < self.initial_size:
+                self._file.truncate(self.initial_size)
+                size = self.initial_size
+            self._map = mmap.mmap(self._file.fileno(), size)
+        if _HEADER.unpack_from(self._map, 0)[0] < _HEADER.size:
+            _HEADER.pack_into(self._map, 0, _HEADER.size)
+        for key, _, position in _entries(self._map):
+            self._offsets[key] = position
+
+    def inc_many(self, amounts):
+        """
+        Suma cada (clave, cantidad) de amounts a su valor.
+        """
+        with self._lock:
+            for key, amount in amounts:
+                position = self._offsets.get(key)
+                if position is None:
+                    position = self._append(key)
+                _VALUE.pack_into(self._map, position, _VALUE.unpack_from(self._map, position)[0] + amount)
+
+    def inc(self, key, amount=1.0):
+        self.inc_many(((key, amount),))
+
+    def values(self):
+        with self._lock:
+            return [(key, value) for key, value, _ in _entries(self._map)]
+
+    def close(self):
+        self._map.close()
+        if self._file is not None:
+            self._file.close()
+
+    def _append(self, key):
+        encoded = key.encode()
+        used = _HEADER.unpack_from(self._map, 0)[0]
+        value_position = used + _padded(_LENGTH.size + len(encoded))
+        end = value_position + _VALUE.size
+        if end > len(self._map):
+            self._grow(max(2 * len(self._map), end))
+        _LENGTH.pack_into(self._map, used, len(encoded))
+        self._map[used + _LENGTH.size:used + _LENGTH.size + len(encoded)] = encoded
+        _VALUE.pack_into(self._map, value_position, 0.0)
+        # Los bytes usados se actualizan al final: un lector nunca ve una
+        # entrada a medio escribir.
+        _HEADER.pack_into(self._map, 0, end)
+        self._offsets[key] = value_position
+        return value_position
+
+    def _grow(self, size):
+        if self._file is None:
+            grown = mmap.mmap(-1, size)
+            grown[:len(self._map)] = self._map
+        else:
+            self._file.truncate(size)
+            grown = mmap.mmap(self._file.fileno(), size)
+        self._map.close()
+        self._map = grown
+
+
+def pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class MetricsStore:
+    """
+    Métricas de las peticiones de todos los workers.
+
+    Cada proceso escribe sus contadores e histogramas en
+    <directory>/counters_<pid>.db y sus gauges en <directory>/gauges_<pid>.db
+    (ver ValueFile); render() suma los archivos de todos los procesos. Los
+    contadores de un worker que terminó se conservan, y sus gauges se
+    descartan. Sin directory las métricas son solo del proceso actual.
+
+    Los archivos se deben borrar al iniciar el servidor (lo hace
+    entrypoint.sh): un PID reutilizado continúa los contadores de su archivo.
+    """
+
+    def __init__(self, directory=None):
+        self.directory = directory
+        self._lock = threading.Lock()
+        self._pid = None
+        self._counters = self._gauges = None
+        # Claves ya formateadas por combinación de etiquetas
+        self._keys = {}
+
+    def _files(self):
+        # Los archivos se abren en el proceso que escribe, después del fork
+        # de los workers.
+        pid = os.getpid()
+        if self._pid != pid:
+            with self._lock:
+                if self._pid != pid:
+                    if self.directory is None:
+                        self._counters, self._gauges = ValueFile(), ValueFile()
+                    else:
+                        Path(self.directory).mkdir(parents=True, exist_ok=True)
+                        gauges = Path(self.directory) / f'gauges_{pid}.db'
+                        # Los gauges de otro proceso con el mismo PID no aplican.
+                        gauges.unlink(missing_ok=True)
+                        self._counters = ValueFile(Path(self.directory) / f'counters_{pid}.db')
+                        self._gauges = ValueFile(gauges)
+                    self._keys = {}
+                    self._pid = pid
+        return self._counters, self._gauges
+
+    def track_in_progress(self, view, method, amount):
+        gauges = self._files()[1]
+        key = self._keys.get((view, method))
+        if key is None:
+            key = self._keys[view, method] = f'http_requests_in_progress{_labels(view=view, method=method)}'
+        gauges.inc(key, amount)
+
+    def observe_request(self, view, method, status, duration, db_time, queries, cache_reads):
+        """
+        Registra una petición terminada. cache_reads es un Counter de
+        (caché, hit) a lecturas.
+        """
+        counters = self._files()[0]
+        keys = self._keys.get((view, method, status))
+        if keys is None:
+            keys = self._request_keys(counters, view, method, status)
+        buckets, sum_key, count_key, db_key, queries_key = keys
+        amounts = [(key, 1.0) for key in buckets[bisect_left(DURATION_BUCKETS, duration):]]
+        amounts += [(sum_key, duration), (count_key, 1.0), (db_key, db_time), (queries_key, queries)]
+        for (cache, hit), count in cache_reads.items():
+            key = self._keys.get((cache, hit, view, method, status))
+            if key is None:
+                labels = _labels(
+                    cache=cache, result='hit' if hit else 'miss', view=view, method=method, status=status,
+                )
+                key = self._keys[cache, hit, view, method, status] = f'cache_requests_total{labels}'
+            amounts.append((key, count))
+        counters.inc_many(amounts)
+
+    def _request_keys(self, counters, view, method, status):
+        labels = _labels(view=view, method=method, status=status)
+        name = 'http_request_duration_seconds'
+        keys = (
+            [f'{name}_bucket{labels[:-1]},le="{_format_le(le)}"}}' for le in DURATION_BUCKETS],
+            f'{name}_sum{labels}',
+            f'{name}_count{labels}',
+            f'http_request_db_seconds_total{labels}',
+            f'http_request_queries_total{labels}',
+        )
+        # Todos los buckets existen desde la primera petición de la serie.
+        counters.inc_many((key, 0.0) for key in keys[0])
+        self._keys[view, method, status] = keys
+        return keys
+
+    def collect(self):
+        """
+        Retorna {muestra: valor} con la suma de todos los procesos.
+        """
+        counters, gauges = self._files()
+        if self.directory is None:
+            sources = [counters.values(), gauges.values()]
+        else:
+            sources = []
+            for path in sorted(Path(self.directory).iterdir()):
+                match = _FILE.match(path.name)
+                if match is None:
+                    continue
+                if match.group(1) == 'gauges' and not pid_alive(int(match.group(2))):
+                    path.unlink(missing_ok=True)
+                    continue
+                sources.append(read_values(path))
+        totals = defaultdict(float)
+        for values in sources:
+            for key, value in values:
+                totals[key] += value
+        return totals
+
+    def render(self):
+        """
+        Retorna las métricas en el formato de texto de Prometheus 0.0.4.
+        """
+        families = defaultdict(list)
+        for key, value in self.collect().items():
+            match = _SAMPLE.match(key)
+            if match is not None:
+                families[match.group(1)].append((_sort_key(match), key, value))
+        lines = []
+        for name, kind, description in FAMILIES:
+            lines += [f'# HELP {name} {description}', f'# TYPE {name} {kind}']
+            for _, key, value in sorted(families.get(name, ())):
+                lines.append(f'{key} {_format_value(value)}')
+        return '\n'.join(lines) + '\n'
+
+    def clear(self):
+        """
+        Descarta las métricas del proceso actual.
+        """
+        with self._lock:
+            if self._pid is not None:
+                for values in (self._counters, self._gauges):
+                    values.close()
+                    if values.path is not None:
+                        Path(values.path).unlink(missing_ok=True)
+            self._pid = None
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(**labels):
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + '}'
+
+
+def _format_le(value):
+    return '+Inf' if value == math.inf else repr(value)
+
+
+def _format_value(value):
+    return repr(int(value)) if value.is_integer() else repr(value)
+
+
+def _sort_key(match):
+    _, suffix, labels, le = match.groups()
+    order = ('_bucket', '_sum', '_count')
+    return (labels, order.index(suffix) if suffix else 0, float(le) if le else 0.0)
+
+
+def record_cache_read(cache, hit):
+    """
+    Cuenta una lectura de la caché cache en la petición en curso. Fuera de
+    count_cache_reads() no hace nada.
+    """
+    reads = _cache_reads.get()
+    if reads is not None:
+        reads[cache, hit] += 1
+
+
+@contextmanager
+def count_cache_reads():
+    """
+    Cuenta en un Counter de (caché, hit) las lecturas de caché del bloque.
+    """
+    reads = Counter()
+    token = _cache_reads.set(reads)
+    try:
+        yield reads
+    finally:
+        _cache_reads.reset(token)
+
+
+store = MetricsStore(settings.METRICS_DIR)
@@ -0,0 +1,310 @@
+"""
+Middleware de diagnóstico de rendimiento
+"""
+import json
+import logging
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.urls import reverse
+from rest_framework.exceptions import APIException
+from rest_framework.settings import api_settings
+
+from .memory import memory_tracker
+from .metrics import count_cache_reads, store
+from .profiling import MODES, RequestProfiler
+from .sql import describe, install, profile_queries
+
+logger = logging.getLogger(__name__)
+
+
+class MetricsMiddleware:
+    """
+    Registra en diagnostics.metrics.store la duración, el tiempo en base de
+    datos, las consultas y las lecturas de caché de cada petición por
+    vista (view_name de la URL), método y código de estado, y las
+    peticiones en curso por vista. Se expone en /metrics.
+
+    Por petición solo agrega la medición de las consultas y unas escrituras
+    en memoria mapeada bajo un lock del proceso. Se desactiva con
+    METRICS_ENABLED=False.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.METRICS_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+            # Con un process_view síncrono Django lo ejecutaría en un hilo.
+            self.process_view = self.aprocess_view
+        install()
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        start = time.perf_counter()
+        with profile_queries() as profile, count_cache_reads() as cache_reads:
+            try:
+                response = self.get_response(request)
+            finally:
+                self.leave_view(request)
+        self.record(request, response, time.perf_counter() - start, profile, cache_reads)
+        return response
+
+    async def __acall__(self, request):
+        start = time.perf_counter()
+        with profile_queries() as profile, count_cache_reads() as cache_reads:
+            try:
+                response = await self.get_response(request)
+            finally:
+                self.leave_view(request)
+        self.record(request, response, time.perf_counter() - start, profile, cache_reads)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        self.enter_view(request)
+
+    async def aprocess_view(self, request, view_func, view_args, view_kwargs):
+        self.enter_view(request)
+
+    def enter_view(self, request):
+        request.metrics_view = request.resolver_match.view_name
+        store.track_in_progress(request.metrics_view, request.method, 1)
+
+    def leave_view(self, request):
+        view = getattr(request, 'metrics_view', None)
+        if view is not None:
+            store.track_in_progress(view, request.method, -1)
+
+    def record(self, request, response, duration, profile, cache_reads):
+        match = request.resolver_match
+        store.observe_request(
+            view=match.view_name if match else 'none',
+            method=request.method,
+            status=response.status_code,
+            duration=duration,
+            db_time=profile.duration,
+            queries=profile.count,
+            cache_reads=cache_reads,
+        )
+
+
+class SQLProfilingMiddleware:
+    """
+    Mide las consultas SQL de cada petición (se activa con SQL_PROFILING).
+
+    Agrega a la respuesta un header Server-Timing con el tiempo en base de
+    datos y la cantidad de consultas (db), el resto del tiempo de la
+    petición (app), las SQL_PROFILING_TOP_QUERIES consultas más lentas
+    (sql-1, sql-2, ...) resumidas como "SELECT tabla" y los patrones N+1
+    detectados (nplusone). Los navegadores lo muestran en la pestaña de red.
+
+    Si la petición tarda SQL_PROFILING_SLOW_MS o más, o ejecuta un patrón
+    N+1, escribe además una línea JSON en el logger diagnostics.middleware
+    con la vista, los tiempos, las consultas más lentas y las duplicadas.
+    Las consultas de una respuesta por streaming ejecutadas mientras se
+    envía el cuerpo no se cuentan.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.SQL_PROFILING:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+        install()
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        with profile_queries() as profile:
+            response = self.get_response(request)
+        self.report(request, response, profile)
+        return response
+
+    async def __acall__(self, request):
+        with profile_queries() as profile:
+            response = await self.get_response(request)
+        self.report(request, response, profile)
+        return response
+
+    def report(self, request, response, profile):
+        elapsed = profile.elapsed
+        db_time = profile.duration
+        slowest = profile.slowest(settings.SQL_PROFILING_TOP_QUERIES)
+        n_plus_one = profile.n_plus_one(settings.SQL_PROFILING_N_PLUS_ONE_THRESHOLD)
+
+        timings = [
+            f'db;dur={db_time * 1000:.1f};desc="{profile.count} consultas"',
+            f'app;dur={(elapsed - db_time) * 1000:.1f}',
+        ]
+        for index, (sql, _, duration) in enumerate(slowest, 1):
+            timings.append(f'sql-{index};dur={duration * 1000:.1f};desc="{describe(sql)}"')
+        for sql, count in n_plus_one:
+            timings.append(f'nplusone;desc="{describe(sql)} x{count}"')
+        if response.has_header('Server-Timing'):
+            timings.insert(0, response['Server-Timing'])
+        response['Server-Timing'] = ', '.join(timings)
+
+        if elapsed * 1000 < settings.SQL_PROFILING_SLOW_MS and not n_plus_one:
+            return
+        match = request.resolver_match
+        logger.warning('%s', json.dumps({
+            'event': 'n_plus_one' if n_plus_one else 'slow_request',
+            'method': request.method,
+            'path': request.path,
+            'view': match.view_name if match else None,
+            'status': response.status_code,
+            'duration_ms': round(elapsed * 1000, 1),
+            'db_ms': round(db_time * 1000, 1),
+            'queries': profile.count,
+            'slowest': [
+                {'sql': sql, 'ms': round(duration * 1000, 2)} for sql, _, duration in slowest
+            ],
+            'duplicates': [{'sql': sql, 'count': count} for sql, count in profile.duplicates()],
+            'n_plus_one': [{'sql': sql, 'count': count} for sql, count in n_plus_one],
+        }, ensure_ascii=False))
+
+
+def is_staff_request(request):
+    """
+    Indica si la petición es de un usuario staff, autenticado por sesión
+    (el admin) o con las clases de autenticación de la API.
+    """
+    user = getattr(request, 'user', None)
+    if user is not None and user.is_staff:
+        return True
+    for authentication_class in api_settings.DEFAULT_AUTHENTICATION_CLASSES:
+        try:
+            result = authentication_class().authenticate(request)
+        except APIException:
+            return False
+        if result is not None:
+            return result[0].is_staff
+    return False
+
+
+class ProfilingMiddleware:
+    """
+    Perfila una petición de un usuario staff que lo pide con el header
+    X-Profile o el parámetro _profile, con valor cprofile (por defecto;
+    archivo pstats) o sample (muestreo de pilas para un flamegraph).
+
+    El perfil se guarda en PROFILING_DIR y la respuesta, sin otros cambios,
+    incluye los headers X-Profile-Id y X-Profile-URL para descargarlo (ver
+    diagnostics.views). Si el proceso ya está perfilando otra petición, la
+    respuesta incluye X-Profile: busy. Las peticiones sin el header ni el
+    parámetro solo pagan su búsqueda en request.META.
+
+    En modo ASGI se perfila el hilo del event loop, así que el perfil
+    incluye las demás peticiones asíncronas que el worker atienda a la vez.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.PROFILING_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        mode = self.requested_mode(request)
+        if mode is None or not is_staff_request(request):
+            return self.get_response(request)
+        profiler = RequestProfiler.acquire(mode)
+        if profiler is None:
+            return self.busy(self.get_response(request))
+        profiler.start()
+        try:
+            response = self.get_response(request)
+        finally:
+            name = profiler.stop()
+        return self.annotate(request, response, name)
+
+    async def __acall__(self, request):
+        mode = self.requested_mode(request)
+        if mode is None or not await sync_to_async(is_staff_request)(request):
+            return await self.get_response(request)
+        profiler = RequestProfiler.acquire(mode)
+        if profiler is None:
+            return self.busy(await self.get_response(request))
+        profiler.start()
+        try:
+            response = await self.get_response(request)
+        finally:
+            name = profiler.stop()
+        return self.annotate(request, response, name)
+
+    def requested_mode(self, request):
+        value = request.META.get('HTTP_X_PROFILE')
+        if value is None and '_profile' in request.META.get('QUERY_STRING', ''):
+            value = request.GET.get('_profile')
+        if value is None:
+            return None
+        return value if value in MODES else 'cprofile'
+
+    def busy(self, response):
+        response['X-Profile'] = 'busy'
+        return response
+
+    def annotate(self, request, response, name):
+        response['X-Profile-Id'] = name
+        response['X-Profile-URL'] = request.build_absolute_uri(reverse('profile-detail', args=[name]))
+        return response
+
+
+class MemoryTrackingMiddleware:
+    """
+    Registra en memory_tracker la memoria retenida por cada petición, por
+    vista (ver diagnostics.memory.MemoryTracker). Se activa con
+    MEMORY_TRACKING; desactivado, Django no lo carga y tracemalloc no se
+    inicia.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.MEMORY_TRACKING:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+        memory_tracker.start()
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        state = memory_tracker.begin_request()
+        response = self.get_response(request)
+        memory_tracker.end_request(self.view_name(request), state)
+        return response
+
+    async def __acall__(self, request):
+        state = memory_tracker.begin_request()
+        response = await self.get_response(request)
+        memory_tracker.end_request(self.view_name(request), state)
+        return response
+
+    def view_name(self, request):
+        match = request.resolver_match
+        return match.view_name if match else 'none'
+
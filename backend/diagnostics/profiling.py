@@ -0,0 +1,157 @@
+"""
+Perfilado bajo demanda de peticiones individuales
+"""
+import cProfile
+import io
+import pstats
+import secrets
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+
+from django.conf import settings
+
+# Modos de perfilado y extensión del archivo que generan
+MODES = {
+    'cprofile': '.prof',
+    'sample': '.collapsed',
+}
+
+# Un perfilado a la vez por proceso: cProfile no admite dos activos en el
+# mismo hilo y el muestreo de uno distorsionaría el del otro.
+_active = threading.Lock()
+
+
+def profile_dir():
+    return Path(settings.PROFILING_DIR or Path(tempfile.gettempdir()) / 'taskflow-profiles')
+
+
+class StackSampler:
+    """
+    Muestrea cada interval segundos la pila de un hilo desde un hilo aparte
+    y cuenta las pilas en el formato "collapsed" (funciones separadas por
+    ";" seguidas de las muestras), que leen flamegraph.pl y speedscope.
+
+    El hilo muestreado solo se detiene el tiempo de leer su pila. Con
+    código que no libera el GIL las muestras pueden ser menos que
+    duración / interval.
+    """
+
+    def __init__(self, thread_id, interval):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.samples = Counter()
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name='profile-sampler', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is not None:
+                self.samples[self._stack(frame)] += 1
+
+    @staticmethod
+    def _stack(frame):
+        names = []
+        while frame is not None:
+            code = frame.f_code
+            names.append(f'{code.co_qualname} ({Path(code.co_filename).name}:{code.co_firstlineno})')
+            frame = frame.f_back
+        return ';'.join(reversed(names))
+
+    def collapsed(self):
+        return ''.join(f'{stack} {count}\n' for stack, count in self.samples.most_common())
+
+
+class RequestProfiler:
+    """
+    Perfila el hilo actual entre start() y stop() con cProfile (mode
+    'cprofile', archivo pstats) o con StackSampler (mode 'sample', pilas
+    para un flamegraph), y guarda el resultado en profile_dir().
+    """
+
+    def __init__(self, mode):
+        self.mode = mode
+        self._profiler = None
+        self._sampler = None
+
+    @classmethod
+    def acquire(cls, mode):
+        """
+        Retorna un RequestProfiler, o None si ya hay un perfilado en curso
+        en el proceso.
+        """
+        if not _active.acquire(blocking=False):
+            return None
+        return cls(mode)
+
+    def start(self):
+        if self.mode == 'cprofile':
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+        else:
+            self._sampler = StackSampler(threading.get_ident(), settings.PROFILING_SAMPLE_INTERVAL)
+            self._sampler.start()
+
+    def stop(self):
+        """
+        Detiene el perfilado, lo guarda y retorna el nombre del archivo.
+        """
+        try:
+            if self._profiler is not None:
+                self._profiler.disable()
+            else:
+                self._sampler.stop()
+        finally:
+            _active.release()
+        return self.save()
+
+    def save(self):
+        directory = profile_dir()
+        directory.mkdir(parents=True, exist_ok=True)
+        name = f'{time.strftime("%Y%m%d-%H%M%S")}-{secrets.token_hex(4)}{MODES[self.mode]}'
+        if self._profiler is not None:
+            self._profiler.dump_stats(directory / name)
+        else:
+            (directory / name).write_text(self._sampler.collapsed(), encoding='utf-8')
+        prune(directory, settings.PROFILING_MAX_FILES)
+        return name
+
+
+def prune(directory, keep):
+    """
+    Elimina los perfiles más antiguos y conserva los últimos keep.
+    """
+    for path in list_profiles(directory)[keep:]:
+        path.unlink(missing_ok=True)
+
+
+def list_profiles(directory=None):
+    """
+    Retorna los archivos de perfiles, del más reciente al más antiguo.
+    """
+    directory = directory or profile_dir()
+    if not directory.is_dir():
+        return []
+    paths = [path for path in directory.iterdir() if path.suffix in MODES.values()]
+    return sorted(paths, key=lambda path: path.stat().st_mtime, reverse=True)
+
+
+def pstats_text(path, limit=50):
+    """
+    Retorna el resumen de un archivo pstats ordenado por tiempo acumulado.
+    """
+    output = io.StringIO()
+    pstats.Stats(str(path), stream=output).sort_stats('cumulative').print_stats(limit)
+    return output.getvalue()
@@ -0,0 +1,129 @@
+"""
+Perfilado de las consultas SQL de una petición
+"""
+import contextvars
+import re
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+_current_profile = contextvars.ContextVar('diagnostics_sql_profile', default=None)
+
+_TABLE = re.compile(r'\b(?:FROM|INTO|UPDATE)\s+["`]?(\w+)', re.IGNORECASE)
+
+
+def describe(sql):
+    """
+    Resume una sentencia como "SELECT tasks_task", sin columnas ni valores.
+    """
+    words = sql.split(None, 1)
+    verb = words[0].upper() if words else ''
+    match = _TABLE.search(sql)
+    return f'{verb} {match.group(1)}' if match else verb
+
+
+class QueryProfile:
+    """
+    Consultas SQL ejecutadas durante una petición.
+
+    Cada consulta se guarda con su SQL parametrizado (los valores van en
+    params), así que dos ejecuciones del mismo SQL con los mismos
+    parámetros son duplicadas, y el mismo SQL ejecutado con muchos
+    parámetros distintos es un patrón N+1: normalmente una relación cargada
+    de forma perezosa dentro de un ciclo, como task.user en Task.__str__.
+
+    Un perfil creado dentro de otro (por ejemplo, dos middlewares que miden
+    la misma petición) también registra sus consultas en el exterior.
+    """
+
+    def __init__(self, parent=None):
+        self.start = time.perf_counter()
+        self.queries = []
+        self.parent = parent
+
+    def record(self, sql, params, duration):
+        self.queries.append((sql, params, duration))
+        if self.parent is not None:
+            self.parent.record(sql, params, duration)
+
+    @property
+    def count(self):
+        return len(self.queries)
+
+    @property
+    def duration(self):
+        """
+        Segundos que la petición esperó a la base de datos.
+        """
+        return sum(duration for _, _, duration in self.queries)
+
+    @property
+    def elapsed(self):
+        return time.perf_counter() - self.start
+
+    def slowest(self, limit):
+        """
+        Retorna las limit consultas más lentas como (sql, params, duración).
+        """
+        return sorted(self.queries, key=lambda query: query[2], reverse=True)[:limit]
+
+    def duplicates(self):
+        """
+        Retorna [(sql, veces)] de las consultas ejecutadas más de una vez con
+        los mismos parámetros.
+        """
+        counts = Counter((sql, repr(params)) for sql, params, _ in self.queries)
+        return [(sql, count) for (sql, _), count in counts.items() if count > 1]
+
+    def n_plus_one(self, threshold):
+        """
+        Retorna [(sql, veces)] de los SQL ejecutados con threshold o más
+        parámetros distintos.
+        """
+        counts = Counter(sql for sql, _ in {(sql, repr(params)) for sql, params, _ in self.queries})
+        return [(sql, count) for sql, count in counts.items() if count >= threshold]
+
+
+def _record_query(execute, sql, params, many, context):
+    profile = _current_profile.get()
+    if profile is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        profile.record(sql, params, time.perf_counter() - start)
+
+
+def _install_wrapper(connection, **kwargs):
+    if _record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_record_query)
+
+
+def install():
+    """
+    Mide las consultas de las conexiones del hilo actual y de las que se
+    abran después en cualquier hilo. Fuera de profile_queries() la medición
+    solo agrega una llamada por consulta.
+    """
+    connection_created.connect(_install_wrapper, dispatch_uid='diagnostics.sql')
+    for connection in connections.all():
+        _install_wrapper(connection)
+
+
+@contextmanager
+def profile_queries():
+    """
+    Registra en un QueryProfile las consultas ejecutadas dentro del bloque,
+    incluidas las de código síncrono llamado con sync_to_async, que hereda
+    el contexto.
+    """
+    profile = QueryProfile(_current_profile.get())
+    token = _current_profile.set(profile)
+    try:
+        yield profile
+    finally:
+        _current_profile.reset(token)
@@ -0,0 +1,570 @@
+"""
+Tests para la app de diagnóstico
+"""
+import json
+import os
+import pstats
+import re
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from io import StringIO
+from pathlib import Path
+
+from django.contrib.auth import get_user_model
+from django.core.exceptions import MiddlewareNotUsed
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from authentication.cache import token_cache, user_cache
+from tasks.cache import get_cache
+from tasks.models import Task
+from .memory import current_rss, memory_tracker
+from .metrics import MetricsStore, ValueFile, read_values, store
+from .middleware import MemoryTrackingMiddleware
+from .profiling import RequestProfiler, StackSampler, list_profiles
+from .sql import describe, install, profile_queries
+
+User = get_user_model()
+
+
+@override_settings(SQL_PROFILING=True)
+class SQLProfilingTests(TestCase):
+    """
+    Tests para el perfilado SQL por petición.
+    """
+    
+    def setUp(self):
+        """Configuración inicial para cada test."""
+        get_cache().clear()
+        user_cache.clear()
+        token_cache.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            email='profile@example.com',
+            password='testpass123',
+            first_name='Profile',
+            last_name='User'
+        )
+        self.client.force_authenticate(user=self.user)
+        for index in range(6):
+            Task.objects.create(user=self.user, title=f'Tarea {index}')
+    
+    def server_timing(self, response):
+        """Retorna {métrica: [parámetros]} del header Server-Timing."""
+        metrics = {}
+        for entry in response['Server-Timing'].split(', '):
+            name, *params = entry.split(';')
+            metrics.setdefault(name, []).append(';'.join(params))
+        return metrics
+    
+    @override_settings(SQL_PROFILING=False)
+    def test_disabled_by_default(self):
+        """Test: Sin SQL_PROFILING la respuesta no incluye Server-Timing."""
+        response = self.client.get('/api/tasks/')
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse(response.has_header('Server-Timing'))
+    
+    def test_server_timing_header(self):
+        """Test: Server-Timing incluye el tiempo en base de datos y las consultas más lentas."""
+        response = self.client.get('/api/tasks/')
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        metrics = self.server_timing(response)
+        db = re.fullmatch(r'dur=[\d.]+;desc="(\d+) consultas"', metrics['db'][0])
+        self.assertIsNotNone(db)
+        self.assertGreater(int(db.group(1)), 0)
+        self.assertRegex(metrics['app'][0], r'^dur=[\d.]+$')
+        self.assertRegex(metrics['sql-1'][0], r'^dur=[\d.]+;desc="[A-Z]+ \w+"$')
+        self.assertNotIn('nplusone', metrics)
+    
+    def test_async_view_queries_are_counted(self):
+        """Test: Las consultas de una vista asíncrona (en sync_to_async) se cuentan."""
+        headers = {'Authorization': f'Bearer {RefreshToken.for_user(self.user).access_token}'}
+        response = self.client_class().get('/api/async/tasks/', headers=headers)
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn('desc="0 consultas"', response['Server-Timing'])
+    
+    @override_settings(SQL_PROFILING_SLOW_MS=0)
+    def test_slow_request_log(self):
+        """Test: Las peticiones lentas se registran como una línea JSON."""
+        with self.assertLogs('diagnostics.middleware', 'WARNING') as logs:
+            response = self.client.get('/api/tasks/', {'completed': 'false'})
+        
+        entry = json.loads(logs.records[0].getMessage())
+        self.assertEqual(entry['event'], 'slow_request')
+        self.assertEqual(entry['method'], 'GET')
+        self.assertEqual(entry['path'], '/api/tasks/')
+        self.assertEqual(entry['view'], 'task-list')
+        self.assertEqual(entry['status'], response.status_code)
+        self.assertGreater(entry['queries'], 0)
+        self.assertLessEqual(len(entry['slowest']), 3)
+        self.assertEqual(entry['n_plus_one'], [])
+    
+    def test_fast_request_is_not_logged(self):
+        """Test: Una petición rápida sin patrones N+1 no se registra."""
+        with self.assertNoLogs('diagnostics.middleware'):
+            self.client.get('/api/tasks/')
+    
+    def test_n_plus_one_detection(self):
+        """Test: Task.__str__ en un ciclo sin select_related es un patrón N+1."""
+        # Un usuario por tarea, para que cada task.user sea una consulta distinta.
+        for index, task in enumerate(Task.objects.all()):
+            user = User.objects.create(email=f'owner-{index}@example.com', username=f'owner-{index}')
+            Task.objects.filter(pk=task.pk).update(user=user)
+        
+        install()
+        with profile_queries() as profile:
+            [str(task) for task in Task.objects.all()]
+        patterns = profile.n_plus_one(5)
+        self.assertEqual(len(patterns), 1)
+        self.assertEqual(describe(patterns[0][0]), 'SELECT authentication_user')
+        self.assertEqual(patterns[0][1], 6)
+        
+        with profile_queries() as profile:
+            [str(task) for task in Task.objects.select_related('user')]
+        self.assertEqual(profile.count, 1)
+        self.assertEqual(profile.n_plus_one(5), [])
+    
+    def test_duplicates(self):
+        """Test: La misma consulta con los mismos parámetros se reporta como duplicada."""
+        install()
+        with profile_queries() as profile:
+            for _ in range(3):
+                list(Task.objects.filter(user=self.user))
+        
+        self.assertEqual(profile.count, 3)
+        self.assertEqual([count for _, count in profile.duplicates()], [3])
+        self.assertEqual(profile.n_plus_one(2), [])
+    
+    def test_describe(self):
+        """Test: describe resume una sentencia sin columnas ni valores."""
+        self.assertEqual(describe('SELECT "a"."id" FROM "tasks_task" WHERE id = %s'), 'SELECT tasks_task')
+        self.assertEqual(describe('INSERT INTO "tasks_task" ("title") VALUES (%s)'), 'INSERT tasks_task')
+        self.assertEqual(describe('UPDATE "tasks_task" SET "title" = %s'), 'UPDATE tasks_task')
+        self.assertEqual(describe('SAVEPOINT "s1"'), 'SAVEPOINT')
+
+
+@override_settings(METRICS_TOKEN='metrics-token')
+class MetricsTests(TestCase):
+    """
+    Tests para las métricas de /metrics.
+    """
+    
+    def setUp(self):
+        """Configuración inicial para cada test."""
+        get_cache().clear()
+        user_cache.clear()
+        token_cache.clear()
+        store.clear()
+        # La conexión de los tests se abrió antes de cargar el middleware.
+        install()
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            email='metrics@example.com',
+            password='testpass123',
+            first_name='Metrics',
+            last_name='User'
+        )
+        self.headers = {'Authorization': f'Bearer {RefreshToken.for_user(self.user).access_token}'}
+        Task.objects.create(user=self.user, title='Tarea')
+    
+    def tearDown(self):
+        store.clear()
+    
+    def scrape(self):
+        """Retorna {muestra: valor} de GET /metrics."""
+        response = self.client.get('/metrics', headers={'Authorization': 'Bearer metrics-token'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response['Content-Type'].startswith('text/plain; version=0.0.4'))
+        samples = {}
+        for line in response.content.decode().splitlines():
+            if not line.startswith('#'):
+                key, value = line.rsplit(' ', 1)
+                samples[key] = float(value)
+        return samples
+    
+    def test_requires_token(self):
+        """Test: Sin el token de METRICS_TOKEN se retorna 403."""
+        self.assertEqual(self.client.get('/metrics').status_code, status.HTTP_403_FORBIDDEN)
+        response = self.client.get('/metrics', headers={'Authorization': 'Bearer otro'})
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+    
+    @override_settings(METRICS_TOKEN=None, DEBUG=False)
+    def test_without_token_only_in_debug(self):
+        """Test: Sin METRICS_TOKEN /metrics solo responde con DEBUG."""
+        self.assertEqual(self.client.get('/metrics').status_code, status.HTTP_403_FORBIDDEN)
+        with self.settings(DEBUG=True):
+            self.assertEqual(self.client.get('/metrics').status_code, status.HTTP_200_OK)
+    
+    def test_request_metrics(self):
+        """Test: Se registran duración, consultas, caché y peticiones en curso por vista."""
+        for _ in range(2):
+            response = self.client.get('/api/tasks/', headers=self.headers)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.client.get('/api/tasks/999999/', headers=self.headers)
+        
+        samples = self.scrape()
+        labels = 'view="task-list",method="GET",status="200"'
+        self.assertEqual(samples[f'http_request_duration_seconds_count{{{labels}}}'], 2)
+        self.assertEqual(samples[f'http_request_duration_seconds_bucket{{{labels},le="+Inf"}}'], 2)
+        self.assertGreater(samples[f'http_request_duration_seconds_sum{{{labels}}}'], 0)
+        self.assertGreater(samples[f'http_request_queries_total{{{labels}}}'], 0)
+        self.assertGreater(samples[f'http_request_db_seconds_total{{{labels}}}'], 0)
+        self.assertEqual(samples[f'cache_requests_total{{cache="tasks",result="miss",{labels}}}'], 1)
+        self.assertEqual(samples[f'cache_requests_total{{cache="tasks",result="hit",{labels}}}'], 1)
+        self.assertEqual(samples[f'cache_requests_total{{cache="auth_users",result="hit",{labels}}}'], 1)
+        self.assertEqual(
+            samples['http_request_duration_seconds_count{view="task-detail",method="GET",status="404"}'], 1
+        )
+        self.assertEqual(samples['http_requests_in_progress{view="task-list",method="GET"}'], 0)
+        # La petición a /metrics está en curso mientras se generan.
+        self.assertEqual(samples['http_requests_in_progress{view="metrics",method="GET"}'], 1)
+    
+    def test_histogram_buckets_are_cumulative(self):
+        """Test: Cada bucket cuenta las peticiones de duración menor o igual a su límite."""
+        local = MetricsStore()
+        for duration in (0.003, 0.02, 0.3, 20):
+            local.observe_request('task-list', 'GET', 200, duration, 0.0, 1, Counter())
+        
+        samples = local.collect()
+        bucket = 'http_request_duration_seconds_bucket{view="task-list",method="GET",status="200",le="%s"}'
+        self.assertEqual(samples[bucket % '0.005'], 1)
+        self.assertEqual(samples[bucket % '0.025'], 2)
+        self.assertEqual(samples[bucket % '0.5'], 3)
+        self.assertEqual(samples[bucket % '10.0'], 3)
+        self.assertEqual(samples[bucket % '+Inf'], 4)
+        local.clear()
+    
+    async def test_async_views(self):
+        """Test: Las vistas asíncronas se registran con su nombre de vista."""
+        response = await self.async_client.get('/api/async/tasks/', headers=self.headers)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        
+        samples = store.collect()
+        labels = 'view="async_task_list",method="GET",status="200"'
+        self.assertEqual(samples[f'http_request_duration_seconds_count{{{labels}}}'], 1)
+        self.assertGreater(samples[f'http_request_queries_total{{{labels}}}'], 0)
+        self.assertEqual(samples['http_requests_in_progress{view="async_task_list",method="GET"}'], 0)
+    
+    def test_aggregates_worker_processes(self):
+        """Test: Con un directorio se suman los archivos de todos los procesos."""
+        finished = subprocess.Popen([sys.executable, '-c', 'pass'])
+        finished.wait()
+        with tempfile.TemporaryDirectory() as directory:
+            local = MetricsStore(directory)
+            local.observe_request('login', 'POST', 200, 0.3, 0.01, 2, Counter())
+            local.track_in_progress('login', 'POST', 1)
+            
+            # Archivos de otro worker vivo (el proceso padre) y de uno terminado
+            key = 'http_request_duration_seconds_count{view="login",method="POST",status="200"}'
+            gauge = 'http_requests_in_progress{view="login",method="POST"}'
+            for pid in (os.getppid(), finished.pid):
+                other = ValueFile(Path(directory) / f'counters_{pid}.db')
+                other.inc(key, 3)
+                other.close()
+                other = ValueFile(Path(directory) / f'gauges_{pid}.db')
+                other.inc(gauge, 2)
+                other.close()
+            
+            samples = local.collect()
+            self.assertEqual(samples[key], 7)
+            self.assertEqual(samples[gauge], 3)
+            self.assertFalse((Path(directory) / f'gauges_{finished.pid}.db').exists())
+            self.assertIn(f'{key} 7', local.render())
+            local.clear()
+    
+    def test_value_file_grows_and_reopens(self):
+        """Test: Un archivo de valores crece al llenarse y conserva los valores al reabrirse."""
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / 'counters_1.db'
+            values = ValueFile(path)
+            values.inc_many((f'metric{{n="{index}"}}', index) for index in range(5000))
+            values.close()
+            self.assertGreater(path.stat().st_size, ValueFile.initial_size)
+            
+            values = ValueFile(path)
+            values.inc('metric{n="10"}', 1)
+            self.assertEqual(dict(values.values())['metric{n="10"}'], 11)
+            values.close()
+            self.assertEqual(len(read_values(path)), 5000)
+            self.assertEqual(dict(read_values(path))['metric{n="4999"}'], 4999)
+
+
+class ProfilingTests(TestCase):
+    """
+    Tests para el perfilado bajo demanda de peticiones de usuarios staff.
+    """
+    
+    def setUp(self):
+        """Configuración inicial para cada test."""
+        get_cache().clear()
+        user_cache.clear()
+        token_cache.clear()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = Path(directory.name)
+        settings = self.settings(PROFILING_DIR=directory.name)
+        settings.enable()
+        self.addCleanup(settings.disable)
+        
+        self.client = APIClient()
+        self.staff = User.objects.create_user(
+            email='staff@example.com',
+            password='testpass123',
+            is_staff=True
+        )
+        self.user = User.objects.create_user(
+            email='user@example.com',
+            password='testpass123'
+        )
+        Task.objects.create(user=self.staff, title='Tarea')
+    
+    def authenticate(self, user):
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(user).access_token}')
+    
+    def test_non_staff_requests_are_not_profiled(self):
+        """Test: Un usuario que no es staff no puede perfilar sus peticiones."""
+        self.authenticate(self.user)
+        response = self.client.get('/api/tasks/', headers={'X-Profile': 'cprofile'})
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse(response.has_header('X-Profile-Id'))
+        self.assertEqual(list_profiles(), [])
+    
+    def test_requests_without_flag_are_not_profiled(self):
+        """Test: Sin el header ni el parámetro no se perfila."""
+        self.authenticate(self.staff)
+        response = self.client.get('/api/tasks/')
+        
+        self.assertFalse(response.has_header('X-Profile-Id'))
+        self.assertEqual(list_profiles(), [])
+    
+    def test_cprofile(self):
+        """Test: Con X-Profile la respuesta no cambia y el perfil pstats se puede descargar."""
+        self.authenticate(self.staff)
+        expected = self.client.get('/api/tasks/').json()
+        get_cache().clear()
+        response = self.client.get('/api/tasks/', headers={'X-Profile': 'cprofile'})
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json(), expected)
+        name = response['X-Profile-Id']
+        self.assertTrue(name.endswith('.prof'))
+        self.assertTrue(response['X-Profile-URL'].endswith(f'/api/diagnostics/profiles/{name}'))
+        stats = pstats.Stats(str(self.directory / name))
+        self.assertTrue(any(function == 'list' for _, _, function in stats.stats))
+        
+        download = self.client.get(response['X-Profile-URL'])
+        self.assertEqual(download.status_code, status.HTTP_200_OK)
+        self.assertIn('attachment', download['Content-Disposition'])
+        self.assertEqual(b''.join(download.streaming_content), (self.directory / name).read_bytes())
+        
+        summary = self.client.get(response['X-Profile-URL'], {'summary': '1'})
+        self.assertIn('cumulative', summary.content.decode())
+    
+    def test_sample_with_query_parameter(self):
+        """Test: Con ?_profile=sample se guarda un perfil de pilas muestreadas."""
+        self.authenticate(self.staff)
+        response = self.client.get('/api/tasks/', {'_profile': 'sample'})
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        name = response['X-Profile-Id']
+        self.assertTrue(name.endswith('.collapsed'))
+        self.assertTrue((self.directory / name).is_file())
+    
+    def test_session_staff(self):
+        """Test: El staff autenticado por sesión (el admin) también puede perfilar."""
+        self.client.force_login(self.staff)
+        response = self.client.get('/admin/', headers={'X-Profile': '1'})
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response['X-Profile-Id'].endswith('.prof'))
+    
+    def test_busy(self):
+        """Test: Si el proceso ya está perfilando, la petición se atiende sin perfilar."""
+        self.authenticate(self.staff)
+        profiler = RequestProfiler.acquire('cprofile')
+        try:
+            response = self.client.get('/api/tasks/', headers={'X-Profile': 'cprofile'})
+        finally:
+            profiler.start()
+            profiler.stop()
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['X-Profile'], 'busy')
+        self.assertFalse(response.has_header('X-Profile-Id'))
+    
+    def test_profiles_are_staff_only(self):
+        """Test: Solo el staff puede listar y descargar perfiles."""
+        self.authenticate(self.staff)
+        name = self.client.get('/api/tasks/', headers={'X-Profile': 'cprofile'})['X-Profile-Id']
+        
+        response = self.client.get('/api/diagnostics/profiles/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([profile['name'] for profile in response.json()], [name])
+        self.assertEqual(response.json()[0]['mode'], 'cprofile')
+        
+        response = self.client.get('/api/diagnostics/profiles/missing.prof')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        
+        self.authenticate(self.user)
+        response = self.client.get('/api/diagnostics/profiles/')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        response = self.client.get(f'/api/diagnostics/profiles/{name}')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+    
+    @override_settings(PROFILING_MAX_FILES=2)
+    def test_keeps_latest_profiles(self):
+        """Test: Se conservan solo los últimos PROFILING_MAX_FILES perfiles."""
+        names = []
+        for _ in range(3):
+            profiler = RequestProfiler.acquire('cprofile')
+            profiler.start()
+            names.append(profiler.stop())
+            time.sleep(0.01)
+        
+        self.assertEqual([path.name for path in list_profiles()], names[:0:-1])
+    
+    def test_stack_sampler(self):
+        """Test: StackSampler cuenta las pilas del hilo en formato collapsed."""
+        def busy_loop():
+            deadline = time.perf_counter() + 0.2
+            while time.perf_counter() < deadline:
+                pass
+        
+        sampler = StackSampler(threading.get_ident(), 0.001)
+        sampler.start()
+        busy_loop()
+        sampler.stop()
+        
+        lines = sampler.collapsed().splitlines()
+        self.assertTrue(lines)
+        stack, count = lines[0].rsplit(' ', 1)
+        self.assertGreater(int(count), 0)
+        self.assertIn('busy_loop (tests.py:', stack.split(';')[-1])
+
+
+class MemoryTrackingTests(TestCase):
+    """
+    Tests para el modo de diagnóstico de memoria.
+    """
+    
+    def setUp(self):
+        """Configuración inicial para cada test."""
+        get_cache().clear()
+        user_cache.clear()
+        token_cache.clear()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        settings = self.settings(
+            MEMORY_TRACKING=True,
+            MEMORY_SNAPSHOT_EVERY=1,
+            MEMORY_SAMPLE_INTERVAL=3600,
+            MEMORY_DIR=directory.name,
+        )
+        settings.enable()
+        self.addCleanup(settings.disable)
+        self.addCleanup(memory_tracker.stop)
+        
+        self.client = APIClient()
+        self.staff = User.objects.create_user(
+            email='staff@example.com',
+            password='testpass123',
+            is_staff=True
+        )
+        self.user = User.objects.create_user(
+            email='user@example.com',
+            password='testpass123'
+        )
+        for index in range(3):
+            Task.objects.create(user=self.user, title=f'Tarea {index}')
+    
+    def authenticate(self, user):
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(user).access_token}')
+    
+    def test_disabled_has_no_cost(self):
+        """Test: Sin MEMORY_TRACKING el middleware no se carga ni inicia tracemalloc."""
+        with self.settings(MEMORY_TRACKING=False):
+            with self.assertRaises(MiddlewareNotUsed):
+                MemoryTrackingMiddleware(lambda request: None)
+            self.authenticate(self.user)
+            self.client.get('/api/tasks/')
+        
+        self.assertFalse(memory_tracker.active)
+        self.assertFalse(tracemalloc.is_tracing())
+    
+    def test_tracks_requests_by_view(self):
+        """Test: Se registran las peticiones por vista con sus sitios de asignación."""
+        self.authenticate(self.user)
+        for _ in range(2):
+            self.assertEqual(self.client.get('/api/tasks/').status_code, status.HTTP_200_OK)
+        
+        self.assertTrue(tracemalloc.is_tracing())
+        report = memory_tracker.report()
+        self.assertEqual(report['pid'], os.getpid())
+        self.assertEqual(report['requests'], 2)
+        stats = report['views']['task-list']
+        self.assertEqual(stats['requests'], 2)
+        self.assertEqual(stats['snapshots'], 2)
+        for site in stats['top_sites']:
+            self.assertRegex(site['site'], r':\d+$')
+            self.assertGreater(site['bytes'], 0)
+        self.assertEqual(len(report['samples']), 1)
+    
+    def test_report_endpoint_is_staff_only(self):
+        """Test: /api/diagnostics/memory/ retorna los reportes de los workers solo al staff."""
+        self.authenticate(self.user)
+        self.client.get('/api/tasks/')
+        response = self.client.get('/api/diagnostics/memory/')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        
+        self.authenticate(self.staff)
+        memory_tracker.sample()
+        response = self.client.get('/api/diagnostics/memory/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        data = response.json()
+        self.assertTrue(data['tracking'])
+        [worker] = data['workers']
+        self.assertEqual(worker['pid'], os.getpid())
+        self.assertTrue(worker['alive'])
+        self.assertEqual(len(worker['samples']), 2)
+        self.assertGreater(worker['samples'][-1]['rss_bytes'], 0)
+        self.assertIn('task-list', worker['views'])
+    
+    def test_memory_report_command(self):
+        """Test: memory_report muestra el RSS y las vistas de cada worker."""
+        self.authenticate(self.user)
+        self.client.get('/api/tasks/')
+        memory_tracker.sample()
+        
+        out = StringIO()
+        call_command('memory_report', stdout=out)
+        output = out.getvalue()
+        self.assertIn(f'Worker {os.getpid()} (activo)', output)
+        self.assertIn('RSS', output)
+        self.assertIn('task-list: 1 peticiones', output)
+        
+        out = StringIO()
+        call_command('memory_report', '--json', stdout=out)
+        self.assertEqual(json.loads(out.getvalue())[0]['views']['task-list']['requests'], 1)
+    
+    def test_memory_report_without_reports(self):
+        """Test: Sin reportes el comando lo indica."""
+        out = StringIO()
+        call_command('memory_report', stdout=out)
+        self.assertIn('No hay reportes', out.getvalue())
+    
+    def test_current_rss(self):
+        """Test: current_rss retorna la memoria residente del proceso."""
+        self.assertGreater(current_rss(), 1024 * 1024)
+
@@ -0,0 +1,23 @@
+"""
+URLs de la app de diagnóstico
+"""
+from django.urls import path, re_path
+from .views import MemoryReportView, ProfileDetailView, ProfileListView, metrics
+
+urlpatterns = [
+    # GET /metrics - Métricas en formato Prometheus
+    path('metrics', metrics, name='metrics'),
+    
+    # GET /api/diagnostics/profiles/ - Perfiles de peticiones (staff)
+    path('api/diagnostics/profiles/', ProfileListView.as_view(), name='profile-list'),
+    
+    # GET /api/diagnostics/profiles/{nombre} - Descargar un perfil (staff)
+    re_path(
+        r'^api/diagnostics/profiles/(?P<name>[\w-]+\.(?:prof|collapsed))$',
+        ProfileDetailView.as_view(),
+        name='profile-detail',
+    ),
+    
+    # GET /api/diagnostics/memory/ - Memoria de los workers (staff)
+    path('api/diagnostics/memory/', MemoryReportView.as_view(), name='memory-report'),
+]
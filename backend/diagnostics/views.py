@@ -0,0 +1,101 @@
+"""
+Vistas de diagnóstico
+"""
+import hmac
+from datetime import datetime, timezone
+
+from django.conf import settings
+from django.http import FileResponse, Http404, HttpResponse, HttpResponseForbidden
+from django.urls import reverse
+from django.views.decorators.http import require_GET
+from rest_framework.authentication import SessionAuthentication
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from authentication.authentication import CachedJWTAuthentication
+from .memory import memory_tracker, read_reports
+from .metrics import store
+from .profiling import MODES, list_profiles, profile_dir, pstats_text
+
+
+@require_GET
+def metrics(request):
+    """
+    Métricas de todos los workers en el formato de texto de Prometheus.
+
+    Con METRICS_TOKEN requiere el header Authorization: Bearer <token>; sin
+    él solo responde con DEBUG activo.
+    """
+    token = settings.METRICS_TOKEN
+    if token:
+        authorized = hmac.compare_digest(request.headers.get('Authorization', ''), f'Bearer {token}')
+    else:
+        authorized = settings.DEBUG
+    if not authorized:
+        return HttpResponseForbidden()
+    return HttpResponse(store.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+
+class ProfileListView(APIView):
+    """
+    Vista que lista los perfiles guardados por ProfilingMiddleware.
+    
+    Solo para usuarios staff, autenticados con JWT o con la sesión del
+    admin. Retorna los perfiles del más reciente al más antiguo.
+    """
+    authentication_classes = [CachedJWTAuthentication, SessionAuthentication]
+    permission_classes = [IsAdminUser]
+    
+    def get(self, request):
+        modes = {extension: mode for mode, extension in MODES.items()}
+        profiles = []
+        for path in list_profiles():
+            stat = path.stat()
+            profiles.append({
+                'name': path.name,
+                'mode': modes[path.suffix],
+                'size': stat.st_size,
+                'created_at': datetime.fromtimestamp(stat.st_mtime, timezone.utc),
+                'url': request.build_absolute_uri(reverse('profile-detail', args=[path.name])),
+            })
+        return Response(profiles)
+
+
+class ProfileDetailView(APIView):
+    """
+    Vista para descargar un perfil guardado por ProfilingMiddleware.
+    
+    Los perfiles .prof son archivos pstats (python -m pstats, snakeviz);
+    con ?summary=1 se retorna su resumen en texto ordenado por tiempo
+    acumulado. Los .collapsed son pilas para flamegraph.pl o speedscope.
+    """
+    authentication_classes = [CachedJWTAuthentication, SessionAuthentication]
+    permission_classes = [IsAdminUser]
+    
+    def get(self, request, name):
+        path = profile_dir() / name
+        if not path.is_file():
+            raise Http404
+        if path.suffix == MODES['cprofile'] and request.query_params.get('summary'):
+            return HttpResponse(pstats_text(path), content_type='text/plain; charset=utf-8')
+        content_type = 'text/plain; charset=utf-8' if path.suffix == MODES['sample'] else 'application/octet-stream'
+        return FileResponse(path.open('rb'), as_attachment=True, filename=name, content_type=content_type)
+
+
+class MemoryReportView(APIView):
+    """
+    Vista con los reportes de memoria de los workers (MEMORY_TRACKING).
+    
+    Solo para usuarios staff, autenticados con JWT o con la sesión del
+    admin. El worker que responde actualiza su reporte antes de leerlos;
+    los demás lo actualizan cada MEMORY_SAMPLE_INTERVAL segundos.
+    """
+    authentication_classes = [CachedJWTAuthentication, SessionAuthentication]
+    permission_classes = [IsAdminUser]
+    
+    def get(self, request):
+        if memory_tracker.active:
+            memory_tracker.write_report()
+        return Response({'tracking': memory_tracker.active, 'workers': read_reports()})
+
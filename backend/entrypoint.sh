@@ -15,5 +15,22 @@ PORT=${PORT:-8000}
 echo "Usando puerto: $PORT"
 
 # Siempre usar gunicorn con PORT (ignorar CMD si existe)
-exec gunicorn config.wsgi:application --bind 0.0.0.0:$PORT --workers 3
+# SERVER_MODE=asgi usa workers de uvicorn, con los que las vistas de
+# /api/async/ atienden varias peticiones concurrentes por worker
+# Se exporta para Django: con varios workers la caché de respuestas en
+# memoria local se desactiva (requiere REDIS_URL o CACHE_DIR).
+export WEB_WORKERS=${WEB_WORKERS:-3}
+# Los workers escriben sus métricas en METRICS_DIR y /metrics las suma. En
+# cada inicio se borran solo los archivos de métricas (counters_<pid>.db y
+# gauges_<pid>.db, ver diagnostics.metrics) para no continuar los
+# contadores de la ejecución anterior; el resto del directorio no se toca.
+export METRICS_DIR=${METRICS_DIR:-/tmp/taskflow-metrics}
+mkdir -p "$METRICS_DIR"
+rm -f "$METRICS_DIR"/counters_*.db "$METRICS_DIR"/gauges_*.db
+if [ "${SERVER_MODE:-wsgi}" = "asgi" ]; then
+    echo "Modo ASGI (uvicorn), $WEB_WORKERS workers"
+    exec gunicorn config.asgi:application --bind 0.0.0.0:$PORT --workers $WEB_WORKERS \
+        --worker-class uvicorn.workers.UvicornWorker
+fi
+exec gunicorn config.wsgi:application --bind 0.0.0.0:$PORT --workers $WEB_WORKERS
 
@@ -2,7 +2,12 @@
 Configuración del admin para la app de tareas
 """
 from django.contrib import admin
-from .models import Task
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Q
+from django.utils.text import smart_split, unescape_string_literal
+from .models import Task, TaskArchive, TaskStats
+from .cache import invalidate_user
 
 
 @admin.register(Task)
@@ -14,7 +19,10 @@ class TaskAdmin(admin.ModelAdmin):
     """
     list_display = ('id', 'title', 'user', 'completed', 'is_deleted', 'created_at', 'updated_at')
     list_filter = ('completed', 'is_deleted', 'created_at', 'user')
+    # Ver get_search_results: title y description se buscan con el índice
+    # de texto completo y los campos del usuario con icontains.
     search_fields = ('title', 'description', 'user__email', 'user__first_name', 'user__last_name')
+    owner_search_fields = ('email', 'first_name', 'last_name')
     readonly_fields = ('id', 'created_at', 'updated_at')
     ordering = ('-created_at',)
     
@@ -37,4 +45,117 @@ class TaskAdmin(admin.ModelAdmin):
         """
         qs = super().get_queryset(request)
         return qs.select_related('user')
+    
+    def get_search_results(self, request, queryset, search_term):
+        """
+        Busca title y description con el mismo índice de texto completo que
+        la API en lugar de LIKE '%término%', que recorre la tabla completa.
+
+        Las tareas de los usuarios cuyo email, nombre o apellido contienen
+        cada palabra del término también se incluyen, como en el buscador
+        estándar del admin. El LIKE se aplica a la tabla de usuarios y las
+        tareas se filtran por user_id con el índice.
+        """
+        search_term = search_term.strip()
+        if not search_term:
+            return queryset, False
+        owners = Q()
+        for bit in smart_split(search_term):
+            if bit.startswith(('"', "'")) and bit[0] == bit[-1]:
+                bit = unescape_string_literal(bit)
+            match = Q()
+            for field in self.owner_search_fields:
+                match |= Q(**{f'{field}__icontains': bit})
+            owners &= match
+        users = get_user_model().objects.filter(owners).values('pk')
+        matches = queryset.search(search_term, ranked=False) | queryset.filter(user__in=users)
+        return matches, False
+    
+    def save_model(self, request, obj, form, change):
+        """
+        Guarda la tarea y ajusta los contadores de TaskStats.
+        
+        Al editar se leen los valores almacenados antes de guardar, ya que
+        obj contiene los datos del formulario.
+        """
+        before = None
+        if change:
+            stored = Task.objects.filter(pk=obj.pk).values_list(
+                'user_id', 'is_deleted', 'completed'
+            ).first()
+            if stored:
+                before = Task.stats_key_for(*stored)
+        super().save_model(request, obj, form, change)
+        TaskStats.record_change(before, obj.stats_key())
+        invalidate_user(obj.user_id, before[0] if before else None)
+    
+    def delete_model(self, request, obj):
+        """
+        Elimina físicamente la tarea y ajusta los contadores.
+        """
+        before = obj.stats_key()
+        with transaction.atomic():
+            super().delete_model(request, obj)
+            TaskStats.record_change(before=before)
+            invalidate_user(obj.user_id)
+    
+    def delete_queryset(self, request, queryset):
+        """
+        Elimina varias tareas (acción del admin) y recalcula los contadores
+        de los usuarios afectados.
+        """
+        with transaction.atomic():
+            user_ids = set(queryset.values_list('user_id', flat=True))
+            super().delete_queryset(request, queryset)
+            for user_id in user_ids:
+                TaskStats.recompute(user_id)
+            invalidate_user(*user_ids)
 
+
+@admin.register(TaskStats)
+class TaskStatsAdmin(admin.ModelAdmin):
+    """
+    Configuración del admin para los contadores de tareas.
+    
+    Los contadores se mantienen automáticamente; el admin es de solo lectura.
+    Para corregir desviaciones usar el comando recompute_task_stats.
+    """
+    list_display = ('user', 'total', 'completed', 'pending', 'updated_at')
+    search_fields = ('user__email',)
+    readonly_fields = ('user', 'total', 'completed', 'updated_at')
+    
+    def get_queryset(self, request):
+        """
+        Optimiza las consultas usando select_related para el campo user.
+        """
+        qs = super().get_queryset(request)
+        return qs.select_related('user')
+    
+    def has_add_permission(self, request):
+        return False
+
+
+@admin.register(TaskArchive)
+class TaskArchiveAdmin(admin.ModelAdmin):
+    """
+    Configuración del admin para las tareas archivadas.
+    
+    Es de solo lectura: las filas se mueven con los comandos
+    archive_deleted_tasks y restore_archived_tasks.
+    """
+    list_display = ('id', 'title', 'user', 'completed', 'updated_at', 'archived_at')
+    list_filter = ('archived_at',)
+    search_fields = ('=id', 'user__email')
+    
+    def get_queryset(self, request):
+        """
+        Optimiza las consultas usando select_related para el campo user.
+        """
+        qs = super().get_queryset(request)
+        return qs.select_related('user')
+    
+    def has_add_permission(self, request):
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
@@ -0,0 +1,13 @@
+"""
+URLs asíncronas para la app de tareas
+"""
+from django.urls import path
+from .async_views import AsyncTaskListView, AsyncTaskDetailView
+
+urlpatterns = [
+    # GET/POST /api/async/tasks/ - Listado y creación
+    path('', AsyncTaskListView.as_view(), name='async_task_list'),
+    
+    # GET/PUT/PATCH/DELETE /api/async/tasks/{id}/ - Detalle, edición y borrado
+    path('<int:pk>/', AsyncTaskDetailView.as_view(), name='async_task_detail'),
+]
@@ -0,0 +1,163 @@
+"""
+Vistas asíncronas para la app de tareas (/api/async/tasks/)
+
+Las lecturas usan el ORM asíncrono (aget, acount e iteración con async for).
+Las escrituras deben actualizar TaskStats y la caché en la misma transacción
+que la tarea, y Django no admite transacciones en código asíncrono, por lo
+que se ejecutan como funciones síncronas con sync_to_async.
+"""
+from asgiref.sync import sync_to_async
+from django.db import transaction
+from rest_framework import status
+from rest_framework.exceptions import NotFound
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+from authentication.async_api import AsyncAPIView
+from .cache import invalidate_user
+from .models import Task, TaskStats
+from .serializers import TaskSerializer
+from .views import TaskViewSet
+
+
+def _create_task(user, values):
+    """
+    Crea la tarea y actualiza los contadores (ver TaskViewSet.perform_create).
+    """
+    with transaction.atomic():
+        task = Task.objects.create(user=user, **values)
+        TaskStats.record_change(after=task.stats_key())
+        invalidate_user(user.pk)
+    return task
+
+
+def _update_task(pk, user, values):
+    """
+    Actualiza la tarea con un UPDATE condicional y ajusta los contadores
+    (ver TaskViewSet.partial_update). Retorna None si no existe.
+    """
+    with transaction.atomic():
+        task, completed_delta = None, 0
+        if 'completed' in values:
+            task = Task.objects.update_alive(pk, user, values, completed=not values['completed'])
+            if task is not None:
+                completed_delta = 1 if values['completed'] else -1
+        if task is None:
+            task = Task.objects.update_alive(pk, user, values)
+        if task is None:
+            return None
+        TaskStats.apply_delta(user.pk, completed=completed_delta)
+        invalidate_user(user.pk)
+    return task
+
+
+def _delete_task(pk, user):
+    """
+    Borra lógicamente la tarea (ver TaskViewSet.destroy). Retorna False si
+    no existe.
+    """
+    with transaction.atomic():
+        task = Task.objects.update_alive(pk, user, {'is_deleted': True})
+        if task is None:
+            return False
+        before = Task.stats_key_for(task.user_id, False, task.completed)
+        TaskStats.record_change(before, task.stats_key())
+        invalidate_user(user.pk)
+    return True
+
+
+class AsyncTaskListView(AsyncAPIView):
+    """
+    Versión asíncrona del listado (GET) y la creación (POST) de TaskViewSet.
+    
+    El listado admite los mismos filtros, búsqueda, ordenamiento y
+    paginación por número de página que GET /api/tasks/, con el total
+    tomado de TaskStats cuando los filtros lo permiten. No usa la caché de
+    respuestas ni el GET condicional.
+    """
+    filter_backends = TaskViewSet.filter_backends
+    page_query_param = 'page'
+    
+    async def get(self, request):
+        queryset = Task.objects.alive_for(request.user)
+        for backend in self.filter_backends:
+            queryset = backend().filter_queryset(request, queryset, self)
+        
+        count = TaskViewSet.count_from_stats(request, await TaskStats.afor_user(request.user))
+        if count is None:
+            count = await queryset.acount()
+        
+        page_size = api_settings.PAGE_SIZE
+        page = self.get_page_number(request, count, page_size)
+        offset = (page - 1) * page_size
+        tasks = [task async for task in queryset[offset:offset + page_size]]
+        
+        url = request.build_absolute_uri()
+        next_url = previous_url = None
+        if offset + page_size < count:
+            next_url = replace_query_param(url, self.page_query_param, page + 1)
+        if page == 2:
+            previous_url = remove_query_param(url, self.page_query_param)
+        elif page > 2:
+            previous_url = replace_query_param(url, self.page_query_param, page - 1)
+        return self.json_response({
+            'count': count,
+            'next': next_url,
+            'previous': previous_url,
+            'results': TaskSerializer(tasks, many=True).data,
+        })
+    
+    def get_page_number(self, request, count, page_size):
+        """
+        Retorna la página pedida, o 404 si no es válida (igual que
+        PageNumberPagination).
+        """
+        value = request.query_params.get(self.page_query_param, '1')
+        last_page = max(1, -(-count // page_size))
+        try:
+            page = int(value)
+        except ValueError:
+            page = 0
+        if value == 'last':
+            page = last_page
+        if not 1 <= page <= last_page:
+            raise NotFound('Página inválida.')
+        return page
+    
+    async def post(self, request):
+        serializer = TaskSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        task = await sync_to_async(_create_task)(request.user, serializer.validated_data)
+        return self.json_response(TaskSerializer(task).data, status=status.HTTP_201_CREATED)
+
+
+class AsyncTaskDetailView(AsyncAPIView):
+    """
+    Versión asíncrona del detalle, la actualización (PUT y PATCH) y el
+    borrado lógico de TaskViewSet.
+    """
+    
+    async def get(self, request, pk):
+        try:
+            task = await Task.objects.alive_for(request.user).aget(pk=pk)
+        except Task.DoesNotExist:
+            raise NotFound()
+        return self.json_response(TaskSerializer(task).data)
+    
+    async def put(self, request, pk):
+        return await self.update(request, pk, partial=False)
+    
+    async def patch(self, request, pk):
+        return await self.update(request, pk, partial=True)
+    
+    async def update(self, request, pk, partial):
+        serializer = TaskSerializer(data=request.data, partial=partial)
+        serializer.is_valid(raise_exception=True)
+        task = await sync_to_async(_update_task)(pk, request.user, dict(serializer.validated_data))
+        if task is None:
+            raise NotFound("La tarea no existe.")
+        return self.json_response(TaskSerializer(task).data)
+    
+    async def delete(self, request, pk):
+        if not await sync_to_async(_delete_task)(pk, request.user):
+            raise NotFound("La tarea no existe.")
+        return self.json_response(None, status=status.HTTP_204_NO_CONTENT)
@@ -0,0 +1,184 @@
+"""
+Caché versionada de respuestas de la API de tareas
+"""
+import hashlib
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import transaction
+
+# Funciones llamadas con ('tasks', hit) en cada lectura de ResponseCache
+# (ver add_read_listener).
+_read_listeners = []
+
+
+def add_read_listener(listener):
+    """
+    Registra listener(cache, hit) para cada lectura de ResponseCache, sin
+    que esta app conozca a quien la observa (diagnostics, para /metrics).
+    """
+    if listener not in _read_listeners:
+        _read_listeners.append(listener)
+
+
+class CacheCounters:
+    """
+    Contadores de aciertos y fallos de la caché en el proceso actual.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def record(self, hit):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def snapshot(self):
+        with self._lock:
+            hits, misses = self.hits, self.misses
+        total = hits + misses
+        return {
+            'hits': hits,
+            'misses': misses,
+            'hit_rate': hits / total if total else 0.0,
+        }
+
+    def reset(self):
+        with self._lock:
+            self.hits = self.misses = 0
+
+
+counters = CacheCounters()
+
+
+def get_cache():
+    """
+    Retorna el backend de caché configurado en TASKS_CACHE_ALIAS.
+    """
+    return caches[settings.TASKS_CACHE_ALIAS]
+
+
+def response_cache_enabled():
+    """
+    Indica si se cachean las respuestas de /api/tasks/.
+
+    Se desactiva con TASKS_CACHE_TIMEOUT=0, y también cuando el backend es
+    de memoria local y el servidor corre varios workers (WEB_WORKERS): cada
+    worker tendría su propia caché y seguiría respondiendo datos que otro
+    ya modificó (ver invalidate_user).
+    """
+    if settings.TASKS_CACHE_TIMEOUT <= 0:
+        return False
+    return settings.WEB_WORKERS <= 1 or not isinstance(get_cache(), LocMemCache)
+
+
+def _version_key(user_id):
+    return f'tasks:version:{user_id}'
+
+
+def _initial_version():
+    # Si la clave de versión se desaloja, la nueva versión (basada en el
+    # reloj) siempre es mayor que cualquiera usada antes, así que las
+    # entradas antiguas nunca vuelven a ser alcanzables.
+    return time.time_ns() // 1000
+
+
+def get_version(user_id):
+    """
+    Retorna la versión actual de la caché del usuario.
+    """
+    cache = get_cache()
+    key = _version_key(user_id)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, _initial_version(), timeout=None)
+        version = cache.get(key, _initial_version())
+    return version
+
+
+def bump_version(user_id):
+    """
+    Invalida en O(1) todas las respuestas cacheadas del usuario
+    incrementando su versión; las entradas viejas quedan inalcanzables y
+    el backend las desaloja por LRU o por expiración.
+    """
+    cache = get_cache()
+    key = _version_key(user_id)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, _initial_version(), timeout=None)
+
+
+def invalidate_user(*user_ids):
+    """
+    Invalida las respuestas cacheadas de los usuarios indicados.
+
+    La versión se incrementa de inmediato y otra vez cuando la transacción
+    actual se confirma: una lectura concurrente que tome la versión nueva
+    antes del commit todavía ve los datos anteriores, y el segundo
+    incremento impide que esa respuesta quede accesible.
+
+    La versión vive en el backend de caché, así que solo invalida las
+    respuestas de los procesos que lo comparten: con un backend de memoria
+    local, los demás workers no ven el incremento. Por eso con varios
+    workers la caché de respuestas requiere Redis (REDIS_URL) o el backend
+    de archivos (CACHE_DIR); ver response_cache_enabled.
+    """
+    for user_id in set(user_ids):
+        if user_id is None:
+            continue
+        bump_version(user_id)
+        transaction.on_commit(lambda user_id=user_id: bump_version(user_id))
+
+
+class ResponseCache:
+    """
+    Caché de respuestas serializadas de un usuario para una vista.
+
+    La clave combina el ID del usuario, su versión actual, el tipo de
+    respuesta y la ruta con sus parámetros ordenados. Cada entrada guarda
+    los datos serializados junto con sus validadores (ETag y
+    Last-Modified) para poder responder 304 sin tocar la base de datos.
+    Si la caché está desactivada (ver response_cache_enabled) get siempre
+    retorna None y set no guarda nada.
+    """
+
+    def __init__(self, request, kind):
+        self.enabled = response_cache_enabled()
+        if not self.enabled:
+            return
+        self.cache = get_cache()
+        # El host forma parte de la clave porque los enlaces de paginación
+        # de la respuesta son absolutos.
+        params = sorted(request.query_params.lists())
+        url = f'{request.get_host()}{request.path}?{params}'
+        digest = hashlib.sha256(url.encode()).hexdigest()[:32]
+        version = get_version(request.user.pk)
+        self.key = f'tasks:{request.user.pk}:{version}:{kind}:{digest}'
+
+    def get(self):
+        if not self.enabled:
+            return None
+        entry = self.cache.get(self.key)
+        counters.record(entry is not None)
+        for listener in _read_listeners:
+            listener('tasks', entry is not None)
+        return entry
+
+    def set(self, data, etag, last_modified):
+        if not self.enabled:
+            return
+        self.cache.set(
+            self.key,
+            {'data': data, 'etag': etag, 'last_modified': last_modified},
+            timeout=settings.TASKS_CACHE_TIMEOUT,
+        )
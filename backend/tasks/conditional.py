@@ -0,0 +1,74 @@
+"""
+GET condicional (ETag / Last-Modified) para la app de tareas
+"""
+import hashlib
+
+from django.db.models import Max
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import http_date, quote_etag
+
+
+def _etag(*parts):
+    digest = hashlib.sha256(':'.join(str(part) for part in parts).encode()).hexdigest()
+    return quote_etag(digest[:32])
+
+
+def _timestamp(value):
+    return int(value.timestamp()) if value else None
+
+
+def list_validators(request, queryset, count):
+    """
+    Calcula ETag y Last-Modified de un listado de tareas.
+
+    Se derivan de max(updated_at) del queryset, obtenido con una consulta
+    de agregación (sin cargar filas), y del número de tareas vivas count.
+    Cualquier alta, edición o borrado lógico cambia al menos uno de los
+    dos valores. Si el queryset incluye las tareas eliminadas del usuario,
+    el máximo se resuelve con el índice (user, updated_at, id) sin recorrer
+    sus filas, y un borrado lógico también lo incrementa. Los parámetros
+    de la URL forman parte del ETag porque cada página o filtro es una
+    representación distinta.
+    """
+    last_modified = queryset.order_by().aggregate(last_modified=Max('updated_at'))['last_modified']
+    etag = _etag(
+        'list',
+        request.user.pk,
+        count,
+        last_modified.isoformat() if last_modified else '',
+        request.query_params.urlencode(),
+    )
+    return etag, _timestamp(last_modified)
+
+
+def task_validators(task):
+    """
+    Calcula ETag y Last-Modified de una tarea a partir de su updated_at.
+    """
+    return _etag('task', task.pk, task.updated_at.isoformat()), _timestamp(task.updated_at)
+
+
+def not_modified(request, etag, last_modified):
+    """
+    Retorna una respuesta 304 si los encabezados If-None-Match /
+    If-Modified-Since de la petición coinciden, o None en caso contrario.
+    """
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is not None:
+        set_validators(response, etag, last_modified)
+    return response
+
+
+def set_validators(response, etag, last_modified):
+    """
+    Agrega ETag, Last-Modified y los encabezados de caché a la respuesta.
+
+    Las respuestas dependen del usuario autenticado: se marcan como
+    privadas, variando por Authorization, y deben revalidarse siempre.
+    """
+    response['ETag'] = etag
+    if last_modified is not None:
+        response['Last-Modified'] = http_date(last_modified)
+    patch_cache_control(response, private=True, no_cache=True)
+    patch_vary_headers(response, ('Authorization',))
+    return response
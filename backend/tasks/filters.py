@@ -0,0 +1,136 @@
+"""
+Filtros para la app de tareas
+"""
+from datetime import datetime, time
+
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from rest_framework.exceptions import ValidationError
+from rest_framework.filters import BaseFilterBackend, OrderingFilter
+
+
+class TaskFieldFilter(BaseFilterBackend):
+    """
+    Filtros por campo del listado:
+
+    - ?completed=true|false
+    - ?created_after=<fecha> (inclusive) y ?created_before=<fecha> (exclusivo),
+      en formato ISO 8601; una fecha sin hora equivale a medianoche.
+
+    Todos se resuelven con los índices parciales de tareas vivas, que
+    comienzan por (user, completed) o (user) y continúan por created_at.
+    """
+    boolean_values = {
+        'true': True, '1': True,
+        'false': False, '0': False,
+    }
+
+    def get_filters(self, request):
+        """
+        Retorna los lookups a aplicar según los parámetros de la petición.
+        """
+        params = request.query_params
+        filters = {}
+        if 'completed' in params:
+            value = params['completed'].lower()
+            if value not in self.boolean_values:
+                raise ValidationError({'completed': ['Debe ser true o false.']})
+            filters['completed'] = self.boolean_values[value]
+        for param, lookup in (('created_after', 'gte'), ('created_before', 'lt')):
+            if param in params:
+                filters[f'created_at__{lookup}'] = self.parse_moment(param, params[param])
+        return filters
+
+    @staticmethod
+    def parse_moment(param, value):
+        try:
+            moment = parse_datetime(value)
+            if moment is None:
+                day = parse_date(value)
+                moment = datetime.combine(day, time.min) if day else None
+        except ValueError:
+            moment = None
+        if moment is None:
+            raise ValidationError({param: ['Fecha inválida; se espera formato ISO 8601.']})
+        if timezone.is_naive(moment):
+            moment = timezone.make_aware(moment)
+        return moment
+
+    def is_active(self, request):
+        return bool(self.get_filters(request))
+
+    def filter_queryset(self, request, queryset, view):
+        filters = self.get_filters(request)
+        return queryset.filter(**filters) if filters else queryset
+
+
+class TaskOrderingFilter(OrderingFilter):
+    """
+    Ordenamiento del listado mediante ?ordering=.
+
+    Solo se admiten los ordenamientos que los índices parciales entregan ya
+    ordenados (created_at en ambos sentidos, desempatando por id); cualquier
+    otro retorna 400 en lugar de forzar un ordenamiento en memoria.
+
+    TaskCursorPagination toma el ordenamiento de este filtro, por lo que
+    ambos modos de paginación lo respetan.
+    """
+    allowed_orderings = {
+        '-created_at': ('-created_at', '-id'),
+        'created_at': ('created_at', 'id'),
+    }
+
+    def get_ordering(self, request, queryset, view):
+        value = request.query_params.get(self.ordering_param)
+        if not value:
+            return self.get_default_ordering(view)
+        if value not in self.allowed_orderings:
+            raise ValidationError({
+                self.ordering_param: [
+                    'Ordenamiento no soportado. Opciones: '
+                    + ', '.join(self.allowed_orderings) + '.'
+                ]
+            })
+        return self.allowed_orderings[value]
+
+    def is_active(self, request):
+        # El ordenamiento no cambia el número de resultados.
+        return False
+
+    def filter_queryset(self, request, queryset, view):
+        # Sin ?ordering= se conserva el orden del queryset, que puede venir
+        # de la búsqueda por relevancia.
+        if not request.query_params.get(self.ordering_param):
+            return queryset
+        return queryset.order_by(*self.get_ordering(request, queryset, view))
+
+
+class TaskSearchFilter(BaseFilterBackend):
+    """
+    Búsqueda de texto completo mediante el parámetro ?q=.
+
+    Usa TaskQuerySet.search, que consulta el índice de texto del motor y
+    ordena los resultados por relevancia. Como ese orden no es compatible
+    con la paginación por cursor (created_at, id), combinar ambos retorna 400.
+    """
+    search_param = 'q'
+
+    def get_search_text(self, request):
+        return request.query_params.get(self.search_param, '').strip()
+
+    def is_active(self, request):
+        """
+        Indica si el filtro restringe el listado en esta petición.
+        """
+        return bool(self.get_search_text(request))
+
+    def filter_queryset(self, request, queryset, view):
+        text = self.get_search_text(request)
+        if not text:
+            return queryset
+        uses_cursor = getattr(view, 'uses_cursor_pagination', None)
+        if uses_cursor and uses_cursor():
+            raise ValidationError({
+                self.search_param: ['La búsqueda no admite paginación por cursor.']
+            })
+        return queryset.search(text)
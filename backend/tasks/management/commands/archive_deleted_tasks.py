@@ -0,0 +1,101 @@
+"""
+Comando para archivar las tareas eliminadas lógicamente
+"""
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from tasks.models import Task, TaskArchive
+from tasks.pagination import keyset_after
+
+
+class Command(BaseCommand):
+    """
+    Mueve a TaskArchive las tareas eliminadas lógicamente hace más de
+    TASKS_ARCHIVE_RETENTION_DAYS días.
+    
+    Pensado para ejecutarse con tráfico en vivo: recorre las candidatas por
+    keyset sobre (updated_at, id) con el índice parcial de filas eliminadas,
+    mueve cada lote en su propia transacción y espera entre lotes. Si se
+    interrumpe, los lotes ya confirmados quedan archivados y una nueva
+    ejecución continúa con las filas restantes.
+    """
+    help = 'Archiva las tareas eliminadas lógicamente que superaron la retención.'
+    
+    ordering = ('updated_at', 'id')
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days', type=int, default=settings.TASKS_ARCHIVE_RETENTION_DAYS,
+            help='Días de retención (por defecto TASKS_ARCHIVE_RETENTION_DAYS)'
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=1000,
+            help='Tareas por lote y transacción (por defecto 1000)'
+        )
+        parser.add_argument(
+            '--sleep', type=float, default=0.1,
+            help='Segundos de espera entre lotes (por defecto 0.1)'
+        )
+        parser.add_argument(
+            '--max-chunks', type=int, default=None,
+            help='Número máximo de lotes a procesar en esta ejecución'
+        )
+    
+    def handle(self, *args, **options):
+        if options['days'] < 1 or options['chunk_size'] < 1:
+            raise CommandError('--days y --chunk-size deben ser mayores que cero.')
+        cutoff = timezone.now() - timedelta(days=options['days'])
+        chunk_size = options['chunk_size']
+        
+        position, moved, chunks = None, 0, 0
+        start = time.monotonic()
+        while options['max_chunks'] is None or chunks < options['max_chunks']:
+            count, position = self.archive_chunk(cutoff, position, chunk_size)
+            if not count:
+                break
+            moved += count
+            chunks += 1
+            self.stdout.write(
+                f'Lote {chunks}: {count} tareas ({moved} en total, '
+                f'{self.rate(moved, start):.0f} filas/s)'
+            )
+            if count < chunk_size:
+                break
+            time.sleep(options['sleep'])
+        
+        elapsed = time.monotonic() - start
+        self.stdout.write(self.style.SUCCESS(
+            f'{moved} tareas archivadas en {elapsed:.2f} s '
+            f'({self.rate(moved, start):.0f} filas/s).'
+        ))
+    
+    def archive_chunk(self, cutoff, position, chunk_size):
+        """
+        Archiva un lote y retorna cuántas tareas movió y la posición de la
+        última, desde la que continúa el siguiente lote.
+        """
+        with transaction.atomic():
+            queryset = Task.objects.deleted().filter(updated_at__lt=cutoff).order_by(*self.ordering)
+            if position is not None:
+                queryset = queryset.filter(keyset_after(self.ordering, position))
+            # Las filas bloqueadas por otra transacción quedan para la
+            # siguiente ejecución en lugar de detener el lote.
+            tasks = list(queryset.select_for_update(skip_locked=True)[:chunk_size])
+            if not tasks:
+                return 0, position
+            
+            TaskArchive.objects.bulk_create([TaskArchive.from_task(task) for task in tasks])
+            Task.objects.filter(id__in=[task.id for task in tasks], is_deleted=True).delete()
+        
+        last = tasks[-1]
+        return len(tasks), (last.updated_at, last.id)
+    
+    @staticmethod
+    def rate(rows, start):
+        elapsed = time.monotonic() - start
+        return rows / elapsed if elapsed else 0.0
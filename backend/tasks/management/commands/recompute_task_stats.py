@@ -0,0 +1,84 @@
+"""
+Comando para recalcular los contadores de TaskStats
+"""
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from tasks.models import Task, TaskStats
+
+
+class Command(BaseCommand):
+    """
+    Recalcula los contadores de TaskStats desde la tabla de tareas y
+    corrige las desviaciones encontradas.
+    
+    Procesa los usuarios por lotes. En cada lote bloquea las filas de
+    TaskStats antes de contar, de modo que las escrituras concurrentes
+    esperan y aplican su delta sobre el valor ya corregido.
+    """
+    help = 'Recalcula los contadores de TaskStats y corrige desviaciones.'
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--user', type=int, nargs='+', dest='user_ids',
+            help='IDs de usuario a recalcular (por defecto todos)'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Usuarios por lote (por defecto 1000)'
+        )
+    
+    def handle(self, *args, **options):
+        users = get_user_model().objects.order_by('pk')
+        if options['user_ids']:
+            users = users.filter(pk__in=options['user_ids'])
+        user_ids = list(users.values_list('pk', flat=True))
+        batch_size = options['batch_size']
+        
+        checked = fixed = 0
+        for start in range(0, len(user_ids), batch_size):
+            batch = user_ids[start:start + batch_size]
+            checked += len(batch)
+            fixed += self.recompute_batch(batch)
+        
+        self.stdout.write(self.style.SUCCESS(
+            f'{checked} usuarios revisados, {fixed} contadores corregidos.'
+        ))
+    
+    def recompute_batch(self, user_ids):
+        """
+        Recalcula los contadores de un lote y retorna cuántos se corrigieron.
+        """
+        now = timezone.now()
+        with transaction.atomic():
+            stored = {
+                stats.user_id: stats
+                for stats in TaskStats.objects.select_for_update().filter(user_id__in=user_ids)
+            }
+            actual = {
+                row['user_id']: (row['total'], row['completed'])
+                for row in Task.objects.alive().filter(user_id__in=user_ids)
+                .values('user_id')
+                .annotate(total=Count('id'), completed=Count('id', filter=Q(completed=True)))
+                .order_by()
+            }
+            
+            to_create, to_update = [], []
+            for user_id in user_ids:
+                total, completed = actual.get(user_id, (0, 0))
+                stats = stored.get(user_id)
+                if stats is None:
+                    to_create.append(TaskStats(user_id=user_id, total=total, completed=completed))
+                elif (stats.total, stats.completed) != (total, completed):
+                    stats.total, stats.completed, stats.updated_at = total, completed, now
+                    to_update.append(stats)
+            
+            TaskStats.objects.bulk_create(to_create)
+            TaskStats.objects.bulk_update(to_update, ['total', 'completed', 'updated_at'])
+        
+        for stats in to_update:
+            self.stdout.write(f'Usuario {stats.user_id}: {stats.completed}/{stats.total}')
+        return len(to_update)
@@ -0,0 +1,88 @@
+"""
+Comando para restaurar tareas desde TaskArchive
+"""
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from tasks.cache import invalidate_user
+from tasks.models import Task, TaskArchive, TaskStats
+
+
+class Command(BaseCommand):
+    """
+    Devuelve a Task las tareas archivadas por archive_deleted_tasks.
+    
+    Por defecto se restauran tal como estaban (eliminadas lógicamente, con
+    sus fechas originales). Con --undelete vuelven a estar vivas: su
+    updated_at pasa a ser el momento de la restauración, para que el feed
+    de cambios las entregue, y se recalculan los contadores del usuario.
+    """
+    help = 'Restaura tareas archivadas en TaskArchive.'
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--user', type=int, nargs='+', dest='user_ids',
+            help='Restaura las tareas archivadas de estos usuarios'
+        )
+        parser.add_argument(
+            '--id', type=int, nargs='+', dest='task_ids',
+            help='Restaura las tareas archivadas con estos IDs'
+        )
+        parser.add_argument(
+            '--undelete', action='store_true',
+            help='Restaura las tareas como no eliminadas'
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=1000,
+            help='Tareas por lote y transacción (por defecto 1000)'
+        )
+    
+    def handle(self, *args, **options):
+        if not options['user_ids'] and not options['task_ids']:
+            raise CommandError('Indique --user o --id.')
+        archived = TaskArchive.objects.order_by('id')
+        if options['user_ids']:
+            archived = archived.filter(user_id__in=options['user_ids'])
+        if options['task_ids']:
+            archived = archived.filter(id__in=options['task_ids'])
+        
+        last_id, restored = None, 0
+        while True:
+            chunk = archived if last_id is None else archived.filter(id__gt=last_id)
+            count, last_id = self.restore_chunk(
+                chunk[:options['chunk_size']], options['undelete'], last_id
+            )
+            if not count:
+                break
+            restored += count
+        
+        self.stdout.write(self.style.SUCCESS(f'{restored} tareas restauradas.'))
+    
+    def restore_chunk(self, queryset, undelete, last_id):
+        """
+        Restaura un lote y retorna cuántas tareas movió y el último ID.
+        """
+        with transaction.atomic():
+            rows = list(queryset.select_for_update())
+            if not rows:
+                return 0, last_id
+            
+            now = timezone.now()
+            tasks = [row.to_task() for row in rows]
+            Task.objects.bulk_create(tasks)
+            # bulk_create aplica auto_now/auto_now_add; se reponen las fechas.
+            for task, row in zip(tasks, rows):
+                task.created_at = row.created_at
+                task.updated_at = now if undelete else row.updated_at
+                task.is_deleted = not undelete
+            Task.objects.bulk_update(tasks, ['created_at', 'updated_at', 'is_deleted'])
+            TaskArchive.objects.filter(id__in=[row.id for row in rows]).delete()
+            
+            if undelete:
+                user_ids = {row.user_id for row in rows}
+                for user_id in user_ids:
+                    TaskStats.recompute(user_id)
+                invalidate_user(*user_ids)
+        
+        return len(rows), rows[-1].id
@@ -0,0 +1,216 @@
+"""
+Comando para generar datos de carga realistas
+"""
+import random
+import time
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from tasks.models import Task, TaskStats
+from tasks.utils import explicit_timestamps
+
+TITLES = (
+    'Revisar', 'Preparar', 'Enviar', 'Actualizar', 'Llamar a', 'Comprar',
+    'Organizar', 'Planificar', 'Corregir', 'Documentar',
+)
+SUBJECTS = (
+    'informe mensual', 'presupuesto', 'reunión de equipo', 'factura',
+    'proveedor', 'presentación', 'contrato', 'inventario', 'correo del cliente',
+    'plan de proyecto',
+)
+
+
+class Command(BaseCommand):
+    """
+    Crea usuarios con tareas para reproducir localmente problemas de
+    rendimiento con volúmenes de producción.
+
+    La cantidad de tareas por usuario sigue la distribución elegida:
+    fixed (todas iguales), uniform (entre 0 y el doble de la media) o
+    pareto (cola pesada: pocos usuarios concentran muchas tareas). Los
+    usuarios comparten un hash de contraseña calculado una sola vez, las
+    filas se insertan con bulk_create y cada lote se confirma en su propia
+    transacción. TaskStats se crea con los contadores ya calculados.
+    """
+    help = 'Genera usuarios y tareas de prueba en volumen.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--users', type=int, default=1000,
+            help='Usuarios a crear (por defecto 1000)'
+        )
+        parser.add_argument(
+            '--tasks-per-user', type=int, default=100,
+            help='Media de tareas por usuario (por defecto 100)'
+        )
+        parser.add_argument(
+            '--distribution', choices=('fixed', 'uniform', 'pareto'), default='pareto',
+            help='Distribución de tareas por usuario (por defecto pareto)'
+        )
+        parser.add_argument(
+            '--pareto-alpha', type=float, default=1.5,
+            help='Forma de la distribución pareto; menor es una cola más pesada (por defecto 1.5)'
+        )
+        parser.add_argument(
+            '--max-tasks-per-user', type=int, default=None,
+            help='Máximo de tareas de un usuario (por defecto 100 veces la media)'
+        )
+        parser.add_argument(
+            '--deleted-ratio', type=float, default=0.1,
+            help='Proporción de tareas eliminadas lógicamente (por defecto 0.1)'
+        )
+        parser.add_argument(
+            '--completed-ratio', type=float, default=0.4,
+            help='Proporción de tareas completadas (por defecto 0.4)'
+        )
+        parser.add_argument(
+            '--days', type=int, default=365,
+            help='Días hacia atrás en que se reparten las fechas (por defecto 365)'
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=10000,
+            help='Filas por bulk_create y transacción (por defecto 10000)'
+        )
+        parser.add_argument(
+            '--email-prefix', default='load',
+            help='Los emails son <prefijo>-<n>@example.com (por defecto load)'
+        )
+        parser.add_argument(
+            '--password', default='loadpass123',
+            help='Contraseña de todos los usuarios (por defecto loadpass123)'
+        )
+        parser.add_argument(
+            '--seed', type=int, default=None,
+            help='Semilla para obtener siempre los mismos datos'
+        )
+
+    def handle(self, *args, **options):
+        if options['users'] < 1 or options['chunk_size'] < 1 or options['days'] < 1:
+            raise CommandError('--users, --chunk-size y --days deben ser mayores que cero.')
+        for name in ('deleted_ratio', 'completed_ratio'):
+            if not 0 <= options[name] <= 1:
+                raise CommandError(f'--{name.replace("_", "-")} debe estar entre 0 y 1.')
+        if options['distribution'] == 'pareto' and options['pareto_alpha'] <= 1:
+            raise CommandError('--pareto-alpha debe ser mayor que 1.')
+        User = get_user_model()
+        prefix = options['email_prefix']
+        if User.objects.filter(email__startswith=f'{prefix}-', email__endswith='@example.com').exists():
+            raise CommandError(f'Ya existen usuarios {prefix}-<n>@example.com; usa otro --email-prefix.')
+
+        self.options = options
+        self.random = random.Random(options['seed'])
+        self.now = timezone.now()
+        self.password = make_password(options['password'])
+        chunk_size = options['chunk_size']
+
+        users = tasks = 0
+        start = time.monotonic()
+        with explicit_timestamps(Task, 'created_at', 'updated_at'):
+            for first in range(0, options['users'], chunk_size):
+                user_ids = self.create_users(User, first, min(chunk_size, options['users'] - first))
+                tasks += self.create_tasks(user_ids)
+                users += len(user_ids)
+                self.stdout.write(
+                    f'{users} usuarios, {tasks} tareas '
+                    f'({self.rate(tasks, start):.0f} tareas/s)'
+                )
+
+        elapsed = time.monotonic() - start
+        self.stdout.write(self.style.SUCCESS(
+            f'{users} usuarios y {tasks} tareas creados en {elapsed:.1f} s '
+            f'({self.rate(tasks, start):.0f} tareas/s).'
+        ))
+
+    def create_users(self, User, first, count):
+        """
+        Crea count usuarios con el hash compartido y retorna sus IDs.
+        """
+        prefix = self.options['email_prefix']
+        users = []
+        for index in range(first, first + count):
+            email = f'{prefix}-{index}@example.com'
+            users.append(User(
+                email=email,
+                username=email,
+                password=self.password,
+                first_name='Usuario',
+                last_name=str(index),
+                date_joined=self.now - timedelta(days=self.options['days']),
+            ))
+        with transaction.atomic():
+            User.objects.bulk_create(users)
+        if users[0].pk is None:
+            # Bases de datos que no retornan los IDs de bulk_create.
+            emails = [user.email for user in users]
+            return list(User.objects.filter(email__in=emails).values_list('pk', flat=True))
+        return [user.pk for user in users]
+
+    def task_count(self):
+        """
+        Cantidad de tareas del siguiente usuario según la distribución.
+        """
+        mean = self.options['tasks_per_user']
+        distribution = self.options['distribution']
+        if distribution == 'fixed':
+            count = mean
+        elif distribution == 'uniform':
+            count = self.random.randint(0, 2 * mean)
+        else:
+            # paretovariate(alpha) tiene mínimo 1 y media alpha / (alpha - 1).
+            alpha = self.options['pareto_alpha']
+            count = round(self.random.paretovariate(alpha) * mean * (alpha - 1) / alpha)
+        maximum = self.options['max_tasks_per_user'] or 100 * mean
+        return min(count, maximum)
+
+    def create_tasks(self, user_ids):
+        """
+        Crea las tareas de los usuarios en lotes de chunk_size filas, cada
+        uno en su transacción, y sus TaskStats con el último lote. Retorna
+        cuántas tareas creó.
+        """
+        chunk_size = self.options['chunk_size']
+        deleted_ratio = self.options['deleted_ratio']
+        completed_ratio = self.options['completed_ratio']
+        span = self.options['days'] * 86400
+        rand = self.random.random
+
+        pending, stats, created = [], [], 0
+        for user_id in user_ids:
+            alive = completed = 0
+            for index in range(self.task_count()):
+                created_at = self.now - timedelta(seconds=span * rand())
+                is_deleted = rand() < deleted_ratio
+                is_completed = rand() < completed_ratio
+                if not is_deleted:
+                    alive += 1
+                    completed += is_completed
+                pending.append(Task(
+                    user_id=user_id,
+                    title=f'{self.random.choice(TITLES)} {self.random.choice(SUBJECTS)}',
+                    description=f'Tarea de carga {index}' if rand() < 0.5 else '',
+                    completed=is_completed,
+                    is_deleted=is_deleted,
+                    created_at=created_at,
+                    updated_at=created_at + (self.now - created_at) * rand(),
+                ))
+                if len(pending) >= chunk_size:
+                    with transaction.atomic():
+                        Task.objects.bulk_create(pending)
+                    created += len(pending)
+                    pending = []
+            stats.append(TaskStats(user_id=user_id, total=alive, completed=completed))
+
+        with transaction.atomic():
+            Task.objects.bulk_create(pending)
+            TaskStats.objects.bulk_create(stats)
+        return created + len(pending)
+
+    @staticmethod
+    def rate(rows, start):
+        elapsed = time.monotonic() - start
+        return rows / elapsed if elapsed else 0.0
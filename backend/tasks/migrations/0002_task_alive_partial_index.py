@@ -0,0 +1,42 @@
+# Generated by Django 5.2.8 on 2026-10-17 00:32
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='task',
+            options={'ordering': ['-created_at', '-id'], 'verbose_name': 'Tarea', 'verbose_name_plural': 'Tareas'},
+        ),
+        migrations.RemoveIndex(
+            model_name='task',
+            name='tasks_task_user_id_bad2ed_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='task',
+            name='tasks_task_is_dele_4462d3_idx',
+        ),
+        migrations.AlterField(
+            model_name='task',
+            name='is_deleted',
+            field=models.BooleanField(default=False, help_text='Indica si la tarea fue eliminada (borrado lógico)', verbose_name='Eliminada'),
+        ),
+        migrations.AlterField(
+            model_name='task',
+            name='user',
+            field=models.ForeignKey(db_index=False, help_text='Usuario propietario de la tarea', on_delete=django.db.models.deletion.CASCADE, related_name='tasks', to=settings.AUTH_USER_MODEL, verbose_name='Usuario'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(condition=models.Q(('is_deleted', False)), fields=['user', '-created_at', '-id'], name='task_user_alive_created_idx'),
+        ),
+    ]
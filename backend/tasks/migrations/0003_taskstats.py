@@ -0,0 +1,49 @@
+# Generated by Django 5.2.8 on 2026-10-17 00:33
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Q
+
+
+def populate_task_stats(apps, schema_editor):
+    """
+    Calcula los contadores iniciales de los usuarios que ya tienen tareas.
+    """
+    Task = apps.get_model('tasks', 'Task')
+    TaskStats = apps.get_model('tasks', 'TaskStats')
+    rows = (
+        Task.objects.filter(is_deleted=False)
+        .values('user_id')
+        .annotate(total=Count('id'), completed=Count('id', filter=Q(completed=True)))
+        .order_by()
+    )
+    TaskStats.objects.bulk_create(
+        [TaskStats(**row) for row in rows.iterator()],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0002_task_alive_partial_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TaskStats',
+            fields=[
+                ('user', models.OneToOneField(help_text='Usuario al que pertenecen los contadores', on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='task_stats', serialize=False, to=settings.AUTH_USER_MODEL, verbose_name='Usuario')),
+                ('total', models.PositiveIntegerField(default=0, help_text='Número de tareas no eliminadas', verbose_name='Total')),
+                ('completed', models.PositiveIntegerField(default=0, help_text='Número de tareas no eliminadas y completadas', verbose_name='Completadas')),
+                ('updated_at', models.DateTimeField(auto_now=True, help_text='Fecha y hora de la última actualización de los contadores', verbose_name='Fecha de actualización')),
+            ],
+            options={
+                'verbose_name': 'Estadísticas de tareas',
+                'verbose_name_plural': 'Estadísticas de tareas',
+            },
+        ),
+        migrations.RunPython(populate_task_stats, migrations.RunPython.noop),
+    ]
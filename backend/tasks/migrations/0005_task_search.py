@@ -0,0 +1,26 @@
+from django.db import migrations
+
+from tasks.search import install_search, uninstall_search
+
+
+def forwards(apps, schema_editor):
+    install_search(schema_editor)
+
+
+def backwards(apps, schema_editor):
+    uninstall_search(schema_editor)
+
+
+class Migration(migrations.Migration):
+    """
+    Índice de texto completo sobre title y description: FTS5 con triggers
+    en SQLite y columna tsvector generada con índice GIN en PostgreSQL.
+    """
+
+    dependencies = [
+        ('tasks', '0004_task_user_updated_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(forwards, backwards),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.8 on 2026-10-17 00:57
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0005_task_search'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(condition=models.Q(('is_deleted', False)), fields=['user', 'completed', '-created_at', '-id'], name='task_user_alive_completed_idx'),
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.2.8 on 2026-10-17 01:01
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0006_task_alive_completed_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TaskArchive',
+            fields=[
+                ('id', models.BigIntegerField(help_text='ID original de la tarea', primary_key=True, serialize=False, verbose_name='ID')),
+                ('title', models.CharField(max_length=200, verbose_name='Título')),
+                ('description', models.TextField(blank=True, null=True, verbose_name='Descripción')),
+                ('completed', models.BooleanField(default=False, verbose_name='Completada')),
+                ('created_at', models.DateTimeField(verbose_name='Fecha de creación')),
+                ('updated_at', models.DateTimeField(help_text='Fecha del borrado lógico (última actualización en Task)', verbose_name='Fecha de actualización')),
+                ('archived_at', models.DateTimeField(auto_now_add=True, verbose_name='Fecha de archivo')),
+            ],
+            options={
+                'verbose_name': 'Tarea archivada',
+                'verbose_name_plural': 'Tareas archivadas',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(condition=models.Q(('is_deleted', True)), fields=['updated_at', 'id'], name='task_deleted_updated_idx'),
+        ),
+        migrations.AddField(
+            model_name='taskarchive',
+            name='user',
+            field=models.ForeignKey(help_text='Usuario propietario de la tarea', on_delete=django.db.models.deletion.CASCADE, related_name='archived_tasks', to=settings.AUTH_USER_MODEL, verbose_name='Usuario'),
+        ),
+    ]
@@ -1,8 +1,131 @@
 """
 Modelos para la app de tareas
 """
-from django.db import models
+from collections import defaultdict
+
+from asgiref.sync import sync_to_async
+from django.db import connections, models
+from django.db.models import Count, F, FloatField, Q, sql
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Greatest
 from django.conf import settings
+from django.utils import timezone
+
+from . import search
+
+
+class TaskQuerySet(models.QuerySet):
+    """
+    QuerySet de tareas con filtros para el borrado lógico.
+    
+    Los filtros usan exactamente la condición de los índices parciales
+    (is_deleted=False), de modo que las consultas del listado puedan
+    resolverse con ellos.
+    """
+    
+    def alive(self):
+        """
+        Retorna solo las tareas no eliminadas.
+        """
+        return self.filter(is_deleted=False)
+    
+    def deleted(self):
+        """
+        Retorna solo las tareas eliminadas lógicamente.
+        """
+        return self.filter(is_deleted=True)
+    
+    def alive_for(self, user):
+        """
+        Retorna las tareas no eliminadas del usuario indicado.
+        """
+        return self.alive().filter(user=user)
+    
+    def search(self, text, ranked=True):
+        """
+        Filtra las tareas cuyo título o descripción contienen todas las
+        palabras de text, usando el índice de texto completo del motor
+        (ver tasks.search).
+        
+        Con ranked=True se anota search_rank (mayor es más relevante, con
+        más peso para el título) y se ordena por relevancia y luego por
+        fecha de creación.
+        """
+        terms = search.search_terms(text)
+        if not terms:
+            return self.none()
+        
+        vendor = connections[self.db].vendor
+        if vendor == 'sqlite':
+            table = search.SQLITE_FTS_TABLE
+            match = search.sqlite_match(terms)
+            queryset = self.filter(id__in=RawSQL(
+                f'SELECT rowid FROM {table} WHERE {table} MATCH %s', [match]
+            ))
+            # bm25 es menor cuanto más relevante; se invierte el signo.
+            rank = RawSQL(
+                f'SELECT -bm25({table}, 10.0, 1.0) FROM {table} '
+                f'WHERE {table} MATCH %s AND rowid = "tasks_task"."id"',
+                [match],
+                output_field=FloatField(),
+            )
+        elif vendor == 'postgresql':
+            from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVectorField
+            
+            vector = RawSQL('"tasks_task"."search_vector"', [], output_field=SearchVectorField())
+            query = SearchQuery(' '.join(terms), config=search.POSTGRES_CONFIG)
+            queryset = self.alias(search_vector=vector).filter(search_vector=query)
+            rank = SearchRank(vector, query)
+        else:
+            condition = Q()
+            for term in terms:
+                condition &= Q(title__icontains=term) | Q(description__icontains=term)
+            return self.filter(condition)
+        
+        if not ranked:
+            return queryset
+        return queryset.annotate(search_rank=rank).order_by('-search_rank', '-created_at', '-id')
+    
+    def update_alive(self, pk, user, values, **conditions):
+        """
+        Actualiza una tarea viva del usuario con un único UPDATE condicional
+        (WHERE id = ? AND user_id = ? AND is_deleted = false ...) que solo
+        escribe las columnas indicadas más updated_at.
+        
+        Retorna la tarea ya actualizada, o None si ninguna fila cumplió las
+        condiciones. En PostgreSQL y SQLite >= 3.35 la fila se obtiene con
+        UPDATE ... RETURNING en el mismo viaje a la base de datos; en otros
+        motores se lee con una consulta adicional.
+        """
+        values = {**values, 'updated_at': timezone.now()}
+        queryset = self.alive().filter(pk=pk, user=user, **conditions)
+        connection = connections[self.db]
+        
+        if not self._supports_update_returning(connection):
+            if not queryset.update(**values):
+                return None
+            return self.get(pk=pk)
+        
+        query = queryset.query.chain(sql.UpdateQuery)
+        query.add_update_values(values)
+        update_sql, params = query.get_compiler(self.db).as_sql()
+        columns = ', '.join(
+            connection.ops.quote_name(field.column)
+            for field in self.model._meta.concrete_fields
+        )
+        rows = list(self.model.objects.raw(
+            f'{update_sql} RETURNING {columns}', params, using=self.db
+        ))
+        return rows[0] if rows else None
+    
+    @staticmethod
+    def _supports_update_returning(connection):
+        # SQLite incorporó RETURNING (en INSERT y UPDATE) en la misma versión
+        # que habilita can_return_rows_from_bulk_insert.
+        return (
+            connection.vendor in ('postgresql', 'sqlite')
+            and connection.features.can_return_rows_from_bulk_insert
+        )
 
 
 class Task(models.Model):
@@ -16,6 +139,10 @@ class Task(models.Model):
         settings.AUTH_USER_MODEL,
         on_delete=models.CASCADE,
         related_name='tasks',
+        # Los índices task_user_alive_created_idx y task_user_updated_idx ya
+        # comienzan por user_id; un índice propio de la FK solo duplicaría
+        # sus entradas.
+        db_index=False,
         verbose_name='Usuario',
         help_text='Usuario propietario de la tarea'
     )
@@ -43,7 +170,6 @@ class Task(models.Model):
     
     is_deleted = models.BooleanField(
         default=False,
-        db_index=True,
         verbose_name='Eliminada',
         help_text='Indica si la tarea fue eliminada (borrado lógico)'
     )
@@ -64,12 +190,265 @@ class Task(models.Model):
     class Meta:
         verbose_name = 'Tarea'
         verbose_name_plural = 'Tareas'
-        ordering = ['-created_at']
+        ordering = ['-created_at', '-id']
         indexes = [
-            models.Index(fields=['user', 'is_deleted']),
-            models.Index(fields=['is_deleted', 'created_at']),
+            # Índice parcial que resuelve filtro (usuario, no eliminada) y
+            # ordenamiento del listado en un solo recorrido por rango.
+            # Las filas eliminadas no ocupan espacio en él.
+            models.Index(
+                fields=['user', '-created_at', '-id'],
+                condition=models.Q(is_deleted=False),
+                name='task_user_alive_created_idx',
+            ),
+            # Filtro ?completed= (pestañas pendientes/completadas) con el
+            # mismo ordenamiento y rangos de created_at del listado.
+            models.Index(
+                fields=['user', 'completed', '-created_at', '-id'],
+                condition=models.Q(is_deleted=False),
+                name='task_user_alive_completed_idx',
+            ),
+            # Feed de cambios (GET /api/tasks/changes/): recorre por rango las
+            # tareas del usuario modificadas después de una posición,
+            # incluidas las eliminadas lógicamente.
+            models.Index(
+                fields=['user', 'updated_at', 'id'],
+                name='task_user_updated_idx',
+            ),
+            # Recorrido del comando archive_deleted_tasks; solo contiene las
+            # filas eliminadas, que son las únicas candidatas a archivar.
+            models.Index(
+                fields=['updated_at', 'id'],
+                condition=models.Q(is_deleted=True),
+                name='task_deleted_updated_idx',
+            ),
         ]
     
+    objects = TaskQuerySet.as_manager()
+    
     def __str__(self):
         return f"{self.title} - {self.user.email}"
+    
+    @staticmethod
+    def stats_key_for(user_id, is_deleted, completed):
+        """
+        Retorna la contribución de una tarea a TaskStats como
+        (user_id, total, completadas).
+        """
+        if is_deleted:
+            return (user_id, 0, 0)
+        return (user_id, 1, int(completed))
+    
+    def stats_key(self):
+        """
+        Retorna la contribución actual de la tarea a TaskStats.
+        """
+        return self.stats_key_for(self.user_id, self.is_deleted, self.completed)
+
+
+class TaskStats(models.Model):
+    """
+    Contadores materializados de tareas por usuario.
+    
+    Se actualizan en la misma transacción que cada escritura sobre Task,
+    de modo que las estadísticas y el total del listado se obtienen con
+    una búsqueda por clave primaria en lugar de un COUNT(*).
+    Solo cuentan las tareas no eliminadas.
+    """
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='task_stats',
+        verbose_name='Usuario',
+        help_text='Usuario al que pertenecen los contadores'
+    )
+    
+    total = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Total',
+        help_text='Número de tareas no eliminadas'
+    )
+    
+    completed = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Completadas',
+        help_text='Número de tareas no eliminadas y completadas'
+    )
+    
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        verbose_name='Fecha de actualización',
+        help_text='Fecha y hora de la última actualización de los contadores'
+    )
+    
+    class Meta:
+        verbose_name = 'Estadísticas de tareas'
+        verbose_name_plural = 'Estadísticas de tareas'
+    
+    def __str__(self):
+        return f"{self.user_id}: {self.completed}/{self.total}"
+    
+    @property
+    def pending(self):
+        """
+        Número de tareas pendientes (no completadas).
+        """
+        return self.total - self.completed
+    
+    @staticmethod
+    def count_tasks(user_id):
+        """
+        Calcula los contadores de un usuario directamente desde Task.
+        """
+        return Task.objects.alive().filter(user_id=user_id).aggregate(
+            total=Count('id'),
+            completed=Count('id', filter=Q(completed=True)),
+        )
+    
+    @classmethod
+    def recompute(cls, user_id):
+        """
+        Recalcula y guarda los contadores de un usuario.
+        """
+        stats, _ = cls.objects.update_or_create(
+            user_id=user_id,
+            defaults=cls.count_tasks(user_id),
+        )
+        return stats
+    
+    @classmethod
+    def for_user(cls, user):
+        """
+        Retorna los contadores del usuario, creándolos si aún no existen.
+        """
+        try:
+            return cls.objects.get(user_id=user.pk)
+        except cls.DoesNotExist:
+            return cls.recompute(user.pk)
+    
+    @classmethod
+    async def afor_user(cls, user):
+        """
+        Versión asíncrona de for_user().
+        """
+        try:
+            return await cls.objects.aget(user_id=user.pk)
+        except cls.DoesNotExist:
+            return await sync_to_async(cls.recompute)(user.pk)
+    
+    @classmethod
+    def apply_delta(cls, user_id, total=0, completed=0):
+        """
+        Suma los deltas indicados a los contadores del usuario con un único
+        UPDATE atómico. Si el usuario aún no tiene fila, se calcula desde
+        Task (que ya incluye la escritura en curso).
+        
+        Los resultados se acotan en 0: si los contadores quedaron por debajo
+        del valor real (una corrección manual, una restauración del
+        archivo), un borrado no viola la restricción de los campos ni
+        revierte la escritura del usuario. recompute_task_stats los corrige.
+        """
+        if not total and not completed:
+            return
+        updated = cls.objects.filter(user_id=user_id).update(
+            total=Greatest(F('total') + total, 0),
+            completed=Greatest(F('completed') + completed, 0),
+            updated_at=timezone.now(),
+        )
+        if not updated:
+            cls.recompute(user_id)
+    
+    @classmethod
+    def record_change(cls, before=None, after=None):
+        """
+        Aplica la diferencia entre dos contribuciones (ver Task.stats_key).
+        
+        before es None al crear una tarea y after es None al eliminarla
+        físicamente. Si la tarea cambia de usuario se ajustan ambos.
+        """
+        deltas = defaultdict(lambda: [0, 0])
+        for key, sign in ((before, -1), (after, 1)):
+            if key is None:
+                continue
+            user_id, total, completed = key
+            deltas[user_id][0] += sign * total
+            deltas[user_id][1] += sign * completed
+        for user_id, (total, completed) in deltas.items():
+            cls.apply_delta(user_id, total=total, completed=completed)
+
 
+class TaskArchive(models.Model):
+    """
+    Tareas eliminadas lógicamente que superaron el período de retención.
+    
+    El comando archive_deleted_tasks las mueve desde Task para que la tabla
+    caliente y sus índices no crezcan con filas muertas; conservan su ID y
+    sus fechas originales, por lo que restore_archived_tasks puede
+    devolverlas a Task sin cambios.
+    """
+    id = models.BigIntegerField(
+        primary_key=True,
+        verbose_name='ID',
+        help_text='ID original de la tarea'
+    )
+    
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='archived_tasks',
+        verbose_name='Usuario',
+        help_text='Usuario propietario de la tarea'
+    )
+    
+    title = models.CharField(
+        max_length=200,
+        verbose_name='Título'
+    )
+    
+    description = models.TextField(
+        blank=True,
+        null=True,
+        verbose_name='Descripción'
+    )
+    
+    completed = models.BooleanField(
+        default=False,
+        verbose_name='Completada'
+    )
+    
+    created_at = models.DateTimeField(
+        verbose_name='Fecha de creación'
+    )
+    
+    updated_at = models.DateTimeField(
+        verbose_name='Fecha de actualización',
+        help_text='Fecha del borrado lógico (última actualización en Task)'
+    )
+    
+    archived_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name='Fecha de archivo'
+    )
+    
+    # Campos copiados entre Task y TaskArchive
+    copied_fields = ('id', 'user_id', 'title', 'description', 'completed', 'created_at', 'updated_at')
+    
+    class Meta:
+        verbose_name = 'Tarea archivada'
+        verbose_name_plural = 'Tareas archivadas'
+    
+    def __str__(self):
+        return f"{self.title} ({self.user_id})"
+    
+    @classmethod
+    def from_task(cls, task):
+        """
+        Construye la fila de archivo de una tarea eliminada.
+        """
+        return cls(**{field: getattr(task, field) for field in cls.copied_fields})
+    
+    def to_task(self):
+        """
+        Construye la tarea original, eliminada lógicamente.
+        """
+        return Task(is_deleted=True, **{field: getattr(self, field) for field in self.copied_fields})
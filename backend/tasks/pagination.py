@@ -0,0 +1,282 @@
+"""
+Paginadores para la app de tareas
+"""
+import binascii
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.paginator import Paginator as DjangoPaginator
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from rest_framework import exceptions, status
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, CursorPagination, Cursor, PageNumberPagination
+from rest_framework.response import Response
+
+
+class TaskPageNumberPagination(PageNumberPagination):
+    """
+    PageNumberPagination que reutiliza un conteo ya conocido.
+    
+    Si la vista implementa get_list_count() y retorna un número, ese valor
+    se usa como total del listado y se evita el COUNT(*) del paginador.
+    """
+    
+    def paginate_queryset(self, queryset, request, view=None):
+        get_list_count = getattr(view, 'get_list_count', None)
+        self.known_count = get_list_count() if get_list_count else None
+        return super().paginate_queryset(queryset, request, view)
+    
+    def django_paginator_class(self, object_list, per_page):
+        # PageNumberPagination instancia el paginador de Django mediante
+        # este atributo; al definirlo como método se puede fijar el conteo.
+        paginator = DjangoPaginator(object_list, per_page)
+        if self.known_count is not None:
+            paginator.count = self.known_count
+        return paginator
+
+
+class TaskCursorPagination(CursorPagination):
+    """
+    Paginación por cursor (keyset) sobre la tupla (created_at, id).
+
+    A diferencia de PageNumberPagination no ejecuta COUNT(*) ni usa OFFSET:
+    cada página filtra por la posición del último elemento visto, por lo que
+    el costo es constante sin importar qué tan profunda sea la página.
+
+    El CursorPagination de DRF solo usa el primer campo del ordenamiento y
+    resuelve los empates con un offset; aquí la posición incluye todos los
+    campos del ordenamiento, de modo que las tareas creadas en el mismo
+    instante (por ejemplo con bulk_create) no degradan la paginación.
+    """
+    ordering = ('-created_at', '-id')
+    position_separator = '|'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.cursor = self.decode_cursor(request)
+
+        reverse = bool(self.cursor and self.cursor.reverse)
+        position = self.cursor.position if self.cursor else None
+
+        ordering = _reverse_ordering(self.ordering) if reverse else self.ordering
+        queryset = queryset.order_by(*ordering)
+        if position is not None:
+            try:
+                queryset = queryset.filter(
+                    keyset_after(ordering, self._decode_position(position))
+                )
+            except (ValueError, ValidationError):
+                raise NotFound(self.invalid_cursor_message)
+
+        # Se pide un elemento extra para saber si existe otra página.
+        results = list(queryset[:self.page_size + 1])
+        self.page = results[:self.page_size]
+        has_more = len(results) > self.page_size
+
+        if reverse:
+            self.page.reverse()
+            self.has_next = position is not None
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = position is not None
+
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True
+
+        return self.page
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        # Con una página vacía (retrocediendo más allá del inicio) el
+        # siguiente bloque es simplemente el comienzo del listado.
+        position = self._encode_position(self.page[-1]) if self.page else None
+        return self.encode_cursor(Cursor(offset=0, reverse=False, position=position))
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        position = self._encode_position(self.page[0]) if self.page else None
+        return self.encode_cursor(Cursor(offset=0, reverse=True, position=position))
+
+    def _encode_position(self, instance):
+        values = []
+        for field_name in self._field_names(self.ordering):
+            value = getattr(instance, field_name)
+            values.append(value.isoformat() if hasattr(value, 'isoformat') else str(value))
+        return self.position_separator.join(values)
+
+    def _decode_position(self, position):
+        values = position.split(self.position_separator)
+        if len(values) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+        return values
+
+    @staticmethod
+    def _field_names(ordering):
+        return [order.lstrip('-') for order in ordering]
+
+
+class SyncTokenExpired(exceptions.APIException):
+    """
+    El token de sincronización es anterior al período de retención.
+    """
+    status_code = status.HTTP_410_GONE
+    default_detail = 'El token de sincronización expiró; sincronice de nuevo sin since.'
+    default_code = 'sync_token_expired'
+
+
+class TaskChangesPagination(BasePagination):
+    """
+    Paginación keyset del feed de cambios (GET /api/tasks/changes/).
+
+    Recorre las tareas en orden ascendente de (updated_at, id) a partir de
+    la posición codificada en el token since. La respuesta incluye el token
+    de la última tarea entregada: el cliente lo usa para pedir la página
+    siguiente y, cuando has_more es falso, lo guarda para la próxima
+    sincronización. Como toda escritura actualiza updated_at, una tarea
+    modificada durante el recorrido vuelve a aparecer más adelante.
+
+    updated_at se asigna antes del commit, así que una escritura puede
+    confirmarse después de una sincronización con un updated_at menor que
+    el token y el cliente no la vería nunca. Por eso solo se entregan las
+    tareas con updated_at anterior a TASKS_CHANGES_LAG_SECONDS antes de la
+    petición: una transacción más corta que ese margen ya está confirmada
+    o aparece más adelante en el recorrido.
+
+    El token incluye además el momento hasta el que el cliente tiene todos
+    los cambios: esa cota en la petición que terminó el recorrido
+    (has_more falso), o en la que lo comenzó mientras quedan páginas. Las
+    tareas eliminadas hace más de TASKS_ARCHIVE_RETENTION_DAYS pueden
+    haberse movido a TaskArchive, así que un token con ese momento anterior
+    al período de retención ya no garantiza ver todos los borrados y
+    retorna 410. Un cliente que sincroniza dentro del período nunca lo recibe,
+    aunque sus tareas no cambien. Los tokens sin ese momento (formato
+    anterior) usan el updated_at de la posición.
+    """
+    ordering = ('updated_at', 'id')
+    token_query_param = 'since'
+    page_size_query_param = 'limit'
+    max_page_size = 500
+    invalid_token_message = 'Token de sincronización inválido.'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.page_size = self.get_page_size(request)
+        since = request.query_params.get(self.token_query_param) or None
+        now = timezone.now()
+        self.bound = now - timedelta(seconds=settings.TASKS_CHANGES_LAG_SECONDS)
+        self.position, self.synced_at = None, self.bound
+
+        queryset = queryset.filter(updated_at__lt=self.bound).order_by(*self.ordering)
+        if since is not None:
+            try:
+                self.position, self.synced_at = self.decode_token(since)
+                queryset = queryset.filter(keyset_after(self.ordering, self.position))
+            except (ValueError, ValidationError):
+                raise exceptions.ValidationError({self.token_query_param: [self.invalid_token_message]})
+            retention = timedelta(days=settings.TASKS_ARCHIVE_RETENTION_DAYS)
+            if self.synced_at < now - retention:
+                raise SyncTokenExpired()
+
+        results = list(queryset[:self.page_size + 1])
+        self.page = results[:self.page_size]
+        self.has_more = len(results) > self.page_size
+        return self.page
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return settings.REST_FRAMEWORK['PAGE_SIZE']
+        return min(max(page_size, 1), self.max_page_size)
+
+    def get_token(self):
+        """
+        Retorna el token de la última tarea de la página, o de la posición
+        recibida si no hubo cambios.
+        """
+        if self.page:
+            last = self.page[-1]
+            position = (last.updated_at.isoformat(), str(last.id))
+        elif self.position is not None:
+            position = (self.position[0].isoformat(), self.position[1])
+        else:
+            return None
+        synced_at = self.synced_at if self.has_more else self.bound
+        return self.encode_token((*position, synced_at.isoformat()))
+
+    def get_paginated_response(self, data):
+        return Response({
+            'results': data,
+            'since': self.get_token(),
+            'has_more': self.has_more,
+        })
+
+    def encode_token(self, values):
+        return urlsafe_b64encode('|'.join(values).encode()).decode()
+
+    def decode_token(self, token):
+        """
+        Retorna la posición [updated_at, id] y el momento de sincronización
+        de un token.
+        """
+        try:
+            values = urlsafe_b64decode(token.encode()).decode().split('|')
+        except (binascii.Error, UnicodeError):
+            raise ValueError(token)
+        if len(values) == len(self.ordering):
+            values.append(values[0])
+        if len(values) != len(self.ordering) + 1:
+            raise ValueError(token)
+        updated_at, synced_at = self._parse_datetime(values[0]), self._parse_datetime(values[2])
+        return [updated_at, values[1]], synced_at
+
+    @staticmethod
+    def _parse_datetime(value):
+        parsed = parse_datetime(value)
+        if parsed is None:
+            raise ValueError(value)
+        return timezone.make_aware(parsed) if timezone.is_naive(parsed) else parsed
+
+
+def keyset_after(ordering, values):
+    """
+    Construye el filtro equivalente a "(a, b, ...) viene después de values"
+    respetando la dirección de cada campo del ordenamiento.
+
+    Se agrega además una cota no estricta sobre el primer campo para que
+    el motor pueda iniciar el recorrido del índice directamente en la
+    posición indicada en lugar de filtrar desde el principio.
+    """
+    condition = Q()
+    equal = {}
+    for order, value in zip(ordering, values):
+        field_name = order.lstrip('-')
+        lookup = 'lt' if order.startswith('-') else 'gt'
+        condition |= Q(**equal, **{f'{field_name}__{lookup}': value})
+        equal[field_name] = value
+
+    first = ordering[0]
+    bound = 'lte' if first.startswith('-') else 'gte'
+    return Q(**{f'{first.lstrip("-")}__{bound}': values[0]}) & condition
+
+
+def _reverse_ordering(ordering):
+    """
+    Invierte la dirección de cada campo de un ordenamiento.
+    """
+    return tuple(
+        order[1:] if order.startswith('-') else f'-{order}'
+        for order in ordering
+    )
@@ -0,0 +1,86 @@
+"""
+Parsers de importación para la app de tareas
+"""
+import csv
+import json
+
+from rest_framework.parsers import BaseParser
+
+
+class RowError(Exception):
+    """
+    Fila que no pudo interpretarse en el formato del cuerpo.
+    """
+
+
+def _decode_lines(stream, encoding):
+    """
+    Decodifica el cuerpo línea por línea a medida que se lee.
+    """
+    if stream is None:
+        return
+    for index, line in enumerate(stream):
+        text = line.decode(encoding)
+        if index == 0:
+            text = text.lstrip('\ufeff')
+        yield text
+
+
+class NDJSONParser(BaseParser):
+    """
+    Lee JSON delimitado por saltos de línea sin cargar el cuerpo completo.
+
+    parse() retorna un generador de tuplas (número de línea, objeto); las
+    líneas que no son un objeto JSON se entregan como (línea, RowError).
+    Las líneas vacías se ignoran.
+    """
+    media_type = 'application/x-ndjson'
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        encoding = (parser_context or {}).get('encoding', 'utf-8')
+        return self.rows(_decode_lines(stream, encoding))
+
+    @staticmethod
+    def rows(lines):
+        for line_number, line in enumerate(lines, 1):
+            if not line.strip():
+                continue
+            try:
+                item = json.loads(line)
+            except ValueError:
+                yield line_number, RowError('JSON inválido.')
+                continue
+            if not isinstance(item, dict):
+                yield line_number, RowError('Se esperaba un objeto JSON.')
+                continue
+            yield line_number, item
+
+
+class CSVParser(BaseParser):
+    """
+    Lee CSV con encabezado sin cargar el cuerpo completo.
+
+    parse() retorna un generador de tuplas (número de línea, fila). Las
+    celdas vacías se omiten, ya que CSV no distingue entre vacío y ausente.
+    """
+    media_type = 'text/csv'
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        encoding = (parser_context or {}).get('encoding', 'utf-8')
+        return self.rows(_decode_lines(stream, encoding))
+
+    @staticmethod
+    def rows(lines):
+        reader = csv.DictReader(lines)
+        while True:
+            try:
+                row = next(reader)
+            except StopIteration:
+                return
+            except csv.Error:
+                yield reader.line_num, RowError('CSV inválido.')
+                continue
+            if None in row:
+                yield reader.line_num, RowError('La fila tiene más columnas que el encabezado.')
+                continue
+            yield reader.line_num, {key: value for key, value in row.items() if value not in ('', None)}
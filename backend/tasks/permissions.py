@@ -17,8 +17,9 @@ class IsOwner(permissions.BasePermission):
         """
         Verifica si el usuario tiene permiso para acceder al objeto.
         
-        Retorna True si el usuario es propietario del objeto (obj.user == request.user),
-        False en caso contrario.
+        Retorna True si el usuario es propietario del objeto, False en caso
+        contrario. Compara user_id para no cargar el usuario relacionado
+        con una consulta adicional.
         """
-        return obj.user == request.user
+        return obj.user_id == request.user.pk
 
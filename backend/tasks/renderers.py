@@ -0,0 +1,64 @@
+"""
+Renderers de exportación para la app de tareas
+"""
+import csv
+import io
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from rest_framework.renderers import BaseRenderer
+
+
+class NDJSONRenderer(BaseRenderer):
+    """
+    JSON delimitado por saltos de línea: un objeto por línea.
+
+    render() escribe una respuesta completa; la exportación escribe las
+    filas por lotes con render_rows() a medida que llegan de la base de
+    datos, y sus errores se responden en JSON (ver
+    TaskViewSet.handle_exception).
+    """
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        rows = data if isinstance(data, list) else [data]
+        return self.render_rows(None, rows).encode(self.charset)
+
+    def render_header(self, fields):
+        return ''
+
+    def render_rows(self, fields, rows):
+        return ''.join(
+            json.dumps(row, cls=DjangoJSONEncoder, ensure_ascii=False) + '\n'
+            for row in rows
+        )
+
+
+class CSVRenderer(BaseRenderer):
+    """
+    CSV con una fila de encabezado.
+    """
+    media_type = 'text/csv'
+    format = 'csv'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        rows = data if isinstance(data, list) else [data]
+        fields = list(rows[0]) if rows else []
+        return (self.render_header(fields) + self.render_rows(fields, rows)).encode(self.charset)
+
+    def render_header(self, fields):
+        buffer = io.StringIO()
+        csv.writer(buffer).writerow(fields)
+        return buffer.getvalue()
+
+    def render_rows(self, fields, rows):
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerows(
+            ['' if row.get(field) is None else row[field] for field in fields]
+            for row in rows
+        )
+        return buffer.getvalue()
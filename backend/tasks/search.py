@@ -0,0 +1,119 @@
+"""
+Búsqueda de texto completo sobre el título y la descripción de las tareas
+
+- SQLite: tabla virtual FTS5 de contenido externo (tasks_task_fts) que se
+  mantiene al día con triggers sobre tasks_task.
+- PostgreSQL: columna generada search_vector (tsvector) con índice GIN.
+
+En otros motores la búsqueda recurre a icontains, sin índice ni ranking.
+"""
+import re
+
+SQLITE_FTS_TABLE = 'tasks_task_fts'
+POSTGRES_CONFIG = 'spanish'
+
+# Límite de términos por búsqueda, para acotar el costo de la consulta.
+MAX_TERMS = 10
+
+# El trigger de UPDATE solo se dispara cuando cambian title o description,
+# por lo que marcar una tarea como completada o eliminarla no toca el índice.
+SQLITE_INSTALL = (
+    f"""
+    CREATE VIRTUAL TABLE {SQLITE_FTS_TABLE} USING fts5(
+        title, description,
+        content='tasks_task', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    f"""
+    CREATE TRIGGER {SQLITE_FTS_TABLE}_ai AFTER INSERT ON tasks_task BEGIN
+        INSERT INTO {SQLITE_FTS_TABLE}(rowid, title, description)
+        VALUES (new.id, new.title, new.description);
+    END
+    """,
+    f"""
+    CREATE TRIGGER {SQLITE_FTS_TABLE}_ad AFTER DELETE ON tasks_task BEGIN
+        INSERT INTO {SQLITE_FTS_TABLE}({SQLITE_FTS_TABLE}, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+    END
+    """,
+    f"""
+    CREATE TRIGGER {SQLITE_FTS_TABLE}_au AFTER UPDATE OF title, description ON tasks_task BEGIN
+        INSERT INTO {SQLITE_FTS_TABLE}({SQLITE_FTS_TABLE}, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+        INSERT INTO {SQLITE_FTS_TABLE}(rowid, title, description)
+        VALUES (new.id, new.title, new.description);
+    END
+    """,
+    f"INSERT INTO {SQLITE_FTS_TABLE}({SQLITE_FTS_TABLE}) VALUES ('rebuild')",
+)
+
+SQLITE_UNINSTALL = (
+    f'DROP TRIGGER IF EXISTS {SQLITE_FTS_TABLE}_ai',
+    f'DROP TRIGGER IF EXISTS {SQLITE_FTS_TABLE}_ad',
+    f'DROP TRIGGER IF EXISTS {SQLITE_FTS_TABLE}_au',
+    f'DROP TABLE IF EXISTS {SQLITE_FTS_TABLE}',
+)
+
+# La columna generada se recalcula en cada INSERT/UPDATE dentro de la misma
+# sentencia, sin triggers ni código de aplicación.
+POSTGRES_INSTALL = (
+    f"""
+    ALTER TABLE tasks_task ADD COLUMN search_vector tsvector GENERATED ALWAYS AS (
+        setweight(to_tsvector('{POSTGRES_CONFIG}', coalesce(title, '')), 'A')
+        || setweight(to_tsvector('{POSTGRES_CONFIG}', coalesce(description, '')), 'B')
+    ) STORED
+    """,
+    'CREATE INDEX task_search_idx ON tasks_task USING GIN (search_vector)',
+)
+
+POSTGRES_UNINSTALL = (
+    'DROP INDEX IF EXISTS task_search_idx',
+    'ALTER TABLE tasks_task DROP COLUMN IF EXISTS search_vector',
+)
+
+
+def install_search(schema_editor):
+    """
+    Crea el índice de texto completo del motor actual.
+
+    En SQLite, las operaciones que reconstruyen tasks_task (por ejemplo
+    AlterField o RemoveField) eliminan sus triggers: las migraciones que las
+    incluyan deben llamar a uninstall_search antes y a install_search después.
+    """
+    statements = {
+        'sqlite': SQLITE_INSTALL,
+        'postgresql': POSTGRES_INSTALL,
+    }.get(schema_editor.connection.vendor, ())
+    for statement in statements:
+        schema_editor.execute(statement)
+
+
+def uninstall_search(schema_editor):
+    """
+    Elimina el índice de texto completo del motor actual.
+    """
+    statements = {
+        'sqlite': SQLITE_UNINSTALL,
+        'postgresql': POSTGRES_UNINSTALL,
+    }.get(schema_editor.connection.vendor, ())
+    for statement in statements:
+        schema_editor.execute(statement)
+
+
+def search_terms(text):
+    """
+    Extrae las palabras de una búsqueda del usuario.
+
+    Solo se conservan caracteres de palabra, de modo que la entrada no puede
+    introducir operadores de la sintaxis de FTS5 ni de tsquery.
+    """
+    return re.findall(r'\w+', text)[:MAX_TERMS]
+
+
+def sqlite_match(terms):
+    """
+    Construye la expresión MATCH de FTS5: todos los términos, cada uno entre
+    comillas para que se interprete literalmente.
+    """
+    return ' '.join(f'"{term}"' for term in terms)
@@ -2,7 +2,7 @@
 Serializers para la app de tareas
 """
 from rest_framework import serializers
-from .models import Task
+from .models import Task, TaskStats
 
 
 class TaskSerializer(serializers.ModelSerializer):
@@ -26,3 +26,27 @@ class TaskSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError("El título no puede estar vacío.")
         return value.strip()
 
+
+class TaskChangeSerializer(TaskSerializer):
+    """
+    Serializer de solo lectura para el feed de cambios.
+    
+    A diferencia de TaskSerializer incluye is_deleted, para que el cliente
+    pueda eliminar de su copia local las tareas borradas lógicamente.
+    """
+    
+    class Meta(TaskSerializer.Meta):
+        fields = TaskSerializer.Meta.fields + ('is_deleted',)
+        read_only_fields = fields
+
+
+class TaskStatsSerializer(serializers.ModelSerializer):
+    """
+    Serializer para los contadores de tareas del usuario.
+    """
+    pending = serializers.IntegerField(read_only=True)
+    
+    class Meta:
+        model = TaskStats
+        fields = ('total', 'completed', 'pending', 'updated_at')
+        read_only_fields = fields
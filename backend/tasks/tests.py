@@ -1,22 +1,60 @@
 """
 Tests para la app de tareas
 """
-from django.test import TestCase
+import base64
+import csv
+import json
+import tempfile
+import threading
+import time
+from datetime import timedelta
+from io import StringIO
+from pathlib import Path
+from unittest import mock, skipUnless
+
+from django.db import OperationalError, connection, connections, transaction
+from django.db.backends.sqlite3.base import DatabaseWrapper
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.contrib.auth import get_user_model
 from rest_framework.test import APIClient
 from rest_framework import status
-from .models import Task
+from rest_framework_simplejwt.tokens import RefreshToken
+from django.core.management import CommandError, call_command
+from django.utils import timezone
+from authentication.cache import token_cache, user_cache
+from .models import Task, TaskArchive, TaskStats
+from .cache import counters, get_cache
+from .pagination import TaskCursorPagination
 
 User = get_user_model()
 
 
-class TaskCRUDTests(TestCase):
+class TaskAPITestCase(TestCase):
+    """
+    Base de los tests de la API de tareas.
+    
+    Limpia la caché de respuestas y la de autenticación antes de cada
+    test: al revertir la transacción de cada test los IDs de usuario se
+    reutilizan, y una entrada de un test anterior podría responder en el
+    siguiente.
+    """
+    
+    def setUp(self):
+        super().setUp()
+        get_cache().clear()
+        user_cache.clear()
+        token_cache.clear()
+
+
+class TaskCRUDTests(TaskAPITestCase):
     """
     Tests para las operaciones CRUD de tareas.
     """
     
     def setUp(self):
         """Configuración inicial para cada test."""
+        super().setUp()
         self.client = APIClient()
         self.tasks_url = '/api/tasks/'
         
@@ -192,13 +230,14 @@ class TaskCRUDTests(TestCase):
         self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
 
 
-class TaskPermissionsTests(TestCase):
+class TaskPermissionsTests(TaskAPITestCase):
     """
     Tests para verificar los permisos de acceso a tareas.
     """
     
     def setUp(self):
         """Configuración inicial para cada test."""
+        super().setUp()
         self.client = APIClient()
         self.tasks_url = '/api/tasks/'
         
@@ -292,3 +331,1694 @@ class TaskPermissionsTests(TestCase):
         self.assertEqual(len(tasks_data), 1)
         self.assertEqual(tasks_data[0]['title'], 'Tarea usuario 1')
 
+
+
+class TaskCursorPaginationTests(TaskAPITestCase):
+    """
+    Tests para la paginación por cursor del listado de tareas.
+    """
+    
+    def setUp(self):
+        """Configuración inicial para cada test."""
+        super().setUp()
+        self.client = APIClient()
+        self.tasks_url = '/api/tasks/'
+        
+        self.user = User.objects.create_user(
+            email='cursor@example.com',
+            password='testpass123',
+            first_name='Cursor',
+            last_name='User'
+        )
+        self.client.force_authenticate(user=self.user)
+        
+        # 45 tareas con el mismo created_at para forzar empates en la posición
+        tasks = Task.objects.bulk_create([
+            Task(user=self.user, title=f'Tarea {i}') for i in range(45)
+        ])
+        self.expected_ids = sorted((task.id for task in tasks), reverse=True)
+    
+    def test_cursor_pagination_opt_in_has_no_count(self):
+        """Test: El modo cursor no expone count y entrega el primer bloque."""
+        response = self.client.get(self.tasks_url, {'pagination': 'cursor'}, format='json')
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn('count', response.data)
+        self.assertIsNone(response.data['previous'])
+        self.assertIsNotNone(response.data['next'])
+        self.assertEqual(
+            [task['id'] for task in response.data['results']],
+            self.expected_ids[:20]
+        )
+    
+    def test_cursor_pagination_walks_forward_and_back(self):
+        """Test: Los cursores next/previous recorren todas las tareas sin repetir."""
+        seen = []
+        url = f'{self.tasks_url}?pagination=cursor'
+        while url:
+            response = self.client.get(url, format='json')
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            seen.extend(task['id'] for task in response.data['results'])
+            last_page = response.data
+            url = response.data['next']
+        
+        self.assertEqual(seen, self.expected_ids)
+        
+        # Retroceder desde la última página devuelve la página anterior completa
+        response = self.client.get(last_page['previous'], format='json')
+        self.assertEqual(
+            [task['id'] for task in response.data['results']],
+            self.expected_ids[20:40]
+        )
+    
+    def test_page_number_pagination_is_default(self):
+        """Test: Sin opt-in se mantiene la paginación por número de página."""
+        response = self.client.get(self.tasks_url, format='json')
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['count'], 45)
+    
+    def test_invalid_cursor_returns_404(self):
+        """Test: Un cursor malformado retorna 404."""
+        response = self.client.get(self.tasks_url, {'cursor': 'no-es-un-cursor'}, format='json')
+        
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        
+        # Cursor bien codificado pero con una posición que no es una fecha
+        position = base64.b64encode(b'p=fecha%7C1').decode('ascii')
+        response = self.client.get(self.tasks_url, {'cursor': position}, format='json')
+        
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+@skipUnless(connection.vendor in ('sqlite', 'postgresql'), 'EXPLAIN específico de SQLite/PostgreSQL')
+class TaskQueryPlanTests(TaskAPITestCase):
+    """
+    Verifica mediante EXPLAIN que las consultas calientes usan el índice
+    parcial de tareas vivas en lugar de recorrer la tabla.
+    """
+    
+    index_name = 'task_user_alive_created_idx'
+    
+    def setUp(self):
+        """Configuración inicial para cada test."""
+        super().setUp()
+        self.client = APIClient()
+        self.tasks_url = '/api/tasks/'
+        
+        self.user = User.objects.create_user(
+            email='plan@example.com',
+            password='testpass123',
+            first_name='Plan',
+            last_name='User'
+        )
+        self.client.force_authenticate(user=self.user)
+        self.task = Task.objects.create(user=self.user, title='Tarea viva')
+        Task.objects.create(user=self.user, title='Tarea eliminada', is_deleted=True)
+        TaskStats.recompute(self.user.pk)
+    
+    def explain(self, sql):
+        """Retorna el plan de ejecución de una consulta como texto."""
+        with connection.cursor() as cursor:
+            if connection.vendor == 'postgresql':
+                # Con tablas diminutas PostgreSQL prefiere un seq scan
+                cursor.execute('SET LOCAL enable_seqscan = off')
+                cursor.execute(f'EXPLAIN {sql}')
+            else:
+                cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+            return '\n'.join(' '.join(map(str, row)) for row in cursor.fetchall())
+    
+    def captured_selects(self, request):
+        """Ejecuta la petición y retorna las consultas SELECT sobre tareas."""
+        with CaptureQueriesContext(connection) as context:
+            response = request()
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [
+            query['sql'] for query in context.captured_queries
+            if query['sql'].startswith('SELECT') and 'FROM "tasks_task"' in query['sql']
+        ]
+    
+    def test_list_uses_partial_index(self):
+        """Test: El listado usa el índice parcial y su ETag el de updated_at, sin COUNT."""
+        queries = self.captured_selects(lambda: self.client.get(self.tasks_url))
+        
+        self.assertEqual(len(queries), 2)
+        self.assertFalse(any('COUNT(' in sql for sql in queries))
+        etag_sql, list_sql = queries
+        self.assertIn('MAX(', etag_sql)
+        self.assertIn('task_user_updated_idx', self.explain(etag_sql))
+        plan = self.explain(list_sql)
+        self.assertIn(self.index_name, plan)
+        # El índice ya entrega el orden: no hay ordenamiento adicional
+        self.assertNotIn('TEMP B-TREE', plan)
+        self.assertNotIn('Sort', plan)
+    
+    def test_count_uses_index(self):
+        """Test: El COUNT de tareas vivas (recompute de TaskStats) busca por índice."""
+        with CaptureQueriesContext(connection) as context:
+            Task.objects.alive_for(self.user).count()
+        
+        # Sin estadísticas (ANALYZE) el motor puede elegir cualquiera de los
+        # índices que comienzan por user_id; lo importante es no recorrer la tabla.
+        plan = self.explain(context.captured_queries[0]['sql'])
+        self.assertIn('task_user_', plan)
+        self.assertNotIn('SCAN tasks_task', plan)
+        self.assertNotIn('Seq Scan', plan)
+    
+    def test_cursor_list_uses_partial_index(self):
+        """Test: La paginación por cursor también usa el índice parcial."""
+        queries = self.captured_selects(
+            lambda: self.client.get(self.tasks_url, {'pagination': 'cursor'})
+        )
+        
+        self.assertEqual(len(queries), 2)
+        plan = self.explain(queries[-1])
+        self.assertIn(self.index_name, plan)
+        self.assertNotIn('TEMP B-TREE', plan)
+    
+    def test_retrieve_uses_index(self):
+        """Test: El detalle se resuelve con una búsqueda por índice."""
+        queries = self.captured_selects(
+            lambda: self.client.get(f'{self.tasks_url}{self.task.id}/')
+        )
+        
+        self.assertEqual(len(queries), 1)
+        plan = self.explain(queries[0])
+        self.assertTrue(
+            self.index_name in plan or 'PRIMARY KEY' in plan or 'pkey' in plan,
+            plan
+        )
+        self.assertNotIn('SCAN tasks_task', plan)
+        self.assertNotIn('Seq Scan', plan)
+
+
+class TaskStatsTests(TaskAPITestCase):
+    """
+    Tests para los contadores materializados de tareas.
+    """
+    
+    def setUp(self):
+        """Configuración inicial para cada test."""
+        super().setUp()
+        self.client = APIClient()
+        self.tasks_url = '/api/tasks/'
+        self.stats_url = '/api/tasks/stats/'
+        
+        self.user = User.objects.create_user(
+            email='stats@example.com',
+            password='testpass123',
+            first_name='Stats',
+            last_name='User'
+        )
+        self.client.force_authenticate(user=self.user)
+    
+    def get_stats(self):
+        response = self.client.get(self.stats_url, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data
+    
+    def test_stats_follow_create_update_and_delete(self):
+        """Test: Los contadores se actualizan con cada escritura de la API."""
+        first = self.client.post(self.tasks_url, {'title': 'Uno'}, format='json').data
+        self.client.post(self.tasks_url, {'title': 'Dos', 'completed': True}, format='json')
+        self.client.post(self.tasks_url, {'title': 'Tres'}, format='json')
+        
+        stats = self.get_stats()
+        self.assertEqual((stats['total'], stats['completed'], stats['pending']), (3, 1, 2))
+        
+        self.client.patch(f"{self.tasks_url}{first['id']}/", {'completed': True}, format='json')
+        stats = self.get_stats()
+        self.assertEqual((stats['total'], stats['completed'], stats['pending']), (3, 2, 1))
+        
+        self.client.delete(f"{self.tasks_url}{first['id']}/")
+        stats = self.get_stats()
+        self.assertEqual((stats['total'], stats['completed'], stats['pending']), (2, 1, 1))
+    
+    def test_stats_created_for_existing_tasks(self):
+        """Test: Sin fila de contadores se calculan desde las tareas existentes."""
+        Task.objects.create(user=self.user, title='Existente', completed=True)
+        Task.objects.create(user=self.user, title='Eliminada', is_deleted=True)
+        
+        stats = self.get_stats()
+        
+        self.assertEqual((stats['total'], stats['completed'], stats['pending']), (1, 1, 0))
+        self.assertTrue(TaskStats.objects.filter(user=self.user).exists())
+    
+    def test_list_count_comes_from_stats(self):
+        """Test: El total del listado se toma de TaskStats sin COUNT(*)."""
+        for i in range(3):
+            self.client.post(self.tasks_url, {'title': f'Tarea {i}'}, format='json')
+        
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(self.tasks_url, format='json')
+        
+        self.assertEqual(response.data['count'], 3)
+        self.assertFalse(any('COUNT(' in query['sql'] for query in context.captured_queries))
+    
+    def test_recompute_command_fixes_drift(self):
+        """Test: recompute_task_stats corrige contadores desviados."""
+        Task.objects.create(user=self.user, title='Uno', completed=True)
+        Task.objects.create(user=self.user, title='Dos')
+        TaskStats.objects.create(user=self.user, total=10, completed=0)
+        
+        call_command('recompute_task_stats', stdout=StringIO())
+        
+        stats = TaskStats.objects.get(user=self.user)
+        self.assertEqual((stats.total, stats.completed), (2, 1))
+
+    
+    def test_writes_survive_drifted_counters(self):
+        """Test: Con contadores por debajo del valor real las escrituras no fallan."""
+        task = Task.objects.create(user=self.user, title='Uno', completed=True)
+        TaskStats.objects.create(user=self.user, total=0, completed=0)
+        
+        response = self.client.patch(f'{self.tasks_url}{task.id}/', {'completed': False}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        response = self.client.delete(f'{self.tasks_url}{task.id}/')
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        
+        task.refresh_from_db()
+        self.assertTrue(task.is_deleted)
+        stats = TaskStats.objects.get(user=self.user)
+        self.assertEqual((stats.total, stats.completed), (0, 0))
+
+class TaskBulkTests(TaskAPITestCase):
+    """
+    Tests para los endpoints masivos /api/tasks/bulk/.
+    """
+    
+    def setUp(self):
+        """Configuración inicial para cada test."""
+        super().setUp()
+        self.client = APIClient()
+        self.bulk_url = '/api/tasks/bulk/'
+        
+        self.user = User.objects.create_user(
+            email='bulk@example.com',
+            password='testpass123',
+            first_name='Bulk',
+            last_name='User'
+        )
+        self.other_user = User.objects.create_user(
+            email='other-bulk@example.com',
+            password='testpass123',
+            first_name='Other',
+            last_name='User'
+        )
+        self.client.force_authenticate(user=self.user)
+        TaskStats.recompute(self.user.pk)
+    
+    def test_bulk_create_reports_per_item_results(self):
+        """Test: POST masivo crea los válidos y reporta errores por elemento."""
+        data = [
+            {'title': '  Primera  '},
+            {'title': '   '},
+            {'title': 'Tercera', 'completed': True},
+            {'description': 'Sin título'},
+        ]
+        response = self.client.post(self.bulk_url, data, format='json')
+        
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual((response.data['succeeded'], response.data['failed']), (2, 2))
+        results = response.data['results']
+        self.assertEqual(results[0]['data']['title'], 'Primera')
+        self.assertIn('title', results[1]['errors'])
+        self.assertIn('title', results[3]['errors'])
+        self.assertEqual(Task.objects.filter(user=self.user).count(), 2)
+        
+        stats = TaskStats.objects.get(user=self.user)
+        self.assertEqual((stats.total, stats.completed), (2, 1))
+    
+    def test_bulk_create_100_items_in_few_queries(self):
+        """Test: Crear 100 tareas no ejecuta una consulta por tarea."""
+        data = [{'title': f'Tarea {i}'} for i in range(100)]
+        
+        # SAVEPOINT, INSERT masivo, UPDATE de contadores y RELEASE
+        with self.assertNumQueries(4):
+            response = self.client.post(self.bulk_url, data, format='json')
+        
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Task.objects.filter(user=self.user).count(), 100)
+    
+    def test_bulk_update_in_few_queries(self):
+        """Test: PATCH masivo actualiza con una lectura y un UPDATE."""
+        tasks = Task.objects.bulk_create([
+            Task(user=self.user, title=f'Tarea {i}') for i in range(100)
+        ])
+        TaskStats.recompute(self.user.pk)
+        data = [{'id': task.id, 'completed': True} for task in tasks]
+        
+        # SAVEPOINT, SELECT, UPDATE masivo, UPDATE de contadores y RELEASE
+        with self.assertNumQueries(5):
+            response = self.client.patch(self.bulk_url, data, format='json')
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(Task.objects.filter(user=self.user, completed=True).count(), 100)
+        self.assertEqual(TaskStats.objects.get(user=self.user).completed, 100)
+    
+    def test_bulk_update_rejects_foreign_and_invalid_items(self):
+        """Test: PATCH masivo no toca tareas ajenas y valida el título."""
+        own = Task.objects.create(user=self.user, title='Propia')
+        foreign = Task.objects.create(user=self.other_user, title='Ajena')
+        data = [
+            {'id': own.id, 'title': ''},
+            {'id': foreign.id, 'title': 'Modificada'},
+            {'title': 'Sin id'},
+        ]
+        
+        response = self.client.patch(self.bulk_url, data, format='json')
+        
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['failed'], 3)
+        foreign.refresh_from_db()
+        self.assertEqual(foreign.title, 'Ajena')
+    
+    def test_bulk_delete_soft_deletes_own_tasks(self):
+        """Test: DELETE masivo marca como eliminadas solo las tareas propias."""
+        own = Task.objects.create(user=self.user, title='Propia', completed=True)
+        keep = Task.objects.create(user=self.user, title='Se queda')
+        foreign = Task.objects.create(user=self.other_user, title='Ajena')
+        TaskStats.recompute(self.user.pk)
+        
+        response = self.client.delete(self.bulk_url, [own.id, foreign.id, own.id], format='json')
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual((response.data['succeeded'], response.data['failed']), (1, 2))
+        own.refresh_from_db()
+        keep.refresh_from_db()
+        foreign.refresh_from_db()
+        self.assertTrue(own.is_deleted)
+        self.assertFalse(keep.is_deleted)
+        self.assertFalse(foreign.is_deleted)
+        stats = TaskStats.objects.get(user=self.user)
+        self.assertEqual((stats.total, stats.completed), (1, 0))
+    
+    def test_bulk_rejects_boolean_ids(self):
+        """Test: true y false no se interpretan como los IDs 1 y 0."""
+        task = Task.objects.create(id=1, user=self.user, title='Primera')
+        TaskStats.recompute(self.user.pk)
+        
+        response = self.client.patch(self.bulk_url, [{'id': True, 'title': 'Cambiada'}], format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['failed'], 1)
+        
+        response = self.client.delete(self.bulk_url, [True], format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['failed'], 1)
+        
+        task.refresh_from_db()
+        self.assertEqual(task.title, 'Primera')
+        self.assertFalse(task.is_deleted)
+    
+    def test_bulk_rejects_non_list_and_oversized_payloads(self):
+        """Test: Se rechazan cuerpos que no son listas o exceden el máximo."""
+        response = self.client.post(self.bulk_url, {'title': 'Una'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        
+        with self.settings(TASKS_BULK_MAX_ITEMS=2):
+            response = self.client.post(
+                self.bulk_url, [{'title': 'a'}, {'title': 'b'}, {'title': 'c'}], format='json'
+            )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class TaskWritePathQueryTests(TaskAPITestCase):
+    """
+    Fija el número de consultas de PATCH y DELETE sobre una tarea.
+    
+    Dentro de TestCase cada transaction.atomic agrega un SAVEPOINT y un
+    RELEASE SAVEPOINT a las consultas contadas.
+    """
+    
+    def setUp(self):
+        """Configuración inicial para cada test."""
+        super().setUp()
+        self.client = APIClient()
+        self.tasks_url = '/api/tasks/'
+        
+        self.user = User.objects.create_user(
+            email='writes@example.com',
+            password='testpass123',
+            first_name='Writes',
+            last_name='User'
+        )
+        self.other_user = User.objects.create_user(
+            email='other-writes@example.com',
+            password='testpass123',
+            first_name='Other',
+            last_name='User'
+        )
+        self.client.force_authenticate(user=self.user)
+        self.task = Task.objects.create(user=self.user, title='Tarea', description='Texto')
+        TaskStats.recompute(self.user.pk)
+    
+    def test_toggle_complete_is_single_update(self):
+        """Test: Marcar como completada es un UPDATE más el de contadores."""
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.patch(
+                f'{self.tasks_url}{self.task.id}/', {'completed': True}, format='json'
+            )
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['completed'], True)
+        self.assertEqual(response.data['title'], 'Tarea')
+        self.assertEqual(response.data['description'], 'Texto')
+        statements = [query['sql'] for query in context.captured_queries
+                      if 'SAVEPOINT' not in query['sql']]
+        self.assertEqual(len(statements), 2)
+        self.assertTrue(statements[0].startswith('UPDATE "tasks_task"'))
+        self.assertTrue(statements[1].startswith('UPDATE "tasks_taskstats"'))
+        # Solo se escriben las columnas modificadas
+        self.assertNotIn('"title"', statements[0].split('WHERE')[0])
+        self.assertEqual(TaskStats.objects.get(user=self.user).completed, 1)
+    
+    def test_patch_without_completed_touches_only_task(self):
+        """Test: Cambiar el título no actualiza los contadores."""
+        with self.assertNumQueries(3):
+            response = self.client.patch(
+                f'{self.tasks_url}{self.task.id}/', {'title': ' Nuevo '}, format='json'
+            )
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['title'], 'Nuevo')
+        self.task.refresh_from_db()
+        self.assertEqual(self.task.title, 'Nuevo')
+    
+    def test_patch_same_completed_value_keeps_stats(self):
+        """Test: Repetir el mismo estado no altera los contadores."""
+        response = self.client.patch(
+            f'{self.tasks_url}{self.task.id}/', {'completed': False}, format='json'
+        )
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(TaskStats.objects.get(user=self.user).completed, 0)
+    
+    def test_delete_is_single_update(self):
+        """Test: El borrado lógico es un UPDATE más el de contadores."""
+        with self.assertNumQueries(4):
+            response = self.client.delete(f'{self.tasks_url}{self.task.id}/')
+        
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.task.refresh_from_db()
+        self.assertTrue(self.task.is_deleted)
+        self.assertEqual(TaskStats.objects.get(user=self.user).total, 0)
+    
+    def test_missing_rows_return_404_without_changes(self):
+        """Test: Tareas ajenas, eliminadas o inexistentes retornan 404."""
+        foreign = Task.objects.create(user=self.other_user, title='Ajena')
+        deleted = Task.objects.create(user=self.user, title='Eliminada', is_deleted=True)
+        
+        for task_id in (foreign.id, deleted.id, 999999, 'abc'):
+            response = self.client.patch(
+                f'{self.tasks_url}{task_id}/', {'completed': True}, format='json'
+            )
+            self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+            response = self.client.delete(f'{self.tasks_url}{task_id}/')
+            self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        
+        foreign.refresh_from_db()
+        self.assertFalse(foreign.completed)
+        self.assertFalse(foreign.is_deleted)
+        self.assertEqual(TaskStats.objects.get(user=self.user).completed, 0)
+    
+    def test_patch_validation_still_applies(self):
+        """Test: El PATCH rápido mantiene la validación del título."""
+        with self.assertNumQueries(0):
+            response = self.client.patch(
+                f'{self.tasks_url}{self.task.id}/', {'title': '   '}, format='json'
+            )
+        
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class TaskConditionalGetTests(TaskAPITestCase):
+    """
+    Tests para ETag / Last-Modified en el listado y el detalle.
+    """
+    
+    def setUp(self):
+        """Configuración inicial para cada test."""
+        super().setUp()
+        self.client = APIClient()
+        self.tasks_url = '/api/tasks/'
+        
+        self.user = User.objects.create_user(
+            email='etag@example.com',
+            password='testpass123',
+            first_name='Etag',
+            last_name='User'
+        )
+        self.client.force_authenticate(user=self.user)
+        self.task = Task.objects.create(user=self.user, title='Tarea')
+    
+    def test_list_returns_304_without_loading_rows(self):
+        """Test: Con If-None-Match vigente el listado responde 304 con una consulta."""
+        response = self.client.get(self.tasks_url)
+        etag = response['ETag']
+        self.assertIn('Last-Modified', response)
+        
+        # Sin la respuesta en caché: contadores de TaskStats y max(updated_at)
+        get_cache().clear()
+        with self.assertNumQueries(2):
+            response = self.client.get(self.tasks_url, HTTP_IF_NONE_MATCH=etag)
+        
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response['ETag'], etag)
+    
+    def test_list_etag_changes_after_writes(self):
+        """Test: Crear, editar o eliminar una tarea invalida el ETag del listado."""
+        etag = self.client.get(self.tasks_url)['ETag']
+        
+        writes = [
+            lambda: self.client.post(self.tasks_url, {'title': 'Nueva'}, format='json'),
+            lambda: self.client.patch(f'{self.tasks_url}{self.task.id}/', {'completed': True}, format='json'),
+            lambda: self.client.delete(f'{self.tasks_url}{self.task.id}/'),
+        ]
+        for write in writes:
+            write()
+            response = self.client.get(self.tasks_url, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertNotEqual(response['ETag'], etag)
+            etag = response['ETag']
+    
+    def test_list_etag_depends_on_query_params(self):
+        """Test: Cada página o modo de paginación tiene su propio ETag."""
+        etag = self.client.get(self.tasks_url)['ETag']
+        
+        response = self.client.get(self.tasks_url, {'pagination': 'cursor'}, HTTP_IF_NONE_MATCH=etag)
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+    
+    def test_detail_conditional_get(self):
+        """Test: El detalle responde 304 hasta que la tarea cambia."""
+        response = self.client.get(f'{self.tasks_url}{self.task.id}/')
+        etag = response['ETag']
+        
+        response = self.client.get(f'{self.tasks_url}{self.task.id}/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        
+        self.client.patch(f'{self.tasks_url}{self.task.id}/', {'title': 'Cambiada'}, format='json')
+        response = self.client.get(f'{self.tasks_url}{self.task.id}/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['title'], 'Cambiada')
+    
+    def test_if_modified_since(self):
+        """Test: If-Modified-Since igual a Last-Modified responde 304."""
+        last_modified = self.client.get(f'{self.tasks_url}{self.task.id}/')['Last-Modified']
+        
+        response = self.client.get(
+            f'{self.tasks_url}{self.task.id}/', HTTP_IF_MODIFIED_SINCE=last_modified
+        )
+        
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+
+class TaskResponseCacheTests(TaskAPITestCase):
+    """
+    Tests para la caché versionada del listado y el detalle.
+    """
+    
+    def setUp(self):
+        """Configuración inicial para cada test."""
+        super().setUp()
+        self.client = APIClient()
+        self.tasks_url = '/api/tasks/'
+        
+        self.user = User.objects.create_user(
+            email='cache@example.com',
+            password='testpass123',
+            first_name='Cache',
+            last_name='User'
+        )
+        self.client.force_authenticate(user=self.user)
+        self.task = Task.objects.create(user=self.user, title='Tarea')
+        TaskStats.recompute(self.user.pk)
+        counters.reset()
+    
+    def test_list_hit_skips_database(self):
+        """Test: La segunda petición del listado se sirve desde la caché sin consultas."""
+        response = self.client.get(self.tasks_url)
+        self.assertEqual(response['X-Cache'], 'MISS')
+        
+        with self.assertNumQueries(0):
+            cached = self.client.get(self.tasks_url)
+        
+        self.assertEqual(cached['X-Cache'], 'HIT')
+        self.assertEqual(cached.data, response.data)
+        self.assertEqual(cached['ETag'], response['ETag'])
+        self.assertEqual(counters.snapshot()['hits'], 1)
+        self.assertEqual(counters.snapshot()['misses'], 1)
+    
+    def test_hit_answers_304_without_queries(self):
+        """Test: Un acierto de caché resuelve el GET condicional sin consultas."""
+        etag = self.client.get(f'{self.tasks_url}{self.task.id}/')['ETag']
+        
+        with self.assertNumQueries(0):
+            response = self.client.get(f'{self.tasks_url}{self.task.id}/', HTTP_IF_NONE_MATCH=etag)
+        
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+    
+    def test_query_params_are_part_of_the_key(self):
+        """Test: Cada combinación de parámetros tiene su propia entrada."""
+        self.client.get(self.tasks_url)
+        
+        response = self.client.get(self.tasks_url, {'pagination': 'cursor'})
+        
+        self.assertEqual(response['X-Cache'], 'MISS')
+    
+    def test_writes_invalidate_list_and_detail(self):
+        """Test: Cualquier escritura de la API invalida las respuestas del usuario."""
+        detail_url = f'{self.tasks_url}{self.task.id}/'
+        writes = [
+            lambda: self.client.post(self.tasks_url, {'title': 'Nueva'}, format='json'),
+            lambda: self.client.put(detail_url, {'title': 'Editada'}, format='json'),
+            lambda: self.client.patch(detail_url, {'completed': True}, format='json'),
+            lambda: self.client.post(f'{self.tasks_url}bulk/', [{'title': 'Masiva'}], format='json'),
+            lambda: self.client.patch(
+                f'{self.tasks_url}bulk/', [{'id': self.task.id, 'title': 'Masiva'}], format='json'
+            ),
+            lambda: self.client.delete(detail_url),
+        ]
+        for write in writes:
+            self.client.get(self.tasks_url)
+            self.client.get(detail_url)
+            write()
+            self.assertEqual(self.client.get(self.tasks_url)['X-Cache'], 'MISS')
+            self.assertNotEqual(self.client.get(detail_url).get('X-Cache'), 'HIT')
+        
+        response = self.client.get(detail_url)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+    
+    def test_local_memory_cache_is_disabled_with_several_workers(self):
+        """Test: Con memoria local y varios workers no se cachean respuestas."""
+        with self.settings(WEB_WORKERS=3):
+            self.client.get(self.tasks_url)
+            response = self.client.get(self.tasks_url)
+        
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(counters.snapshot()['hits'] + counters.snapshot()['misses'], 0)
+    
+    def test_versions_are_per_user(self):
+        """Test: Las escrituras de un usuario no invalidan la caché de otro."""
+        other = User.objects.create_user(
+            email='other@example.com',
+            password='testpass123',
+            first_name='Other',
+            last_name='User'
+        )
+        other_client = APIClient()
+        other_client.force_authenticate(user=other)
+        other_client.get(self.tasks_url)
+        
+        self.client.post(self.tasks_url, {'title': 'Nueva'}, format='json')
+        response = other_client.get(self.tasks_url)
+        
+        self.assertEqual(response['X-Cache'], 'HIT')
+        self.assertEqual(response.data['count'], 0)
+    
+    def test_admin_changes_invalidate(self):
+        """Test: Las ediciones desde el admin invalidan la caché del usuario."""
+        admin = User.objects.create_superuser(
+            email='admin@example.com',
+            password='testpass123',
+            first_name='Admin',
+            last_name='User'
+        )
+        self.client.get(self.tasks_url)
+        
+        admin_client = APIClient()
+        admin_client.force_login(admin)
+        admin_client.post(f'/admin/tasks/task/{self.task.id}/delete/', {'post': 'yes'})
+        
+        response = self.client.get(self.tasks_url)
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.data['count'], 0)
+
+
+@override_settings(TASKS_CHANGES_LAG_SECONDS=0)
+class TaskChangesTests(TaskAPITestCase):
+    """
+    Tests para el feed de cambios (sincronización incremental).
+    """
+    
+    def setUp(self):
+        """Configuración inicial para cada test."""
+        super().setUp()
+        self.client = APIClient()
+        self.changes_url = '/api/tasks/changes/'
+        
+        self.user = User.objects.create_user(
+            email='sync@example.com',
+            password='testpass123',
+            first_name='Sync',
+            last_name='User'
+        )
+        self.client.force_authenticate(user=self.user)
+        self.task = Task.objects.create(user=self.user, title='Tarea 1')
+        self.deleted = Task.objects.create(user=self.user, title='Tarea 2', is_deleted=True)
+    
+    def sync(self, since=None, **params):
+        """Pide el feed de cambios y retorna los datos de la respuesta."""
+        if since is not None:
+            params['since'] = since
+        response = self.client.get(self.changes_url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data
+    
+    def test_initial_sync_includes_tombstones(self):
+        """Test: Sin token se entregan todas las tareas, incluidas las eliminadas."""
+        data = self.sync()
+        
+        self.assertEqual(
+            [(task['id'], task['is_deleted']) for task in data['results']],
+            [(self.task.id, False), (self.deleted.id, True)]
+        )
+        self.assertFalse(data['has_more'])
+        self.assertIsNotNone(data['since'])
+    
+    def test_only_changes_after_token(self):
+        """Test: Con el token solo se entregan las tareas modificadas después."""
+        token = self.sync()['since']
+        
+        data = self.sync(token)
+        self.assertEqual(data['results'], [])
+        self.assertEqual(self.sync(data['since'])['results'], [])
+        
+        self.client.patch(f'/api/tasks/{self.task.id}/', {'completed': True}, format='json')
+        created = self.client.post('/api/tasks/', {'title': 'Nueva'}, format='json').data
+        self.client.delete(f'/api/tasks/{created["id"]}/')
+        
+        data = self.sync(token)
+        self.assertEqual(
+            [(task['id'], task['completed'], task['is_deleted']) for task in data['results']],
+            [(self.task.id, True, False), (created['id'], False, True)]
+        )
+        self.assertEqual(self.sync(data['since'])['results'], [])
+    
+    @override_settings(TASKS_CHANGES_LAG_SECONDS=5)
+    def test_late_commit_with_older_timestamp_is_delivered(self):
+        """Test: Un cambio confirmado tras sincronizar con updated_at menor no se pierde."""
+        now = timezone.now()
+        Task.objects.filter(pk=self.task.pk).update(updated_at=now - timedelta(minutes=1))
+        Task.objects.filter(pk=self.deleted.pk).update(updated_at=now - timedelta(seconds=1))
+        
+        data = self.sync()
+        self.assertEqual([task['id'] for task in data['results']], [self.task.id])
+        
+        # Transacción que asignó updated_at antes de esa sincronización y se
+        # confirmó después.
+        late = Task.objects.create(user=self.user, title='Tardía')
+        Task.objects.filter(pk=late.pk).update(updated_at=now - timedelta(seconds=2))
+        with mock.patch('django.utils.timezone.now', return_value=now + timedelta(seconds=10)):
+            data = self.sync(data['since'])
+        
+        self.assertEqual([task['id'] for task in data['results']], [late.id, self.deleted.id])
+    
+    def test_keyset_pages_with_equal_timestamps(self):
+        """Test: Las páginas no pierden ni repiten tareas con el mismo updated_at."""
+        Task.objects.bulk_create([
+            Task(user=self.user, title=f'Masiva {index}') for index in range(5)
+        ])
+        expected = list(
+            Task.objects.filter(user=self.user).order_by('updated_at', 'id').values_list('id', flat=True)
+        )
+        
+        seen, token = [], None
+        while True:
+            data = self.sync(token, limit=2)
+            seen.extend(task['id'] for task in data['results'])
+            token = data['since']
+            if not data['has_more']:
+                break
+        
+        self.assertEqual(seen, expected)
+    
+    def test_only_own_tasks(self):
+        """Test: El feed no incluye tareas de otros usuarios."""
+        other = User.objects.create_user(
+            email='other@example.com',
+            password='testpass123',
+            first_name='Other',
+            last_name='User'
+        )
+        Task.objects.create(user=other, title='Ajena')
+        
+        ids = {task['id'] for task in self.sync()['results']}
+        
+        self.assertEqual(ids, {self.task.id, self.deleted.id})
+    
+    def test_invalid_token(self):
+        """Test: Un token mal formado retorna 400."""
+        for token in ('no-es-un-token', 'YWJj', base64.urlsafe_b64encode(b'ayer|1').decode()):
+            response = self.client.get(self.changes_url, {'since': token})
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+            self.assertIn('since', response.data)
+    
+    def test_uses_updated_index(self):
+        """Test: La consulta del feed recorre el índice (user, updated_at, id)."""
+        token = self.sync()['since']
+        with CaptureQueriesContext(connection) as context:
+            self.sync(token)
+        sql = next(
+            query['sql'] for query in context.captured_queries
+            if 'FROM "tasks_task"' in query['sql']
+        )
+        
+        with connection.cursor() as cursor:
+            if connection.vendor == 'postgresql':
+                cursor.execute('SET LOCAL enable_seqscan = off')
+                cursor.execute(f'EXPLAIN {sql}')
+            else:
+                cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+            plan = '\n'.join(' '.join(map(str, row)) for row in cursor.fetchall())
+        
+        self.assertIn('task_user_updated_idx', plan)
+        self.assertNotIn('TEMP B-TREE', plan)
+
+
+class TaskSearchTests(TaskAPITestCase):
+    """
+    Tests para la búsqueda de texto completo (?q=) en la API y el admin.
+    """
+    
+    def setUp(self):
+        """Configuración inicial para cada test."""
+        super().setUp()
+        self.client = APIClient()
+        self.tasks_url = '/api/tasks/'
+        
+        self.user = User.objects.create_user(
+            email='search@example.com',
+            password='testpass123',
+            first_name='Search',
+            last_name='User'
+        )
+        self.client.force_authenticate(user=self.user)
+        self.in_title = Task.objects.create(user=self.user, title='Comprar leche', description='En el súper')
+        self.in_description = Task.objects.create(
+            user=self.user, title='Mandados', description='Pasar a comprar pan y leche'
+        )
+        Task.objects.create(user=self.user, title='Leer un libro')
+        self.deleted = Task.objects.create(user=self.user, title='Comprar leche vieja', is_deleted=True)
+        TaskStats.recompute(self.user.pk)
+    
+    def search(self, text):
+        """Busca y retorna los IDs de los resultados, en orden."""
+        response = self.client.get(self.tasks_url, {'q': text})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['count'], len(response.data['results']))
+        return [task['id'] for task in response.data['results']]
+    
+    def test_ranked_results(self):
+        """Test: Las coincidencias en el título aparecen antes que en la descripción."""
+        self.assertEqual(self.search('leche'), [self.in_title.id, self.in_description.id])
+    
+    def test_all_terms_required(self):
+        """Test: Todas las palabras deben aparecer en la tarea."""
+        self.assertEqual(self.search('comprar pan'), [self.in_description.id])
+        self.assertEqual(self.search('leche libro'), [])
+    
+    def test_excludes_deleted_and_foreign_tasks(self):
+        """Test: No se encuentran tareas eliminadas ni de otros usuarios."""
+        other = User.objects.create_user(
+            email='other@example.com',
+            password='testpass123',
+            first_name='Other',
+            last_name='User'
+        )
+        Task.objects.create(user=other, title='Leche ajena')
+        
+        self.assertEqual(self.search('leche'), [self.in_title.id, self.in_description.id])
+    
+    def test_index_follows_writes(self):
+        """Test: El índice se actualiza al crear y editar tareas."""
+        created = self.client.post(self.tasks_url, {'title': 'Pagar factura'}, format='json').data
+        self.assertEqual(self.search('factura'), [created['id']])
+        
+        self.client.patch(f'{self.tasks_url}{created["id"]}/', {'title': 'Pagar recibo'}, format='json')
+        self.assertEqual(self.search('factura'), [])
+        self.assertEqual(self.search('recibo'), [created['id']])
+    
+    def test_query_syntax_is_escaped(self):
+        """Test: Los operadores en la búsqueda se tratan como texto."""
+        self.assertEqual(self.search('leche" OR libro*'), [])
+        self.assertEqual(self.search('"()'), [])
+    
+    @skipUnless(connection.vendor == 'sqlite', 'FTS5 es exclusivo de SQLite')
+    def test_accents_are_ignored(self):
+        """Test: La búsqueda no distingue acentos."""
+        self.assertEqual(self.search('super'), [self.in_title.id])
+    
+    def test_cursor_pagination_rejected(self):
+        """Test: La búsqueda no se combina con la paginación por cursor."""
+        response = self.client.get(self.tasks_url, {'q': 'leche', 'pagination': 'cursor'})
+        
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('q', response.data)
+    
+    @skipUnless(connection.vendor == 'sqlite', 'Plan de consulta de SQLite')
+    def test_uses_text_index(self):
+        """Test: La búsqueda consulta la tabla FTS5 en lugar de recorrer las tareas con LIKE."""
+        with CaptureQueriesContext(connection) as context:
+            list(Task.objects.alive_for(self.user).search('leche'))
+        sql = context.captured_queries[0]['sql']
+        
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+            plan = '\n'.join(' '.join(map(str, row)) for row in cursor.fetchall())
+        
+        self.assertNotIn('LIKE', sql)
+        self.assertIn('VIRTUAL TABLE INDEX', plan)
+    
+    def test_admin_search(self):
+        """Test: El buscador del admin usa el índice y busca por email y nombre del dueño."""
+        admin = User.objects.create_superuser(
+            email='admin@example.com',
+            password='testpass123',
+            first_name='Admin',
+            last_name='User'
+        )
+        self.client.force_login(admin)
+        
+        response = self.client.get('/admin/tasks/task/', {'q': 'leche'})
+        self.assertEqual(
+            {task.id for task in response.context['cl'].result_list},
+            {self.in_title.id, self.in_description.id, self.deleted.id}
+        )
+        
+        response = self.client.get('/admin/tasks/task/', {'q': 'SEARCH@example.com'})
+        self.assertEqual(response.context['cl'].result_count, 4)
+        
+        for term in ('search@', 'Search User', 'user'):
+            response = self.client.get('/admin/tasks/task/', {'q': term})
+            self.assertEqual(response.context['cl'].result_count, 4, term)
+        
+        response = self.client.get('/admin/tasks/task/', {'q': 'Admin'})
+        self.assertEqual(response.context['cl'].result_count, 0)
+
+
+class TaskFilterTests(TaskAPITestCase):
+    """
+    Tests para los filtros y el ordenamiento del listado.
+    """
+    
+    def setUp(self):
+        """Configuración inicial para cada test."""
+        super().setUp()
+        self.client = APIClient()
+        self.tasks_url = '/api/tasks/'
+        
+        self.user = User.objects.create_user(
+            email='filters@example.com',
+            password='testpass123',
+            first_name='Filters',
+            last_name='User'
+        )
+        self.client.force_authenticate(user=self.user)
+        self.tasks = [
+            Task.objects.create(user=self.user, title=f'Tarea {index}', completed=index % 2 == 0)
+            for index in range(4)
+        ]
+        Task.objects.filter(pk=self.tasks[0].pk).update(created_at='2024-01-10T12:00:00Z')
+        Task.objects.filter(pk=self.tasks[1].pk).update(created_at='2024-02-10T12:00:00Z')
+        TaskStats.recompute(self.user.pk)
+    
+    def list_ids(self, **params):
+        """Pide el listado y retorna los IDs de los resultados, en orden."""
+        response = self.client.get(self.tasks_url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [task['id'] for task in response.data['results']]
+    
+    def test_completed_filter(self):
+        """Test: ?completed= filtra por estado y el total sale de TaskStats."""
+        completed = [self.tasks[2].id, self.tasks[0].id]
+        pending = [self.tasks[3].id, self.tasks[1].id]
+        
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(self.tasks_url, {'completed': 'true'})
+        
+        self.assertEqual([task['id'] for task in response.data['results']], completed)
+        self.assertEqual(response.data['count'], 2)
+        self.assertFalse(any('COUNT(' in query['sql'] for query in context.captured_queries))
+        self.assertEqual(self.list_ids(completed='false'), pending)
+    
+    def test_created_range(self):
+        """Test: created_after es inclusivo y created_before exclusivo."""
+        self.assertEqual(
+            self.list_ids(created_after='2024-01-01', created_before='2024-02-10T12:00:00Z'),
+            [self.tasks[0].id]
+        )
+        self.assertEqual(
+            self.list_ids(created_after='2024-02-10T12:00:00Z', completed='false'),
+            [self.tasks[3].id, self.tasks[1].id]
+        )
+    
+    def test_filtered_count(self):
+        """Test: Con filtros de fecha el total corresponde a los resultados."""
+        response = self.client.get(self.tasks_url, {'created_before': '2024-03-01'})
+        
+        self.assertEqual(response.data['count'], 2)
+    
+    def test_invalid_filters(self):
+        """Test: Valores de filtro inválidos retornan 400."""
+        for params in ({'completed': 'quizas'}, {'created_after': 'ayer'}, {'created_before': '2024-13-01'}):
+            response = self.client.get(self.tasks_url, params)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+            self.assertIn(next(iter(params)), response.data)
+    
+    def test_ordering(self):
+        """Test: ?ordering=created_at invierte el orden por defecto."""
+        expected = [task.id for task in self.tasks[:2]] + [task.id for task in self.tasks[2:]]
+        
+        self.assertEqual(self.list_ids(ordering='created_at'), expected)
+        self.assertEqual(self.list_ids(ordering='-created_at'), expected[::-1])
+    
+    def test_unindexed_ordering_rejected(self):
+        """Test: Los ordenamientos sin índice retornan 400."""
+        for ordering in ('title', '-updated_at', 'completed', 'user__email'):
+            response = self.client.get(self.tasks_url, {'ordering': ordering})
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+            self.assertIn('ordering', response.data)
+    
+    def test_cursor_pagination_follows_ordering(self):
+        """Test: La paginación por cursor respeta ?ordering=."""
+        ids = []
+        with mock.patch.object(TaskCursorPagination, 'page_size', 1):
+            response = self.client.get(self.tasks_url, {'pagination': 'cursor', 'ordering': 'created_at'})
+            while True:
+                ids.extend(task['id'] for task in response.data['results'])
+                if not response.data['next']:
+                    break
+                response = self.client.get(response.data['next'])
+        
+        self.assertEqual(ids, [task.id for task in self.tasks])
+    
+    def test_filtered_plans_avoid_sorting(self):
+        """Test: Cada combinación admitida se resuelve con un índice parcial, sin ordenar."""
+        combinations = [
+            {'completed': 'true'},
+            {'completed': 'false', 'ordering': 'created_at'},
+            {'completed': 'true', 'created_after': '2024-01-01'},
+            {'created_after': '2024-01-01', 'created_before': '2024-03-01', 'ordering': 'created_at'},
+        ]
+        for params in combinations:
+            with CaptureQueriesContext(connection) as context:
+                self.client.get(self.tasks_url, params)
+            sql = [
+                query['sql'] for query in context.captured_queries
+                if query['sql'].startswith('SELECT "tasks_task"."id"')
+            ][-1]
+            with connection.cursor() as cursor:
+                if connection.vendor == 'postgresql':
+                    cursor.execute('SET LOCAL enable_seqscan = off')
+                    cursor.execute(f'EXPLAIN {sql}')
+                else:
+                    cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+                plan = '\n'.join(' '.join(map(str, row)) for row in cursor.fetchall())
+            
+            self.assertIn('task_user_alive_', plan, params)
+            self.assertNotIn('TEMP B-TREE', plan, params)
+            self.assertNotIn('Sort', plan, params)
+
+
+class TaskArchiveTests(TaskAPITestCase):
+    """
+    Tests para el archivo y la restauración de tareas eliminadas.
+    """
+    
+    def setUp(self):
+        """Configuración inicial para cada test."""
+        super().setUp()
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            email='archive@example.com',
+            password='testpass123',
+            first_name='Archive',
+            last_name='User'
+        )
+        self.client.force_authenticate(user=self.user)
+        
+        self.alive = Task.objects.create(user=self.user, title='Viva')
+        self.recent = Task.objects.create(user=self.user, title='Eliminada hoy', is_deleted=True)
+        self.old = [
+            Task.objects.create(user=self.user, title=f'Eliminada {index}', is_deleted=True, completed=True)
+            for index in range(5)
+        ]
+        self.old_at = timezone.now() - timedelta(days=40)
+        Task.objects.filter(pk__in=[task.pk for task in self.old]).update(updated_at=self.old_at)
+        Task.objects.filter(pk=self.alive.pk).update(updated_at=self.old_at)
+        TaskStats.recompute(self.user.pk)
+    
+    def archive(self, **options):
+        """Ejecuta archive_deleted_tasks y retorna su salida."""
+        out = StringIO()
+        call_command('archive_deleted_tasks', sleep=0, stdout=out, **options)
+        return out.getvalue()
+    
+    def test_archives_only_expired_tombstones(self):
+        """Test: Solo se archivan las tareas eliminadas antes de la retención."""
+        output = self.archive(days=30)
+        
+        old_ids = {task.id for task in self.old}
+        self.assertEqual(set(TaskArchive.objects.values_list('id', flat=True)), old_ids)
+        self.assertFalse(Task.objects.filter(id__in=old_ids).exists())
+        self.assertTrue(Task.objects.filter(id__in=[self.alive.id, self.recent.id]).exists())
+        self.assertIn('5 tareas archivadas', output)
+        self.assertIn('filas/s', output)
+        
+        archived = TaskArchive.objects.get(id=self.old[0].id)
+        self.assertEqual(archived.title, 'Eliminada 0')
+        self.assertEqual(archived.updated_at, self.old_at)
+        self.assertEqual(archived.created_at, self.old[0].created_at)
+    
+    def test_chunks_are_resumable(self):
+        """Test: Se procesa por lotes y una nueva ejecución continúa donde quedó."""
+        output = self.archive(chunk_size=2, max_chunks=1)
+        self.assertEqual(TaskArchive.objects.count(), 2)
+        self.assertIn('Lote 1: 2 tareas', output)
+        
+        output = self.archive(chunk_size=2)
+        self.assertEqual(TaskArchive.objects.count(), 5)
+        self.assertIn('Lote 2: 1 tareas', output)
+    
+    def test_restore_keeps_original_state(self):
+        """Test: Restaurar devuelve las tareas eliminadas con sus fechas originales."""
+        self.archive()
+        
+        call_command('restore_archived_tasks', id=[self.old[0].id], stdout=StringIO())
+        
+        task = Task.objects.get(id=self.old[0].id)
+        self.assertTrue(task.is_deleted)
+        self.assertEqual(task.updated_at, self.old_at)
+        self.assertEqual(task.created_at, self.old[0].created_at)
+        self.assertEqual(TaskArchive.objects.count(), 4)
+    
+    def test_restore_undelete(self):
+        """Test: Con --undelete las tareas vuelven al listado y a los contadores."""
+        self.archive()
+        
+        call_command('restore_archived_tasks', user=[self.user.id], undelete=True, stdout=StringIO())
+        
+        self.assertFalse(TaskArchive.objects.exists())
+        response = self.client.get('/api/tasks/')
+        self.assertEqual(response.data['count'], 6)
+        stats = TaskStats.objects.get(user=self.user)
+        self.assertEqual((stats.total, stats.completed), (6, 5))
+    
+    def test_restore_requires_selection(self):
+        """Test: restore_archived_tasks exige --user o --id."""
+        with self.assertRaises(CommandError):
+            call_command('restore_archived_tasks', stdout=StringIO())
+    
+    def test_expired_sync_token(self):
+        """Test: Un token emitido antes de la retención retorna 410."""
+        position = f'{self.old_at.isoformat()}|1'
+        for values in (position, f'{position}|{self.old_at.isoformat()}'):
+            token = base64.urlsafe_b64encode(values.encode()).decode()
+            
+            response = self.client.get('/api/tasks/changes/', {'since': token})
+            
+            self.assertEqual(response.status_code, status.HTTP_410_GONE)
+    
+    def test_idle_user_token_does_not_expire(self):
+        """Test: El token de un usuario sin cambios recientes sigue siendo válido."""
+        Task.objects.filter(user=self.user).update(updated_at=self.old_at)
+        
+        token = self.client.get('/api/tasks/changes/', {'limit': 500}).data['since']
+        for _ in range(2):
+            response = self.client.get('/api/tasks/changes/', {'since': token})
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(response.data['results'], [])
+            token = response.data['since']
+
+
+class SeedLoadDataTests(TaskAPITestCase):
+    """
+    Tests para el comando seed_load_data.
+    """
+    
+    def seed(self, **options):
+        """Ejecuta seed_load_data y retorna su salida."""
+        out = StringIO()
+        call_command('seed_load_data', seed=1, stdout=out, **options)
+        return out.getvalue()
+    
+    def test_creates_users_and_tasks(self):
+        """Test: Crea los usuarios y tareas pedidos con contadores consistentes."""
+        output = self.seed(users=5, tasks_per_user=20, distribution='fixed',
+                           deleted_ratio=0.5, completed_ratio=0.5, chunk_size=7)
+        
+        users = User.objects.filter(email__startswith='load-')
+        self.assertEqual(users.count(), 5)
+        self.assertEqual(Task.objects.filter(user__in=users).count(), 100)
+        self.assertTrue(Task.objects.filter(is_deleted=True).exists())
+        self.assertTrue(Task.objects.filter(completed=True).exists())
+        self.assertIn('5 usuarios y 100 tareas creados', output)
+        
+        for user in users:
+            stats = TaskStats.objects.get(user=user)
+            self.assertEqual({'total': stats.total, 'completed': stats.completed}, TaskStats.count_tasks(user.pk))
+    
+    def test_users_share_password_and_can_log_in(self):
+        """Test: Los usuarios generados pueden iniciar sesión con la contraseña indicada."""
+        self.seed(users=2, tasks_per_user=1, distribution='fixed', password='seedpass123')
+        
+        response = self.client.post(
+            '/api/auth/login/', {'email': 'load-1@example.com', 'password': 'seedpass123'}, format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+    
+    def test_pareto_distribution_has_heavy_tail(self):
+        """Test: La distribución pareto concentra tareas en pocos usuarios y respeta el máximo."""
+        self.seed(users=200, tasks_per_user=10, max_tasks_per_user=300, deleted_ratio=0)
+        
+        counts = sorted(TaskStats.objects.values_list('total', flat=True), reverse=True)
+        self.assertLessEqual(counts[0], 300)
+        self.assertGreater(counts[0], 5 * 10)
+        self.assertGreater(sum(counts[:20]), sum(counts) / 4)
+    
+    def test_rejects_existing_prefix(self):
+        """Test: No se reutiliza un prefijo de email ya generado."""
+        self.seed(users=1, tasks_per_user=1)
+        
+        with self.assertRaises(CommandError):
+            self.seed(users=1, tasks_per_user=1)
+        self.seed(users=1, tasks_per_user=1, email_prefix='otro')
+        self.assertTrue(User.objects.filter(email='otro-0@example.com').exists())
+
+
+class TaskExportTests(TaskAPITestCase):
+    """
+    Tests para la exportación en streaming (NDJSON y CSV).
+    """
+    
+    def setUp(self):
+        """Configuración inicial para cada test."""
+        super().setUp()
+        self.client = APIClient()
+        self.export_url = '/api/tasks/export/'
+        
+        self.user = User.objects.create_user(
+            email='export@example.com',
+            password='testpass123',
+            first_name='Export',
+            last_name='User'
+        )
+        self.client.force_authenticate(user=self.user)
+        self.tasks = [
+            Task.objects.create(user=self.user, title='Primera, con "comillas"', description='Línea 1\nLínea 2'),
+            Task.objects.create(user=self.user, title='Segunda', completed=True),
+        ]
+        Task.objects.create(user=self.user, title='Eliminada', is_deleted=True)
+    
+    def export(self, **params):
+        """Pide la exportación y retorna la respuesta y su contenido."""
+        response = self.client.get(self.export_url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        return response, b''.join(response.streaming_content).decode()
+    
+    def test_ndjson_export(self):
+        """Test: Por defecto se exporta NDJSON con los campos de la API."""
+        response, content = self.export()
+        
+        self.assertTrue(response['Content-Type'].startswith('application/x-ndjson'))
+        self.assertIn('tareas.ndjson', response['Content-Disposition'])
+        rows = [json.loads(line) for line in content.splitlines()]
+        expected = self.client.get('/api/tasks/', format='json').data['results']
+        self.assertEqual(rows, [dict(task) for task in expected])
+    
+    def test_csv_export(self):
+        """Test: ?format=csv exporta CSV con encabezado y escapa los valores."""
+        response, content = self.export(format='csv')
+        
+        self.assertTrue(response['Content-Type'].startswith('text/csv'))
+        rows = list(csv.DictReader(StringIO(content)))
+        self.assertEqual([row['id'] for row in rows], [str(task.id) for task in reversed(self.tasks)])
+        self.assertEqual(rows[1]['title'], 'Primera, con "comillas"')
+        self.assertEqual(rows[1]['description'], 'Línea 1\nLínea 2')
+        self.assertEqual(rows[0]['description'], '')
+    
+    def test_export_applies_filters(self):
+        """Test: La exportación respeta los filtros del listado."""
+        _, content = self.export(completed='true')
+        
+        self.assertEqual([json.loads(line)['id'] for line in content.splitlines()], [self.tasks[1].id])
+    
+    def test_export_errors_are_json(self):
+        """Test: Un filtro inválido retorna 400 en JSON en ambos formatos."""
+        for export_format in ('csv', 'ndjson'):
+            response = self.client.get(self.export_url, {'format': export_format, 'completed': 'maybe'})
+            
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+            self.assertTrue(response['Content-Type'].startswith('application/json'))
+            self.assertEqual(response.json(), {'completed': ['Debe ser true o false.']})
+    
+    def test_export_in_chunks(self):
+        """Test: Con lotes pequeños se envía un fragmento por lote."""
+        with self.settings(TASKS_EXPORT_CHUNK_SIZE=1):
+            response = self.client.get(self.export_url, {'format': 'csv'})
+            chunks = list(response.streaming_content)
+        
+        # Encabezado + una fila por lote
+        self.assertEqual(len(chunks), 3)
+    
+    def test_export_requires_authentication(self):
+        """Test: La exportación requiere autenticación."""
+        self.client.force_authenticate(user=None)
+        
+        response = self.client.get(self.export_url)
+        
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+    
+    def test_unknown_format(self):
+        """Test: Un formato no soportado retorna 404."""
+        response = self.client.get(self.export_url, {'format': 'xml'})
+        
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class TaskImportTests(TaskAPITestCase):
+    """
+    Tests para la importación incremental (NDJSON y CSV).
+    """
+    
+    def setUp(self):
+        """Configuración inicial para cada test."""
+        super().setUp()
+        self.client = APIClient()
+        self.import_url = '/api/tasks/import/'
+        
+        self.user = User.objects.create_user(
+            email='import@example.com',
+            password='testpass123',
+            first_name='Import',
+            last_name='User'
+        )
+        self.client.force_authenticate(user=self.user)
+    
+    def upload(self, body, content_type='application/x-ndjson'):
+        """Envía el cuerpo tal cual con el Content-Type indicado."""
+        return self.client.generic('POST', self.import_url, body.encode(), content_type=content_type)
+    
+    def test_ndjson_import(self):
+        """Test: Las filas NDJSON válidas se crean y se reporta el resumen."""
+        body = '\n'.join([
+            json.dumps({'title': 'Primera', 'description': 'Algo'}),
+            '',
+            json.dumps({'title': 'Segunda', 'completed': True}),
+        ]) + '\n'
+        
+        response = self.upload(body)
+        
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['accepted'], 2)
+        self.assertEqual(response.data['rejected'], 0)
+        self.assertEqual(
+            sorted(Task.objects.filter(user=self.user).values_list('title', 'completed')),
+            [('Primera', False), ('Segunda', True)]
+        )
+        stats = TaskStats.for_user(self.user)
+        self.assertEqual((stats.total, stats.completed), (2, 1))
+    
+    def test_invalid_rows_report_line_numbers(self):
+        """Test: Las filas inválidas se rechazan con su número de línea."""
+        body = '\n'.join([
+            json.dumps({'title': 'Válida'}),
+            '{no es json',
+            json.dumps({'title': ''}),
+            json.dumps(['lista']),
+            json.dumps({'title': 'Otra válida'}),
+        ])
+        
+        response = self.upload(body)
+        
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['accepted'], 2)
+        self.assertEqual(response.data['rejected'], 3)
+        self.assertEqual([error['line'] for error in response.data['errors']], [2, 3, 4])
+        self.assertIn('title', response.data['errors'][1]['errors'])
+        self.assertFalse(response.data['errors_truncated'])
+    
+    def test_csv_import(self):
+        """Test: El CSV exportado puede volver a importarse."""
+        Task.objects.create(user=self.user, title='Con "comillas", y coma', description='Línea 1\nLínea 2')
+        Task.objects.create(user=self.user, title='Completada', completed=True)
+        exported = b''.join(
+            self.client.get('/api/tasks/export/', {'format': 'csv'}).streaming_content
+        ).decode()
+        
+        response = self.upload(exported + 'sin,columnas,de,más,,,,\n', content_type='text/csv')
+        
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['accepted'], 2)
+        self.assertEqual(response.data['errors'][0]['line'], 5)
+        self.assertEqual(Task.objects.filter(user=self.user, title='Con "comillas", y coma',
+                                             description='Línea 1\nLínea 2').count(), 2)
+        self.assertEqual(Task.objects.filter(user=self.user, completed=True).count(), 2)
+    
+    def test_inserts_in_batches(self):
+        """Test: Las filas se insertan en lotes de TASKS_IMPORT_BATCH_SIZE."""
+        body = ''.join(json.dumps({'title': f'Tarea {index}'}) + '\n' for index in range(5))
+        
+        with self.settings(TASKS_IMPORT_BATCH_SIZE=2):
+            with CaptureQueriesContext(connection) as queries:
+                response = self.upload(body)
+        
+        self.assertEqual(response.data['accepted'], 5)
+        inserts = [query for query in queries if query['sql'].startswith('INSERT INTO "tasks_task"')]
+        self.assertEqual(len(inserts), 3)
+    
+    def test_errors_are_truncated(self):
+        """Test: Solo se reportan los primeros TASKS_IMPORT_MAX_ERRORS errores."""
+        body = '\n'.join(json.dumps({'title': ''}) for _ in range(5))
+        
+        with self.settings(TASKS_IMPORT_MAX_ERRORS=2):
+            response = self.upload(body)
+        
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['rejected'], 5)
+        self.assertEqual(len(response.data['errors']), 2)
+        self.assertTrue(response.data['errors_truncated'])
+    
+    def test_import_invalidates_cache(self):
+        """Test: La importación invalida el listado cacheado."""
+        self.client.get('/api/tasks/')
+        
+        self.upload(json.dumps({'title': 'Nueva'}))
+        response = self.client.get('/api/tasks/')
+        
+        self.assertEqual(response.data['count'], 1)
+    
+    def test_empty_and_unsupported_bodies(self):
+        """Test: Un cuerpo vacío o mal codificado retorna 400 y otro formato 415."""
+        self.assertEqual(self.upload('').status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.upload('\n\n').status_code, status.HTTP_400_BAD_REQUEST)
+        
+        response = self.client.generic('POST', self.import_url, b'{"title": "\xff"}',
+                                       content_type='application/x-ndjson')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Task.objects.exists())
+        
+        response = self.upload('[]', content_type='application/json')
+        self.assertEqual(response.status_code, status.HTTP_415_UNSUPPORTED_MEDIA_TYPE)
+
+
+class AsyncTaskAPITests(TaskAPITestCase):
+    """
+    Tests para la API asíncrona de tareas (/api/async/tasks/).
+    """
+    
+    def setUp(self):
+        """Configuración inicial para cada test."""
+        super().setUp()
+        self.list_url = '/api/async/tasks/'
+        
+        self.user = User.objects.create_user(
+            email='async@example.com',
+            password='testpass123',
+            first_name='Async',
+            last_name='User'
+        )
+        self.other_user = User.objects.create_user(
+            email='other@example.com',
+            password='testpass123',
+            first_name='Other',
+            last_name='User'
+        )
+        self.headers = {'Authorization': f'Bearer {RefreshToken.for_user(self.user).access_token}'}
+        self.task = Task.objects.create(user=self.user, title='Existente')
+        self.other_task = Task.objects.create(user=self.other_user, title='Ajena')
+    
+    def detail_url(self, task_id):
+        return f'{self.list_url}{task_id}/'
+    
+    async def test_requires_authentication(self):
+        """Test: Sin token o con un token inválido se retorna 401."""
+        response = await self.async_client.get(self.list_url)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertIn('Bearer', response['WWW-Authenticate'])
+        
+        response = await self.async_client.get(self.list_url, headers={'Authorization': 'Bearer x'})
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+    
+    async def test_list_matches_sync_api(self):
+        """Test: El listado asíncrono coincide con GET /api/tasks/."""
+        for index in range(3):
+            await Task.objects.acreate(user=self.user, title=f'Tarea {index}', completed=index == 1)
+        
+        for params in ({}, {'completed': 'true'}, {'ordering': 'created_at'}, {'q': 'tarea'}):
+            response = await self.async_client.get(self.list_url, params, headers=self.headers)
+            expected = await self.async_client.get('/api/tasks/', params, headers=self.headers)
+            
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(response.json(), expected.json())
+    
+    async def test_list_pagination(self):
+        """Test: El listado asíncrono pagina igual que PageNumberPagination."""
+        await Task.objects.abulk_create([Task(user=self.user, title=f'Tarea {index}') for index in range(25)])
+        
+        first = (await self.async_client.get(self.list_url, headers=self.headers)).json()
+        second = (await self.async_client.get(first['next'], headers=self.headers)).json()
+        
+        self.assertEqual(first['count'], 26)
+        self.assertEqual(len(first['results']), 20)
+        self.assertEqual(len(second['results']), 6)
+        self.assertIsNone(second['next'])
+        self.assertTrue(second['previous'].endswith(self.list_url))
+        response = await self.async_client.get(self.list_url, {'page': 3}, headers=self.headers)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+    
+    async def test_create_and_update(self):
+        """Test: Crear, editar y completar ajustan los contadores."""
+        response = await self.async_client.post(
+            self.list_url, {'title': '  Nueva  '}, content_type='application/json', headers=self.headers
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        task_id = response.json()['id']
+        self.assertEqual(response.json()['title'], 'Nueva')
+        
+        response = await self.async_client.patch(
+            self.detail_url(task_id), {'completed': True}, content_type='application/json', headers=self.headers
+        )
+        self.assertTrue(response.json()['completed'])
+        response = await self.async_client.put(
+            self.detail_url(task_id), {'title': 'Editada', 'completed': True},
+            content_type='application/json', headers=self.headers
+        )
+        self.assertEqual(response.json()['title'], 'Editada')
+        
+        stats = await TaskStats.objects.aget(user=self.user)
+        self.assertEqual((stats.total, stats.completed), (2, 1))
+    
+    async def test_validation_errors(self):
+        """Test: Los errores de validación tienen el formato de DRF."""
+        response = await self.async_client.post(
+            self.list_url, {'title': ''}, content_type='application/json', headers=self.headers
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('title', response.json())
+        
+        response = await self.async_client.post(
+            self.list_url, '{no json', content_type='application/json', headers=self.headers
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+    
+    async def test_detail_and_delete(self):
+        """Test: El detalle y el borrado lógico solo alcanzan tareas propias."""
+        response = await self.async_client.get(self.detail_url(self.task.id), headers=self.headers)
+        self.assertEqual(response.json()['title'], 'Existente')
+        
+        response = await self.async_client.get(self.detail_url(self.other_task.id), headers=self.headers)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        response = await self.async_client.delete(self.detail_url(self.other_task.id), headers=self.headers)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        
+        response = await self.async_client.delete(self.detail_url(self.task.id), headers=self.headers)
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        await self.task.arefresh_from_db()
+        self.assertTrue(self.task.is_deleted)
+        stats = await TaskStats.objects.aget(user=self.user)
+        self.assertEqual(stats.total, 0)
+
+
+@skipUnless(connection.vendor == 'sqlite', 'Modo de transacción de SQLite')
+class SQLiteTransactionModeTests(SimpleTestCase):
+    """
+    Tests para transaction_mode IMMEDIATE en SQLite (ver settings).
+    
+    Usa una base de datos en un archivo temporal: la de los tests está en
+    memoria y no tiene los bloqueos de archivo de varios procesos.
+    """
+    
+    workers = 4
+    
+    def concurrent_increments(self, options):
+        """
+        Incrementa un contador desde varios hilos, cada uno con su conexión,
+        leyendo y luego escribiendo en una transacción. Retorna los errores
+        y el valor final.
+        """
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        settings_dict = {
+            **connection.settings_dict,
+            'NAME': str(Path(directory.name) / 'db.sqlite3'),
+            'OPTIONS': {**options, 'timeout': 5},
+        }
+        setup = DatabaseWrapper(settings_dict, 'locks')
+        with setup.cursor() as cursor:
+            cursor.execute('CREATE TABLE counter (value INTEGER)')
+            cursor.execute('INSERT INTO counter VALUES (0)')
+        setup.close()
+        
+        errors = []
+        barrier = threading.Barrier(self.workers)
+        
+        def increment():
+            # connections es local a cada hilo.
+            connections['locks'] = DatabaseWrapper(settings_dict, 'locks')
+            try:
+                barrier.wait()
+                with transaction.atomic(using='locks'), connections['locks'].cursor() as cursor:
+                    cursor.execute('SELECT value FROM counter')
+                    value = cursor.fetchone()[0]
+                    time.sleep(0.05)
+                    cursor.execute('UPDATE counter SET value = %s', [value + 1])
+            except OperationalError as exc:
+                errors.append(str(exc))
+            finally:
+                connections['locks'].close()
+        
+        threads = [threading.Thread(target=increment) for _ in range(self.workers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        check = DatabaseWrapper(settings_dict, 'locks')
+        with check.cursor() as cursor:
+            cursor.execute('SELECT value FROM counter')
+            value = cursor.fetchone()[0]
+        check.close()
+        return errors, value
+    
+    def test_deferred_transactions_fail_with_database_locked(self):
+        """Test: Con BEGIN diferido, leer y luego escribir falla sin esperar."""
+        errors, _ = self.concurrent_increments({})
+        
+        self.assertTrue(errors)
+        self.assertIn('database is locked', errors[0])
+    
+    def test_immediate_transactions_wait_for_each_other(self):
+        """Test: Con la configuración del proyecto las transacciones se esperan."""
+        options = {
+            key: value for key, value in connection.settings_dict['OPTIONS'].items()
+            if key == 'transaction_mode'
+        }
+        self.assertEqual(options, {'transaction_mode': 'IMMEDIATE'})
+        
+        errors, value = self.concurrent_increments(options)
+        
+        self.assertEqual(errors, [])
+        self.assertEqual(value, self.workers)
@@ -0,0 +1,21 @@
+"""
+Utilidades de la app de tareas
+"""
+from contextlib import contextmanager
+
+
+@contextmanager
+def explicit_timestamps(model, *field_names):
+    """
+    Desactiva temporalmente auto_now/auto_now_add en los campos indicados
+    para poder sembrar fechas realistas con bulk_create.
+    """
+    fields = [model._meta.get_field(name) for name in field_names]
+    previous = [(field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, (auto_now, auto_now_add) in zip(fields, previous):
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
@@ -1,13 +1,27 @@
 """
 Vistas para la app de tareas
 """
+from itertools import islice
+
+from django.conf import settings
+from django.db import transaction
+from django.http import StreamingHttpResponse
+from django.utils import timezone
 from rest_framework import viewsets, status
+from rest_framework.exceptions import NotFound, ParseError, ValidationError
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.renderers import JSONRenderer
 from rest_framework.response import Response
 from rest_framework.decorators import action
-from .models import Task
-from .serializers import TaskSerializer
+from .models import Task, TaskStats
+from .serializers import TaskChangeSerializer, TaskSerializer, TaskStatsSerializer
 from .permissions import IsOwner
+from .pagination import TaskChangesPagination, TaskCursorPagination, TaskPageNumberPagination
+from .conditional import list_validators, not_modified, set_validators, task_validators
+from .cache import ResponseCache, invalidate_user
+from .filters import TaskFieldFilter, TaskOrderingFilter, TaskSearchFilter
+from .renderers import CSVRenderer, NDJSONRenderer
+from .parsers import CSVParser, NDJSONParser, RowError
 
 
 class TaskViewSet(viewsets.ModelViewSet):
@@ -16,9 +30,46 @@ class TaskViewSet(viewsets.ModelViewSet):
     
     Proporciona operaciones CRUD completas con borrado lógico.
     Solo permite acceso a las tareas del usuario autenticado.
+    
+    El listado usa PageNumberPagination por defecto. Los clientes pueden
+    optar por la paginación por cursor enviando ?pagination=cursor (o un
+    parámetro cursor), que evita el COUNT(*) y los OFFSET profundos.
+    
+    El parámetro ?q= busca en título y descripción con el índice de texto
+    completo y ordena los resultados por relevancia. El listado admite
+    además ?completed=, ?created_after=, ?created_before= y ?ordering=
+    (ver tasks.filters).
     """
     serializer_class = TaskSerializer
     permission_classes = [IsAuthenticated, IsOwner]
+    filter_backends = [TaskFieldFilter, TaskSearchFilter, TaskOrderingFilter]
+    pagination_class = TaskPageNumberPagination
+    cursor_pagination_class = TaskCursorPagination
+    
+    @property
+    def paginator(self):
+        """
+        Retorna el paginador de la petición actual.
+        
+        Usa cursor_pagination_class cuando el cliente lo solicita y
+        pagination_class (configurado en settings) en caso contrario.
+        """
+        if not hasattr(self, '_paginator'):
+            if self.uses_cursor_pagination():
+                self._paginator = self.cursor_pagination_class()
+            else:
+                self._paginator = super().paginator
+        return self._paginator
+    
+    def uses_cursor_pagination(self):
+        """
+        Indica si el cliente pidió paginación por cursor.
+        """
+        params = self.request.query_params
+        return (
+            params.get('pagination') == 'cursor'
+            or self.cursor_pagination_class.cursor_query_param in params
+        )
     
     def get_queryset(self):
         """
@@ -28,10 +79,451 @@ class TaskViewSet(viewsets.ModelViewSet):
         - Solo tareas del usuario actual (user=request.user)
         - Solo tareas no eliminadas (is_deleted=False)
         """
-        return Task.objects.filter(
-            user=self.request.user,
-            is_deleted=False
+        return Task.objects.alive_for(self.request.user)
+    
+    def get_task_stats(self):
+        """
+        Retorna los contadores del usuario, leídos una sola vez por petición.
+        """
+        if not hasattr(self, '_task_stats'):
+            self._task_stats = TaskStats.for_user(self.request.user)
+        return self._task_stats
+    
+    def get_list_count(self):
+        """
+        Retorna el total del listado desde TaskStats.
+        
+        TaskPageNumberPagination usa este valor en lugar de ejecutar
+        COUNT(*) sobre las tareas del usuario. Con ?completed= como único
+        filtro se usan los contadores de completadas o pendientes; con
+        cualquier otro filtro activo el total no se conoce y se retorna None.
+        """
+        return self.count_from_stats(self.request, self.get_task_stats())
+    
+    @classmethod
+    def count_from_stats(cls, request, stats):
+        """
+        Retorna el total del listado de la petición según los contadores
+        stats, o None si los filtros activos no permiten conocerlo.
+        """
+        active = [
+            backend for backend in cls.filter_backends
+            if backend().is_active(request)
+        ]
+        if not active:
+            return stats.total
+        if active == [TaskFieldFilter]:
+            filters = TaskFieldFilter().get_filters(request)
+            if set(filters) == {'completed'}:
+                return stats.completed if filters['completed'] else stats.pending
+        return None
+    
+    def list(self, request, *args, **kwargs):
+        """
+        Lista las tareas con soporte de GET condicional y caché.
+        
+        El ETag se calcula con los contadores de TaskStats y el máximo
+        updated_at de las tareas del usuario; si coincide con If-None-Match
+        (o If-Modified-Since) se responde 304 sin cargar ni serializar las
+        tareas. Las respuestas se guardan en la caché del usuario (ver
+        cached_response).
+        """
+        response_cache = ResponseCache(request, 'list')
+        response = self.cached_response(response_cache)
+        if response is None:
+            etag, last_modified = list_validators(
+                request, Task.objects.filter(user=request.user), self.get_task_stats().total
+            )
+            response = not_modified(request, etag, last_modified)
+            if response is None:
+                response = super().list(request, *args, **kwargs)
+                response_cache.set(response.data, etag, last_modified)
+                set_validators(response, etag, last_modified)
+            response['X-Cache'] = 'MISS'
+        return response
+    
+    def retrieve(self, request, *args, **kwargs):
+        """
+        Retorna el detalle de la tarea con soporte de GET condicional y caché.
+        
+        El ETag se deriva de updated_at; si coincide se responde 304 sin
+        serializar la tarea.
+        """
+        response_cache = ResponseCache(request, 'detail')
+        response = self.cached_response(response_cache)
+        if response is None:
+            instance = self.get_object()
+            etag, last_modified = task_validators(instance)
+            response = not_modified(request, etag, last_modified)
+            if response is None:
+                response = Response(self.get_serializer(instance).data)
+                response_cache.set(response.data, etag, last_modified)
+                set_validators(response, etag, last_modified)
+            response['X-Cache'] = 'MISS'
+        return response
+    
+    def cached_response(self, response_cache):
+        """
+        Retorna la respuesta guardada en la caché, o None si no existe.
+        
+        La clave incluye la versión de caché del usuario, que cada escritura
+        incrementa (ver invalidate_user), por lo que una entrada encontrada
+        siempre corresponde al estado actual de sus tareas. Un acierto no
+        consulta la base de datos: incluso el 304 se resuelve con los
+        validadores guardados junto a los datos.
+        """
+        entry = response_cache.get()
+        if entry is None:
+            return None
+        etag, last_modified = entry['etag'], entry['last_modified']
+        response = not_modified(self.request, etag, last_modified)
+        if response is None:
+            response = set_validators(Response(entry['data']), etag, last_modified)
+        response['X-Cache'] = 'HIT'
+        return response
+    
+    @action(detail=False, methods=['get'])
+    def stats(self, request):
+        """
+        Retorna los contadores de tareas del usuario (total, completadas y
+        pendientes) con una búsqueda por clave primaria.
+        """
+        stats = TaskStats.for_user(request.user)
+        return Response(TaskStatsSerializer(stats).data)
+    
+    @action(detail=False, methods=['get'])
+    def changes(self, request):
+        """
+        Retorna las tareas creadas, modificadas o eliminadas lógicamente
+        después del token since, junto con el token para la siguiente
+        sincronización (ver TaskChangesPagination).
+        
+        Sin since se recorren todas las tareas del usuario desde el inicio.
+        Las tareas eliminadas se entregan con is_deleted=true.
+        """
+        paginator = TaskChangesPagination()
+        page = paginator.paginate_queryset(
+            Task.objects.filter(user=request.user), request, view=self
+        )
+        return paginator.get_paginated_response(TaskChangeSerializer(page, many=True).data)
+    
+    @action(detail=False, methods=['get'], renderer_classes=[NDJSONRenderer, CSVRenderer])
+    def export(self, request):
+        """
+        Exporta las tareas del usuario como NDJSON (?format=ndjson, por
+        defecto) o CSV (?format=csv), con los mismos filtros del listado.
+        
+        La respuesta se transmite mientras se leen las filas: el queryset se
+        recorre con iterator(chunk_size), que en PostgreSQL usa un cursor del
+        lado del servidor, y cada lote se escribe apenas llega. La memoria
+        usada no depende del número de tareas.
+        """
+        renderer = request.accepted_renderer
+        queryset = self.filter_queryset(self.get_queryset())
+        response = StreamingHttpResponse(
+            self.stream_export(renderer, queryset),
+            content_type=f'{renderer.media_type}; charset={renderer.charset}',
         )
+        response['Content-Disposition'] = f'attachment; filename="tareas.{renderer.format}"'
+        return response
+    
+    def handle_exception(self, exc):
+        """
+        Responde los errores de la exportación (por ejemplo un filtro
+        inválido) en JSON y no con el renderer del formato pedido, que
+        solo sabe escribir filas de tareas.
+        """
+        response = super().handle_exception(exc)
+        if self.action == 'export':
+            self.request.accepted_renderer = JSONRenderer()
+            self.request.accepted_media_type = JSONRenderer.media_type
+        return response
+    
+    def stream_export(self, renderer, queryset):
+        """
+        Genera el contenido de la exportación por lotes de
+        TASKS_EXPORT_CHUNK_SIZE filas.
+        """
+        fields = TaskSerializer.Meta.fields
+        to_datetime = _datetime_formatter()
+        chunk_size = settings.TASKS_EXPORT_CHUNK_SIZE
+        
+        # El encabezado (CSV) se envía antes de ejecutar la consulta.
+        header = renderer.render_header(fields)
+        if header:
+            yield header
+        rows = queryset.values(*fields).iterator(chunk_size=chunk_size)
+        while batch := list(islice(rows, chunk_size)):
+            for row in batch:
+                row['created_at'] = to_datetime(row['created_at'])
+                row['updated_at'] = to_datetime(row['updated_at'])
+            yield renderer.render_rows(fields, batch)
+    
+    @action(detail=False, methods=['post'], url_path='import', parser_classes=[NDJSONParser, CSVParser])
+    def import_tasks(self, request):
+        """
+        Importa tareas desde el cuerpo de la petición en NDJSON
+        (Content-Type: application/x-ndjson) o CSV con encabezado
+        (Content-Type: text/csv), con los mismos campos que POST /api/tasks/.
+        
+        El cuerpo se lee línea por línea mientras se importa: cada fila se
+        valida con las reglas de TaskSerializer y las válidas se insertan con
+        bulk_create en lotes de TASKS_IMPORT_BATCH_SIZE, todo en una sola
+        transacción. Las filas inválidas no detienen la importación; la
+        respuesta indica cuántas se aceptaron y rechazaron, con el número de
+        línea y los errores de las primeras TASKS_IMPORT_MAX_ERRORS.
+        """
+        rows = request.data
+        if isinstance(rows, dict):
+            # DRF entrega un diccionario vacío cuando no hay cuerpo.
+            raise ValidationError({'detail': 'Se esperaba al menos una fila.'})
+        
+        started = timezone.now()
+        try:
+            with transaction.atomic():
+                accepted, completed, rejected, errors = self.import_rows(rows)
+                if accepted:
+                    self.refresh_imported(started)
+                    TaskStats.apply_delta(request.user.pk, total=accepted, completed=completed)
+                    invalidate_user(request.user.pk)
+        except UnicodeDecodeError:
+            raise ParseError('El cuerpo no está codificado en UTF-8.')
+        
+        if not accepted and not rejected:
+            raise ValidationError({'detail': 'Se esperaba al menos una fila.'})
+        return Response(
+            {
+                'accepted': accepted,
+                'rejected': rejected,
+                'errors': errors,
+                'errors_truncated': rejected > len(errors),
+            },
+            status=status.HTTP_201_CREATED if accepted else status.HTTP_400_BAD_REQUEST
+        )
+    
+    def refresh_imported(self, started):
+        """
+        Si la importación duró más de la mitad de TASKS_CHANGES_LAG_SECONDS,
+        actualiza el updated_at de las tareas creadas para que el commit
+        quede dentro del margen del feed de cambios (ver
+        TaskChangesPagination); si no, los primeros lotes podrían quedar
+        detrás del token de un cliente que sincronizó mientras tanto.
+        """
+        now = timezone.now()
+        if (now - started).total_seconds() * 2 <= settings.TASKS_CHANGES_LAG_SECONDS:
+            return
+        Task.objects.filter(user=self.request.user, updated_at__gte=started).update(updated_at=now)
+    
+    def import_rows(self, rows):
+        """
+        Valida e inserta las filas de (número de línea, fila) por lotes.
+        Retorna (aceptadas, aceptadas completadas, rechazadas, errores).
+        """
+        validator = self.get_serializer()
+        batch_size = settings.TASKS_IMPORT_BATCH_SIZE
+        max_errors = settings.TASKS_IMPORT_MAX_ERRORS
+        user = self.request.user
+        
+        batch, errors = [], []
+        accepted = completed = rejected = 0
+        for line, row in rows:
+            if isinstance(row, RowError):
+                detail = {'non_field_errors': [str(row)]}
+            else:
+                try:
+                    attrs = validator.run_validation(row)
+                except ValidationError as exc:
+                    detail = exc.detail
+                else:
+                    batch.append(Task(user=user, **attrs))
+                    if len(batch) >= batch_size:
+                        Task.objects.bulk_create(batch)
+                        accepted += len(batch)
+                        completed += sum(task.completed for task in batch)
+                        batch = []
+                    continue
+            rejected += 1
+            if len(errors) < max_errors:
+                errors.append({'line': line, 'errors': detail})
+        
+        if batch:
+            Task.objects.bulk_create(batch)
+            accepted += len(batch)
+            completed += sum(task.completed for task in batch)
+        return accepted, completed, rejected, errors
+    
+    @action(detail=False, methods=['post', 'patch', 'delete'], url_path='bulk')
+    def bulk(self, request):
+        """
+        Crea (POST), actualiza (PATCH) o elimina lógicamente (DELETE) varias
+        tareas en una sola petición y una sola transacción.
+        
+        - POST: lista de tareas con los mismos campos que POST /api/tasks/.
+        - PATCH: lista de objetos con id y los campos a modificar.
+        - DELETE: lista de IDs.
+        
+        Cada elemento se valida con las reglas de TaskSerializer y la
+        respuesta incluye un resultado por elemento, en el mismo orden.
+        Los elementos válidos se aplican aunque otros fallen.
+        """
+        items = request.data
+        if not isinstance(items, list) or not items:
+            raise ValidationError({'detail': 'Se esperaba una lista no vacía.'})
+        if len(items) > settings.TASKS_BULK_MAX_ITEMS:
+            raise ValidationError({
+                'detail': f'Se permiten como máximo {settings.TASKS_BULK_MAX_ITEMS} elementos por petición.'
+            })
+        
+        handlers = {
+            'POST': self.bulk_create_tasks,
+            'PATCH': self.bulk_update_tasks,
+            'DELETE': self.bulk_delete_tasks,
+        }
+        results = handlers[request.method](items)
+        
+        succeeded = sum(1 for result in results if 'errors' not in result)
+        if not succeeded:
+            response_status = status.HTTP_400_BAD_REQUEST
+        elif request.method == 'POST':
+            response_status = status.HTTP_201_CREATED
+        else:
+            response_status = status.HTTP_200_OK
+        return Response(
+            {
+                'results': results,
+                'succeeded': succeeded,
+                'failed': len(results) - succeeded,
+            },
+            status=response_status
+        )
+    
+    def bulk_create_tasks(self, items):
+        """
+        Valida cada elemento y crea los válidos con un único bulk_create.
+        """
+        validator = self.get_serializer()
+        results = [None] * len(items)
+        tasks = []
+        for index, item in enumerate(items):
+            try:
+                attrs = validator.run_validation(item)
+            except ValidationError as exc:
+                results[index] = {'index': index, 'errors': exc.detail}
+                continue
+            tasks.append((index, Task(user=self.request.user, **attrs)))
+        
+        if tasks:
+            with transaction.atomic():
+                Task.objects.bulk_create([task for _, task in tasks])
+                invalidate_user(self.request.user.pk)
+                TaskStats.apply_delta(
+                    self.request.user.pk,
+                    total=len(tasks),
+                    completed=sum(task.completed for _, task in tasks),
+                )
+        for index, task in tasks:
+            results[index] = {'index': index, 'data': TaskSerializer(task).data}
+        return results
+    
+    def bulk_update_tasks(self, items):
+        """
+        Aplica actualizaciones parciales con una lectura y un bulk_update.
+        """
+        validator = self.get_serializer(partial=True)
+        results = [None] * len(items)
+        
+        ids = [item.get('id') for item in items if isinstance(item, dict)]
+        now = timezone.now()
+        seen, updated, fields = set(), [], {'updated_at'}
+        completed_delta = 0
+        with transaction.atomic():
+            # Lee y bloquea las filas dentro de la transacción: el ajuste de
+            # contadores y los campos escritos parten del estado vigente.
+            instances = self.get_queryset().select_for_update().in_bulk(
+                [task_id for task_id in ids if self._is_task_id(task_id)]
+            )
+            for index, item in enumerate(items):
+                task_id = item.get('id') if isinstance(item, dict) else None
+                error = self._bulk_id_error(task_id, instances, seen)
+                if error:
+                    results[index] = {'index': index, 'id': task_id, 'errors': {'id': [error]}}
+                    continue
+                instance = instances[task_id]
+                seen.add(task_id)
+                
+                changes = {key: value for key, value in item.items() if key != 'id'}
+                try:
+                    attrs = validator.run_validation(changes)
+                except ValidationError as exc:
+                    results[index] = {'index': index, 'id': task_id, 'errors': exc.detail}
+                    continue
+                
+                was_completed = instance.completed
+                for field, value in attrs.items():
+                    setattr(instance, field, value)
+                instance.updated_at = now
+                fields.update(attrs)
+                completed_delta += int(instance.completed) - int(was_completed)
+                updated.append((index, instance))
+            
+            if updated:
+                Task.objects.bulk_update([task for _, task in updated], sorted(fields))
+                invalidate_user(self.request.user.pk)
+                TaskStats.apply_delta(self.request.user.pk, completed=completed_delta)
+        for index, task in updated:
+            results[index] = {'index': index, 'id': task.id, 'data': TaskSerializer(task).data}
+        return results
+    
+    def bulk_delete_tasks(self, items):
+        """
+        Elimina lógicamente las tareas indicadas con un único UPDATE.
+        """
+        ids = [task_id for task_id in items if self._is_task_id(task_id)]
+        with transaction.atomic():
+            # Bloquea las filas para que el ajuste de contadores corresponda
+            # exactamente a las tareas que este UPDATE marca como eliminadas.
+            found = dict(
+                self.get_queryset().select_for_update()
+                .filter(id__in=ids).values_list('id', 'completed')
+            )
+            if found:
+                Task.objects.filter(
+                    user=self.request.user, id__in=found, is_deleted=False
+                ).update(is_deleted=True, updated_at=timezone.now())
+                invalidate_user(self.request.user.pk)
+                TaskStats.apply_delta(
+                    self.request.user.pk,
+                    total=-len(found),
+                    completed=-sum(found.values()),
+                )
+        
+        results, seen = [], set()
+        for index, task_id in enumerate(items):
+            error = self._bulk_id_error(task_id, found, seen)
+            if error:
+                results.append({'index': index, 'id': task_id, 'errors': {'id': [error]}})
+            else:
+                seen.add(task_id)
+                results.append({'index': index, 'id': task_id})
+        return results
+    
+    @staticmethod
+    def _is_task_id(task_id):
+        """
+        Indica si task_id es un ID entero (true y false de JSON no lo son).
+        """
+        return isinstance(task_id, int) and not isinstance(task_id, bool)
+    
+    @classmethod
+    def _bulk_id_error(cls, task_id, found, seen):
+        """
+        Retorna el error de un ID de una operación masiva, o None si es válido.
+        """
+        if not cls._is_task_id(task_id) or task_id not in found:
+            return 'La tarea no existe.'
+        if task_id in seen:
+            return 'ID duplicado.'
+        return None
     
     def perform_create(self, serializer):
         """
@@ -40,18 +532,82 @@ class TaskViewSet(viewsets.ModelViewSet):
         El campo user se asigna desde request.user, por lo que no es necesario
         incluirlo en los datos de la petición.
         """
-        serializer.save(user=self.request.user)
+        with transaction.atomic():
+            task = serializer.save(user=self.request.user)
+            TaskStats.record_change(after=task.stats_key())
+            invalidate_user(self.request.user.pk)
+    
+    def perform_update(self, serializer):
+        """
+        Actualiza la tarea y ajusta los contadores en la misma transacción.
+        """
+        before = serializer.instance.stats_key()
+        with transaction.atomic():
+            task = serializer.save()
+            TaskStats.record_change(before, task.stats_key())
+            invalidate_user(self.request.user.pk)
+    
+    def partial_update(self, request, *args, **kwargs):
+        """
+        Actualiza parcialmente la tarea (PATCH) con un único UPDATE
+        condicional, sin cargar antes la fila.
+        
+        Cuando cambia completed (el caso de marcar/desmarcar en la UI) el
+        UPDATE exige además el valor opuesto, de modo que si afecta una fila
+        se sabe que el estado cambió y se ajustan los contadores sin leer la
+        tarea. Si no afecta ninguna, la tarea ya tenía ese valor (o no
+        existe) y se repite sin esa condición.
+        """
+        serializer = self.get_serializer(data=request.data, partial=True)
+        serializer.is_valid(raise_exception=True)
+        values = dict(serializer.validated_data)
+        pk = self._get_pk()
+        
+        with transaction.atomic():
+            task, completed_delta = None, 0
+            if 'completed' in values:
+                task = Task.objects.update_alive(
+                    pk, request.user, values, completed=not values['completed']
+                )
+                if task is not None:
+                    completed_delta = 1 if values['completed'] else -1
+            if task is None:
+                task = Task.objects.update_alive(pk, request.user, values)
+            if task is None:
+                raise NotFound("La tarea no existe.")
+            TaskStats.apply_delta(request.user.pk, completed=completed_delta)
+            invalidate_user(request.user.pk)
+        
+        return Response(self.get_serializer(task).data)
     
-    def perform_destroy(self, instance):
+    def destroy(self, request, *args, **kwargs):
         """
         Realiza un borrado lógico de la tarea.
         
         En lugar de eliminar físicamente el registro de la base de datos,
         establece is_deleted=True. Esto permite mantener el historial
         y la posibilidad de recuperar la tarea si es necesario.
+        
+        Se ejecuta como un único UPDATE condicional que solo escribe
+        is_deleted y updated_at; si ninguna fila coincide retorna 404.
+        """
+        with transaction.atomic():
+            task = Task.objects.update_alive(self._get_pk(), request.user, {'is_deleted': True})
+            if task is None:
+                raise NotFound("La tarea no existe.")
+            before = Task.stats_key_for(task.user_id, False, task.completed)
+            TaskStats.record_change(before, task.stats_key())
+            invalidate_user(request.user.pk)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+    
+    def _get_pk(self):
+        """
+        Retorna el ID de la URL como entero, o 404 si no es válido.
         """
-        instance.is_deleted = True
-        instance.save()
+        try:
+            return int(self.kwargs[self.lookup_url_kwarg or self.lookup_field])
+        except (TypeError, ValueError):
+            raise NotFound("La tarea no existe.")
     
     def get_object(self):
         """
@@ -63,7 +619,24 @@ class TaskViewSet(viewsets.ModelViewSet):
         """
         obj = super().get_object()
         if obj.is_deleted:
-            from rest_framework.exceptions import NotFound
             raise NotFound("La tarea no existe.")
         return obj
 
+
+def _datetime_formatter():
+    """
+    Retorna una función que formatea fechas igual que los DateTimeField de
+    TaskSerializer (ISO 8601 en la zona horaria actual, con Z para UTC).
+    
+    La zona horaria se resuelve una sola vez: DateTimeField la consulta en
+    cada llamada, lo que domina el costo de exportar millones de filas.
+    """
+    tz = timezone.get_current_timezone()
+    
+    def to_representation(value):
+        value = value.astimezone(tz).isoformat()
+        if value.endswith('+00:00'):
+            value = value[:-6] + 'Z'
+        return value
+    
+    return to_representation
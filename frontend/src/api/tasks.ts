@@ -1,5 +1,12 @@
 import apiClient from './client'
-import type { Task, CreateTaskRequest, UpdateTaskRequest } from '@/types/task'
+import type {
+  Task,
+  CreateTaskRequest,
+  UpdateTaskRequest,
+  TaskStats,
+  TaskChangesResponse,
+  TaskListFilters,
+} from '@/types/task'
 import type { PaginatedResponse } from '@/types/api'
 
 /**
@@ -12,16 +19,43 @@ import type { PaginatedResponse } from '@/types/api'
  * - PUT /api/tasks/{id}/ - Actualizar tarea completa
  * - PATCH /api/tasks/{id}/ - Actualizar tarea parcialmente
  * - DELETE /api/tasks/{id}/ - Eliminar tarea (soft delete)
+ * - GET /api/tasks/stats/ - Contadores de tareas del usuario
+ * - GET /api/tasks/changes/ - Cambios desde un token de sincronización
  */
 
 /**
  * Obtiene la lista de tareas del usuario autenticado (paginado)
  * @param page - Número de página (opcional, por defecto 1)
+ * @param filters - Filtros y ordenamiento aplicados en el servidor (opcional)
  * @returns Respuesta paginada con lista de tareas
  */
-export async function getTasks(page: number = 1): Promise<PaginatedResponse<Task>> {
+export async function getTasks(
+  page: number = 1,
+  filters: TaskListFilters = {},
+): Promise<PaginatedResponse<Task>> {
   const response = await apiClient.get<PaginatedResponse<Task>>('/api/tasks/', {
-    params: { page },
+    params: { page, ...filters },
+  })
+  return response.data
+}
+
+/**
+ * Obtiene los contadores de tareas del usuario (total, completadas y pendientes)
+ * @returns Contadores calculados en el servidor sobre todas las tareas
+ */
+export async function getTaskStats(): Promise<TaskStats> {
+  const response = await apiClient.get<TaskStats>('/api/tasks/stats/')
+  return response.data
+}
+
+/**
+ * Obtiene las tareas creadas, modificadas o eliminadas desde el token indicado
+ * @param since - Token de la sincronización anterior (opcional, sin él se recorren todas)
+ * @returns Cambios, token para la siguiente sincronización y si quedan más páginas
+ */
+export async function getTaskChanges(since?: string | null): Promise<TaskChangesResponse> {
+  const response = await apiClient.get<TaskChangesResponse>('/api/tasks/changes/', {
+    params: since ? { since } : {},
   })
   return response.data
 }
@@ -13,6 +13,7 @@ vi.mock('@/api/tasks', () => ({
   patchTask: vi.fn(),
   deleteTask: vi.fn(),
   toggleTaskComplete: vi.fn(),
+  getTaskStats: vi.fn(),
 }))
 
 describe('useTasksStore', () => {
@@ -249,6 +250,35 @@ describe('useTasksStore', () => {
       expect(store.stats.completed).toBe(1)
       expect(store.stats.pending).toBe(1)
     })
+
+    it('debe usar los contadores del servidor y ajustarlos localmente', async () => {
+      const store = useTasksStore()
+      vi.mocked(tasksApi.getTasks).mockResolvedValue({
+        count: 50,
+        next: 'http://localhost:8000/api/tasks/?page=2',
+        previous: null,
+        results: [mockTask, mockCompletedTask],
+      })
+      vi.mocked(tasksApi.getTaskStats).mockResolvedValue({
+        total: 50,
+        completed: 20,
+        pending: 30,
+        updated_at: '2024-01-15T10:30:00Z',
+      })
+
+      await store.fetchTasks()
+
+      expect(store.stats.total).toBe(50)
+      expect(store.stats.completed).toBe(20)
+      expect(store.stats.pending).toBe(30)
+
+      vi.mocked(tasksApi.deleteTask).mockResolvedValue(undefined)
+      await store.deleteTask(mockCompletedTask.id)
+
+      expect(store.stats.total).toBe(49)
+      expect(store.stats.completed).toBe(19)
+      expect(store.stats.pending).toBe(30)
+    })
   })
 
   describe('clearTasks', () => {
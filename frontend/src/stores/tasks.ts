@@ -8,8 +8,9 @@ import {
   patchTask as apiPatchTask,
   deleteTask as apiDeleteTask,
   toggleTaskComplete as apiToggleTaskComplete,
+  getTaskStats as apiGetTaskStats,
 } from '@/api/tasks'
-import type { Task, CreateTaskRequest, UpdateTaskRequest } from '@/types/task'
+import type { Task, CreateTaskRequest, UpdateTaskRequest, TaskStats } from '@/types/task'
 import type { PaginatedResponse } from '@/types/api'
 
 /**
@@ -22,6 +23,7 @@ export const useTasksStore = defineStore('tasks', () => {
   const currentTask: Ref<Task | null> = ref(null)
   const loading: Ref<boolean> = ref(false)
   const error: Ref<string | null> = ref(null)
+  const serverStats: Ref<TaskStats | null> = ref(null)
   const pagination = ref({
     count: 0,
     next: null as string | null,
@@ -46,8 +48,15 @@ export const useTasksStore = defineStore('tasks', () => {
 
   /**
    * Estadísticas de tareas
+   * Usa los contadores del servidor (todas las tareas) cuando están disponibles;
+   * en caso contrario se calculan sobre la página cargada
    */
   const stats = computed(() => {
+    if (serverStats.value) {
+      const { total, completed, pending } = serverStats.value
+      return { total, completed, pending }
+    }
+
     const total = tasks.value.length
     const completed = completedTasks.value.length
     const pending = pendingTasks.value.length
@@ -66,7 +75,26 @@ export const useTasksStore = defineStore('tasks', () => {
     return tasks.value.length > 0
   })
 
+  /**
+   * Ajusta localmente los contadores del servidor tras una mutación
+   */
+  function adjustStats(total: number, completed: number): void {
+    if (!serverStats.value) {
+      return
+    }
+    serverStats.value.total += total
+    serverStats.value.completed += completed
+    serverStats.value.pending = serverStats.value.total - serverStats.value.completed
+  }
+
   // Acciones
+  /**
+   * Carga los contadores de tareas del servidor
+   */
+  async function fetchStats(): Promise<void> {
+    serverStats.value = (await apiGetTaskStats()) ?? null
+  }
+
   /**
    * Carga las tareas del servidor (paginado)
    */
@@ -75,7 +103,10 @@ export const useTasksStore = defineStore('tasks', () => {
       loading.value = true
       error.value = null
 
-      const response: PaginatedResponse<Task> = await apiGetTasks(page)
+      const [response]: [PaginatedResponse<Task>, void] = await Promise.all([
+        apiGetTasks(page),
+        fetchStats(),
+      ])
 
       tasks.value = response.results
       pagination.value = {
@@ -131,6 +162,7 @@ export const useTasksStore = defineStore('tasks', () => {
       // Agregar la nueva tarea al inicio de la lista
       tasks.value.unshift(newTask)
       pagination.value.count += 1
+      adjustStats(1, newTask.completed ? 1 : 0)
 
       return newTask
     } catch (err: unknown) {
@@ -155,6 +187,10 @@ export const useTasksStore = defineStore('tasks', () => {
       // Actualizar en la lista
       const index = tasks.value.findIndex((t) => t.id === id)
       if (index !== -1) {
+        const previous = tasks.value[index]
+        if (previous) {
+          adjustStats(0, Number(updatedTask.completed) - Number(previous.completed))
+        }
         tasks.value[index] = updatedTask
       }
 
@@ -186,6 +222,10 @@ export const useTasksStore = defineStore('tasks', () => {
       // Actualizar en la lista
       const index = tasks.value.findIndex((t) => t.id === id)
       if (index !== -1) {
+        const previous = tasks.value[index]
+        if (previous) {
+          adjustStats(0, Number(updatedTask.completed) - Number(previous.completed))
+        }
         tasks.value[index] = updatedTask
       }
 
@@ -214,6 +254,11 @@ export const useTasksStore = defineStore('tasks', () => {
 
       await apiDeleteTask(id)
 
+      const deleted = tasks.value.find((t) => t.id === id)
+      if (deleted) {
+        adjustStats(-1, deleted.completed ? -1 : 0)
+      }
+
       // Remover de la lista
       tasks.value = tasks.value.filter((t) => t.id !== id)
 
@@ -257,6 +302,7 @@ export const useTasksStore = defineStore('tasks', () => {
   function clearTasks(): void {
     tasks.value = []
     currentTask.value = null
+    serverStats.value = null
     pagination.value = {
       count: 0,
       next: null,
@@ -286,6 +332,7 @@ export const useTasksStore = defineStore('tasks', () => {
     stats,
     hasTasks,
     // Acciones
+    fetchStats,
     fetchTasks,
     fetchTask,
     createTask,
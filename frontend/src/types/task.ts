@@ -24,3 +24,28 @@ export interface UpdateTaskRequest {
   completed?: boolean
 }
 
+
+export interface TaskListFilters {
+  completed?: boolean
+  created_after?: string // ISO 8601 (inclusive)
+  created_before?: string // ISO 8601 (exclusivo)
+  ordering?: 'created_at' | '-created_at'
+  q?: string
+}
+
+export interface TaskStats {
+  total: number
+  completed: number
+  pending: number
+  updated_at: string // ISO 8601 format
+}
+
+export interface TaskChange extends Task {
+  is_deleted: boolean
+}
+
+export interface TaskChangesResponse {
+  results: TaskChange[]
+  since: string | null // Token para la siguiente sincronización
+  has_more: boolean
+}